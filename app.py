@@ -1,21 +1,114 @@
 # app.py (Optimized Version)
-from flask import Flask, render_template, request, jsonify, redirect
+# Πρώτο import: από εδώ μετρούν οι χρόνοι εκκίνησης (βλ. startup.py)
+from startup import report as startup
+from flask import Flask, render_template, request, jsonify, redirect, g, has_request_context, Response, stream_with_context, url_for
 import json
+from urllib.parse import urlencode
 import os 
-import google.generativeai as genai 
-from flask_sqlalchemy import SQLAlchemy 
-import smtplib
-import ssl
-from datetime import datetime
-from email.message import EmailMessage
+from datetime import datetime, time as dtime, timedelta
 import re
+import hmac
+import uuid
+from functools import wraps
 from werkzeug.utils import secure_filename
 import time
-app = Flask(__name__)
+from catalog import RANGE_FIELDS, CatalogStore, decode_cursor
+from spatial import parse_bbox
+from search import SearchIndex
+from translation import TranslationEngine, failed_translation
+from jobs import JobFailed, JobQueue
+from models import db, Conversation, ConversationDay, ConversationDayProperty, Job, OutboxEmail
+from conversations import DEFAULT_PAGE_SIZE as CONVERSATIONS_PAGE_SIZE, MAX_PAGE_SIZE as CONVERSATIONS_MAX_PAGE_SIZE, ConversationStore, decode_cursor as decode_conversation_cursor, parse_day
+from mailer import MailOutbox, SmtpRoute
+from llm import CircuitBreaker, FakeChatModel, LLMClient, LLMUnavailable
+from assets import AssetManifest, precompress_all, send_static
+from bundles import CssBundle
+from page_cache import PageCache, source_version
+from http_cache import ResponseStats, page_etag
+from metrics import HTTP_DURATION, instrument_commits, registry as metrics
+from i18n import LANGUAGE_COOKIE, PREFIX_ENVIRON_KEY, LanguagePrefixMiddleware, TranslationStore, choose_language
+from images import build_image_variants, image_srcsets, main_image_srcsets, remove_variants
+from storage import DatabaseCatalogBackend, JsonCatalogBackend, read_json
+from chatbot import RETRIEVAL_TOP_K, AnswerCache, ConversationLogger, build_prompt, build_property_context, normalize_question, sse_event
+startup.mark('imports')
+# Τα static τα σερβίρει το serve_static παρακάτω (fingerprints, br/gzip, Range)
+app = Flask(__name__, static_folder=None)
 
 app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL') or 'sqlite:///database.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db = SQLAlchemy(app) 
+db.init_app(app)
+
+# --- Admin API ---
+# Συνομιλίες, εργασίες της ουράς και μετρητές (σφάλματα, tracebacks, ό,τι
+# έγραψαν οι επισκέπτες): μόνο με το κοινό ADMIN_TOKEN, ως
+# "Authorization: Bearer <token>" ή X-Admin-Token. Χωρίς ADMIN_TOKEN κλειστά.
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+
+def _request_admin_token():
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() == 'bearer' and token:
+        return token.strip()
+    return request.headers.get('X-Admin-Token', '')
+
+def admin_token_required(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not ADMIN_TOKEN:
+            return jsonify({'error': 'Admin API disabled: ADMIN_TOKEN is not set'}), 403
+        token = _request_admin_token()
+        if not token:
+            return jsonify({'error': 'Admin token required'}), 401
+        if not hmac.compare_digest(token.encode('utf-8'), ADMIN_TOKEN.encode('utf-8')):
+            return jsonify({'error': 'Invalid admin token'}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+# --- Μετρήσεις (βλ. metrics.py) ---
+# Latency ανά endpoint/status και spans για Gemini, SMTP, commits και JSON
+# αρχεία, στο /metrics. Ο φάκελος (METRICS_DIR, κενό για μόνο ανά worker)
+# μοιράζεται μεταξύ των gunicorn workers, ώστε το /metrics να δίνει σύνολα.
+metrics.configure(
+    directory=os.environ.get('METRICS_DIR', os.path.join(app.instance_path, 'metrics')) or None,
+    flush_interval=float(os.environ.get('METRICS_FLUSH_INTERVAL', '5'))
+)
+instrument_commits(metrics)
+
+@app.before_request
+def start_request_timer():
+    # Πρώτο before_request, ώστε να μετρούν και τα υπόλοιπα hooks
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    _observe_request(response.status_code)
+    return response
+
+@app.teardown_request
+def record_failed_request(exc):
+    # Εξαίρεση που δεν έγινε απάντηση: το after_request δεν έτρεξε
+    if exc is not None:
+        _observe_request(500)
+
+def _observe_request(status):
+    started = g.pop('request_started', None)
+    if started is not None:
+        endpoint = request.endpoint or 'unmatched'
+        metrics.observe(HTTP_DURATION, (endpoint, request.method, str(status)), time.perf_counter() - started)
+
+# METRICS_PUBLIC=1: /metrics χωρίς token (π.χ. scraper σε ιδιωτικό δίκτυο)·
+# αλλιώς ο Prometheus στέλνει το ADMIN_TOKEN (authorization: credentials)
+METRICS_PUBLIC = os.environ.get('METRICS_PUBLIC', '0') == '1'
+
+def metrics_endpoint():
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+app.add_url_rule('/metrics', view_func=metrics_endpoint if METRICS_PUBLIC else admin_token_required(metrics_endpoint))
+
+@app.route('/api/startup')
+@admin_token_required
+def startup_stats():
+    """Χρόνοι των φάσεων εκκίνησης και μνήμη του worker που απαντά (βλ. startup.py)."""
+    return jsonify(startup.as_dict())
 
 
 
@@ -29,19 +122,65 @@ LANGUAGES = {
     "Russian": "ru"
 }
 
-def translate_texts_with_gemini(texts_to_translate, target_language):
+# LLM_BACKEND=fake: τοπικό ψεύτικο μοντέλο για δοκιμές χωρίς API key
+# (FAKE_LLM_LATENCY / FAKE_LLM_FAIL_RATE για αργό ή ασταθές upstream)
+LLM_BACKEND = os.environ.get('LLM_BACKEND') or os.environ.get('CHATBOT_BACKEND', 'gemini')
+
+def make_llm_model():
+    if LLM_BACKEND == 'fake':
+        return FakeChatModel.from_env()
+    # Το SDK φορτώνεται στην πρώτη κλήση του LLM (αργό import), όχι στην εκκίνηση
+    import google.generativeai as genai
+    genai.configure(api_key=GEMINI_API_KEY)
+    return genai.GenerativeModel('gemini-2.5-flash')
+
+# Model handle ανά worker για το chatbot, με προθεσμία ανά κλήση, όριο
+# ταυτόχρονων κλήσεων και circuit breaker (βλ. llm.py)
+llm_client = LLMClient(
+    make_llm_model,
+    max_concurrency=int(os.environ.get('LLM_MAX_CONCURRENCY', '8')),
+    timeout=float(os.environ.get('LLM_TIMEOUT', '20')),
+    queue_timeout=float(os.environ.get('LLM_QUEUE_TIMEOUT', '0.5')),
+    breaker=CircuitBreaker(
+        failure_threshold=int(os.environ.get('LLM_BREAKER_FAILURES', '5')),
+        reset_timeout=float(os.environ.get('LLM_BREAKER_RESET', '30'))
+    )
+)
+
+# Οι μεταφράσεις του admin (στο background) έχουν δικό τους όριο, ώστε μια
+# αποθήκευση με fan-out σε όλες τις γλώσσες να μην πιάνει τις θέσεις του
+# chatbot και να μην το οδηγεί σε "μη διαθέσιμο". Το όριο χωρά όλο το fan-out
+# (μία κλήση ανά γλώσσα): η αποθήκευση κρατά όσο η πιο αργή κλήση, όχι κύματα.
+TRANSLATION_MAX_WORKERS = int(os.environ.get('TRANSLATION_MAX_WORKERS', str(len(LANGUAGES))))
+translation_llm_client = LLMClient(
+    make_llm_model,
+    max_concurrency=int(os.environ.get('LLM_TRANSLATION_MAX_CONCURRENCY', str(TRANSLATION_MAX_WORKERS))),
+    timeout=float(os.environ.get('LLM_TIMEOUT', '20')),
+    breaker=CircuitBreaker(
+        failure_threshold=int(os.environ.get('LLM_BREAKER_FAILURES', '5')),
+        reset_timeout=float(os.environ.get('LLM_BREAKER_RESET', '30'))
+    )
+)
+
+def llm_available():
+    return bool(GEMINI_API_KEY) or LLM_BACKEND == 'fake'
+
+def parse_json_reply(text):
+    # Προσπαθούμε να καθαρίσουμε την απάντηση από τυχόν περιττό κείμενο
+    cleaned_response = text.strip().replace("```json", "").replace("```", "").strip()
+    return json.loads(cleaned_response)
+
+def translate_texts_with_gemini(texts_to_translate, target_language, timeout=None):
     """
     Παίρνει ένα λεξικό με κείμενα (π.χ. {'title': '...', 'description': '...'}),
     τα μεταφράζει στη γλώσσα-στόχο και επιστρέφει το μεταφρασμένο λεξικό.
     """
-    if not GEMINI_API_KEY:
+    if not llm_available():
         print(f"Skipping translation to {target_language} as API key is not available.")
         # Επιστρέφουμε τα αρχικά κείμενα με μια ένδειξη για να ξέρουμε ότι δεν μεταφράστηκαν
         return {key: f"[UNTRANSLATED] {value}" for key, value in texts_to_translate.items()}
 
     try:
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        
         # Μετατρέπουμε το λεξικό σε μορφή JSON string για το prompt
         json_input = json.dumps(texts_to_translate, ensure_ascii=False, indent=2)
 
@@ -57,150 +196,561 @@ def translate_texts_with_gemini(texts_to_translate, target_language):
         Translated JSON:
         """
 
-        response = model.generate_content(prompt)
-        
-        # Προσπαθούμε να καθαρίσουμε την απάντηση από τυχόν περιττό κείμενο
-        cleaned_response = response.text.strip().replace("```json", "").replace("```", "").strip()
-        
-        translated_json = json.loads(cleaned_response)
-        return translated_json
+        # Οι μεταφράσεις τρέχουν στο background: περιμένουν θέση μέχρι την προθεσμία τους
+        reply = translation_llm_client.generate(prompt, timeout=timeout, queue_timeout=timeout)
+        return parse_json_reply(reply)
 
     except Exception as e:
         print(f"ERROR during translation to {target_language}: {e}")
         # Σε περίπτωση σφάλματος, επιστρέφουμε τα αρχικά κείμενα
-        return {key: f"[TRANSLATION_FAILED] {value}" for key, value in texts_to_translate.items()}
+        return failed_translation(texts_to_translate)
 
 
-# --- Μοντέλο Βάσης ---
-class Conversation(db.Model):
-    __tablename__ = 'conversations' 
-    id = db.Column(db.Integer, primary_key=True)
-    timestamp = db.Column(db.String, nullable=False)
-    user_question = db.Column(db.String, nullable=False)
-    bot_answer = db.Column(db.String, nullable=False)
-    session_id = db.Column(db.String, nullable=True)
+def translate_texts_to_all_languages_with_gemini(texts_to_translate, target_languages, timeout=None):
+    """
+    Ένα δομημένο αίτημα για όλες τις γλώσσες μαζί. Επιστρέφει
+    {όνομα γλώσσας: μεταφρασμένο λεξικό}· όσες γλώσσες λείπουν ή είναι
+    λάθος μορφής τις ξαναζητά ο TranslationEngine μία-μία.
+    """
+    if not llm_available():
+        return {lang: {key: f"[UNTRANSLATED] {value}" for key, value in texts_to_translate.items()}
+                for lang in target_languages}
+
+    json_input = json.dumps(texts_to_translate, ensure_ascii=False, indent=2)
+    prompt = f"""
+        Translate the values of the following JSON object from Greek to each of these languages: {', '.join(target_languages)}.
+        Respond with ONE JSON object whose keys are exactly the language names above
+        and whose values are the input object with its values translated to that language.
+        Do NOT translate the keys of the input object.
+        Provide ONLY the JSON object as your response, without any introductory text.
+
+        Input JSON:
+        {json_input}
+
+        Translated JSON:
+        """
+    reply = translation_llm_client.generate(prompt, timeout=timeout, queue_timeout=timeout)
+    return parse_json_reply(reply)
+
+
+# Όλες οι γλώσσες μεταφράζονται ταυτόχρονα (ή με ένα αίτημα σε TRANSLATION_MODE=batch)
+translation_engine = TranslationEngine(
+    translate_texts_with_gemini,
+    translate_many=translate_texts_to_all_languages_with_gemini,
+    max_workers=TRANSLATION_MAX_WORKERS,
+    timeout=float(os.environ.get('TRANSLATION_TIMEOUT', '45')),
+    mode=os.environ.get('TRANSLATION_MODE', 'parallel')
+)
+
+
+def write_conversations(records):
+    """Bulk insert ενός batch συνομιλιών (καλείται από τον ConversationLogger)."""
+    with app.app_context():
+        try:
+            db.session.execute(db.insert(Conversation), records)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+conversation_logger = ConversationLogger(
+    write_conversations,
+    max_queue=int(os.environ.get('CHAT_LOG_QUEUE_MAX', '10000')),
+    batch_size=int(os.environ.get('CHAT_LOG_BATCH_SIZE', '100')),
+    flush_interval=float(os.environ.get('CHAT_LOG_FLUSH_INTERVAL', '2.0')),
+    policy=os.environ.get('CHAT_LOG_POLICY', 'drop_oldest')
+)
 
 # --- Ρύθμιση του Gemini API ---
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-else:
-    print("!!! WARNING: GEMINI_API_KEY environment variable not set. Chatbot will not work.")
+if not GEMINI_API_KEY and LLM_BACKEND != 'fake':
+    startup.note("WARNING: GEMINI_API_KEY not set, chatbot will not work")
 
 # --- Ρυθμίσεις Email ---
 MAIL_USERNAME = os.environ.get('MAIL_USERNAME')
 MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
 MAIL_RECEIVER = os.environ.get('MAIL_RECEIVER', MAIL_USERNAME) 
 
+# Κύριος server και εφεδρικός (κενό MAIL_FALLBACK_SERVER για απενεργοποίηση)
+MAIL_ROUTES = [SmtpRoute(
+    os.environ.get('MAIL_SERVER', 'smtp.office365.com'),
+    os.environ.get('MAIL_PORT', '587'),
+    os.environ.get('MAIL_SECURITY', 'starttls')
+)]
+if os.environ.get('MAIL_FALLBACK_SERVER', 'smtp.gmail.com'):
+    MAIL_ROUTES.append(SmtpRoute(
+        os.environ.get('MAIL_FALLBACK_SERVER', 'smtp.gmail.com'),
+        os.environ.get('MAIL_FALLBACK_PORT', '465'),
+        os.environ.get('MAIL_FALLBACK_SECURITY', 'ssl')
+    ))
+
+# Τα leads γράφονται πρώτα στη βάση και στέλνονται από background sender
+mail_outbox = MailOutbox(
+    app, db, OutboxEmail, MAIL_ROUTES,
+    sender=MAIL_USERNAME,
+    receiver=MAIL_RECEIVER,
+    password=MAIL_PASSWORD,
+    batch_size=int(os.environ.get('MAIL_BATCH_SIZE', '20')),
+    max_attempts=int(os.environ.get('MAIL_MAX_ATTEMPTS', '8'))
+)
+
 # ===============================================
 # ==            ΒΕΛΤΙΣΤΟΠΟΙΗΣΗ ΤΑΧΥΤΗΤΑΣ         ==
 # ===============================================
 
-# --- Βοηθητική Συνάρτηση για τη φόρτωση των ακινήτων ---
-def load_properties_from_json():
-    """Διαβάζει το JSON αρχείο από τον δίσκο."""
-    try:
-        with open('static/js/data/properties.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"FATAL ERROR: Could not load properties.json. {e}")
-        return []
+PROPERTIES_PATH = 'static/js/data/properties.json'
+I18N_DIR = 'static/js/data/i18n'
+
+# Πού γράφουν οι admin αλλαγές: "json" (τα αρχεία, όπως πάντα) ή "db" (πίνακες
+# properties/translations με transactions + export στα ίδια JSON αρχεία).
+# Για το "db" τρέξτε πρώτα μία φορά το import_catalog.py.
+CATALOG_BACKEND = os.environ.get('CATALOG_BACKEND', 'json')
+if CATALOG_BACKEND == 'db':
+    catalog_backend = DatabaseCatalogBackend(db, PROPERTIES_PATH, I18N_DIR)
+else:
+    catalog_backend = JsonCatalogBackend(PROPERTIES_PATH, I18N_DIR)
 
 # !! ΣΗΜΑΝΤΙΚΟ: Φορτώνουμε τα ακίνητα ΜΙΑ ΦΟΡΑ κατά την εκκίνηση του app !!
-ALL_PROPERTIES = load_properties_from_json()
-print(f"Loaded {len(ALL_PROPERTIES)} properties into memory.")
+# Ο κατάλογος κρατά ευρετήρια (id, type, location_slug, project_id, τιμή),
+# ώστε τα routes να μην σαρώνουν όλη τη λίστα σε κάθε αίτημα.
+# Το CatalogStore ελέγχει φθηνά (os.stat) αν το properties.json άλλαξε από
+# κάποιον άλλο worker και κάνει atomic swap στον νέο κατάλογο χωρίς restart.
+startup.mark('setup')
+catalog_store = CatalogStore(
+    PROPERTIES_PATH,
+    check_interval=float(os.environ.get('CATALOG_CHECK_INTERVAL', '1.0'))
+)
+startup.mark('catalog', f'{len(catalog_store.current())} properties')
+
+# Αναζήτηση ελεύθερου κειμένου σε όλες τις γλώσσες (/api/search, chatbot).
+# Ανά worker· το sync() ξαναευρετηριάζει μόνο ό,τι άλλαξε από την προηγούμενη έκδοση
+search_index = SearchIndex()
+
+# Ουρά εργασιών για τις βαριές admin αποθηκεύσεις (αρχεία, μεταφράσεις)
+job_queue = JobQueue(
+    app, db, Job,
+    workers=int(os.environ.get('JOB_WORKERS', '2')),
+    max_attempts=int(os.environ.get('JOB_MAX_ATTEMPTS', '3'))
+)
+
+@app.before_request
+def pin_catalog():
+    # Κάθε αίτημα δουλεύει με ένα σταθερό στιγμιότυπο του καταλόγου
+    g.catalog = catalog_store.current()
+    # Οι workers της ουράς και ο sender των emails ξεκινούν μία φορά ανά process (φθηνός έλεγχος pid)
+    job_queue.start()
+    mail_outbox.start()
+    schedule_conversation_retention()
+
+def get_catalog():
+    if has_request_context() and 'catalog' in g:
+        return g.catalog
+    return catalog_store.current()
+
+# --- Μεταφράσεις (βλ. i18n.py) ---
+# Όλα τα i18n/*.json στη μνήμη· οι σελίδες αποδίδονται στη γλώσσα του επισκέπτη
+translation_store = TranslationStore(
+    I18N_DIR,
+    check_interval=float(os.environ.get('CATALOG_CHECK_INTERVAL', '1.0'))
+)
+# Όλες οι γλώσσες από την εκκίνηση: με gunicorn --preload μία φορά, στον master
+translation_store.load_all()
+startup.mark('i18n', f'{len(translation_store.languages)} languages')
+app.wsgi_app = LanguagePrefixMiddleware(app.wsgi_app, translation_store.languages)
+
+# Κλειδιά που χρειάζεται το JS (chatbot, χάρτης) ακόμη κι αν δεν είναι στο HTML
+CLIENT_TRANSLATION_KEYS = ('chatbot_welcome_message', 'office_popup_title', 'price_on_request')
+
+@app.before_request
+def select_language():
+    g.lang = choose_language(
+        request.environ.get(PREFIX_ENVIRON_KEY),
+        request.cookies.get(LANGUAGE_COOKIE),
+        request.accept_languages,
+        translation_store.languages,
+        translation_store.default_lang
+    )
+    # Τα κλειδιά που χρησιμοποιεί η σελίδα -> το slice που πηγαίνει στον client
+    g.i18n_keys = set(CLIENT_TRANSLATION_KEYS)
+
+@app.after_request
+def remember_language(response):
+    # Το /en/... θυμάται τη γλώσσα και για τα επόμενα URLs χωρίς πρόθεμα
+    if request.environ.get(PREFIX_ENVIRON_KEY) and request.cookies.get(LANGUAGE_COOKIE) != g.lang:
+        response.set_cookie(LANGUAGE_COOKIE, g.lang, max_age=365 * 24 * 3600, samesite='Lax')
+    if response.mimetype == 'text/html':
+        response.vary.update(('Cookie', 'Accept-Language'))
+    return response
+
+@app.template_global()
+def t(key):
+    """Η μετάφραση του `key` στη γλώσσα του αιτήματος ('' αν λείπει, όπως στο i18n.js)."""
+    g.i18n_keys.add(key)
+    return translation_store.translate(g.lang, key)
+
+@app.template_global()
+def use_translations(keys):
+    """Προσθέτει στο slice κλειδιά που χρειάζεται μόνο το JS της σελίδας."""
+    g.i18n_keys.update(keys)
+    return ''
+
+@app.template_global()
+def i18n_slice():
+    return translation_store.slice(g.lang, g.i18n_keys)
+
+@app.context_processor
+def inject_language():
+    return {'current_lang': g.get('lang', translation_store.default_lang)}
+
+@app.template_global()
+def page_path():
+    """Το path της σελίδας με τα (κανονικοποιημένα, αν η σελίδα είναι cached) args της."""
+    return g.get('page_path') or request.full_path.rstrip('?')
+
+# --- Cache σελίδων (βλ. page_cache.py) ---
+# Οι δημόσιες σελίδες αλλάζουν μόνο όταν αλλάξει ο κατάλογος, οι μεταφράσεις
+# ή τα templates, οπότε το έτοιμο HTML σερβίρεται χωρίς Jinja. Ο δίσκος
+# (PAGE_CACHE_DIR, κενό για απενεργοποίηση) μοιράζεται μεταξύ των workers.
+PAGE_CACHE_ENABLED = os.environ.get('PAGE_CACHE', '1') == '1'
+page_cache = PageCache(
+    max_bytes=int(os.environ.get('PAGE_CACHE_MAX_BYTES', str(32 * 1024 * 1024))),
+    disk_dir=os.environ.get('PAGE_CACHE_DIR', os.path.join(app.instance_path, 'page_cache')) or None
+)
+# Αλλάζει σε κάθε deploy που αγγίζει templates, css ή js
+TEMPLATES_VERSION = source_version('templates', 'static/css', 'static/js')
+
+def render_cached(tag, key, render, args=None):
+    """
+    Σερβίρει τη σελίδα από το page cache ή την αποδίδει με το `render()` και
+    την αποθηκεύει. Το `key` περιέχει τις εκδόσεις των δεδομένων της σελίδας·
+    η γλώσσα, οι μεταφράσεις και τα templates προστίθενται εδώ.
+    Το ίδιο κλειδί δίνει και το ETag: αν ταιριάζει, 304 χωρίς render.
+    """
+    args = {name: value for name, value in sorted((args or {}).items()) if value}
+    g.page_path = request.path + ('?' + urlencode(args) if args else '')
+    full_key = (request.endpoint, tuple(args.items()), g.lang,
+                translation_store.version(g.lang), TEMPLATES_VERSION, key)
+    etag = page_etag(full_key)
+
+    if etag in request.if_none_match:
+        response = Response(status=304, mimetype='text/html')
+    elif not PAGE_CACHE_ENABLED:
+        response = Response(render(), mimetype='text/html')
+    else:
+        body = page_cache.get(tag, full_key)
+        status = 'hit'
+        if body is None:
+            body = render().encode('utf-8')
+            page_cache.set(tag, full_key, body)
+            status = 'miss'
+        response = Response(body, mimetype='text/html')
+        response.headers['X-Page-Cache'] = status
+    response.set_etag(etag)
+    # Ο browser κρατά τη σελίδα αλλά ρωτά κάθε φορά (φθηνό 304 αν δεν άλλαξε)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def invalidate_property_pages(property_id):
+    """Μετά από admin αλλαγή: η σελίδα του ακινήτου και οι λίστες που το περιέχουν."""
+    for tag in (f'property:{property_id}', 'home', 'listings', 'project-kerdylia'):
+        page_cache.invalidate(tag)
+
+@app.route('/api/page-cache/stats')
+@admin_token_required
+def page_cache_stats():
+    return jsonify(page_cache.stats())
+
+# Μετρητές μεγέθους απαντήσεων και 304 (πόσα bytes γλιτώνουν τα ETags)
+response_stats = ResponseStats()
+
+@app.after_request
+def record_response_stats(response):
+    response_stats.record(request.endpoint, response)
+    return response
+
+@app.route('/api/http/stats')
+@admin_token_required
+def http_stats():
+    return jsonify(response_stats.stats())
+
+@app.route('/api/i18n/<lang>', methods=['GET', 'POST'])
+def translations_slice(lang):
+    """
+    Οι μεταφράσεις μόνο για τα κλειδιά της σελίδας (?keys=a,b ή JSON {"keys": [...]}),
+    για την αλλαγή γλώσσας χωρίς reload.
+    """
+    if lang not in translation_store.languages:
+        return jsonify({'error': 'Unknown language'}), 404
+    if request.method == 'POST':
+        keys = (request.get_json(silent=True) or {}).get('keys') or []
+    else:
+        keys = [key for key in request.args.get('keys', '').split(',') if key]
+    keys = set(keys) | set(CLIENT_TRANSLATION_KEYS)
+
+    response = jsonify(translation_store.slice(lang, keys))
+    response.set_etag(translation_store.slice_etag(lang, keys))
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
 
 # ===============================================
 # == Route για το Chatbot                     ==
 # ===============================================
 
+# Cache απαντήσεων: κλειδί η κανονικοποιημένη ερώτηση + οι εκδόσεις καταλόγου και el.json,
+# ώστε οι συχνές ερωτήσεις να μην ξοδεύουν quota και να απαντώνται αμέσως.
+answer_cache = AnswerCache(
+    maxsize=int(os.environ.get('CHATBOT_CACHE_SIZE', '512')),
+    ttl=float(os.environ.get('CHATBOT_CACHE_TTL', '3600'))
+)
+
+CHATBOT_UNAVAILABLE_REPLY = 'Συγγνώμη, ο βοηθός δεν είναι διαθέσιμος αυτή τη στιγμή.'
+
+def chatbot_available():
+    return llm_available()
+
+def answer_cache_key(catalog, question):
+    # Το prompt χτίζεται από τον κατάλογο ΚΑΙ τα ελληνικά κείμενα (τίτλοι,
+    # περιγραφές, χαρακτηριστικά): αλλαγή σε οποιοδήποτε ακυρώνει τις απαντήσεις
+    return (catalog.version, translation_store.version('el'), normalize_question(question))
+
+def chatbot_context(catalog, question):
+    """
+    (context του prompt, ids ακινήτων): τα RETRIEVAL_TOP_K πιο σχετικά ακίνητα
+    για την ερώτηση. Τα ids γράφονται μαζί με τη συνομιλία.
+    """
+    search_index.sync(catalog, translation_store)
+    hits = search_index.search(question, RETRIEVAL_TOP_K, match_all=False)
+    properties = [catalog.get(property_id) for property_id, _ in hits if catalog.get(property_id)]
+    context = build_property_context(catalog, properties, translation_store.get('el'))
+    return context, [prop['id'] for prop in properties]
+
+def log_conversation(user_message, bot_reply, session_id, property_ids):
+    # Μπαίνει σε ουρά και γράφεται σε batch από background thread,
+    # ώστε η βάση να μην προσθέτει καθυστέρηση στην απάντηση.
+    conversation_logger.log({
+        'timestamp': datetime.now(),
+        'user_question': user_message,
+        'bot_answer': bot_reply,
+        'session_id': session_id,
+        'property_ids': property_ids or None
+    })
+
+# --- Συνεδρίες του chatbot ---
+# Ένα τυχαίο id σε cookie συνεδρίας (χωρίς λήξη): οι ερωτήσεις του ίδιου
+# επισκέπτη μέχρι να κλείσει τον browser μετρούν ως μία συνεδρία.
+CHAT_SESSION_COOKIE = 'chat_session'
+_CHAT_SESSION_RE = re.compile(r'[0-9a-f]{32}')
+
+def chat_session_id():
+    if 'chat_session_id' not in g:
+        value = request.cookies.get(CHAT_SESSION_COOKIE, '')
+        g.chat_session_id = value if _CHAT_SESSION_RE.fullmatch(value) else uuid.uuid4().hex
+    return g.chat_session_id
+
+@app.after_request
+def remember_chat_session(response):
+    if 'chat_session_id' in g and request.cookies.get(CHAT_SESSION_COOKIE) != g.chat_session_id:
+        response.set_cookie(CHAT_SESSION_COOKIE, g.chat_session_id, httponly=True, samesite='Lax')
+    return response
+
 @app.route('/ask-chatbot', methods=['POST'])
 def ask_chatbot():
     user_message = request.json.get('message')
     if not user_message:
         return jsonify({'error': 'No message provided'}), 400
 
-    if not GEMINI_API_KEY:
-        return jsonify({'reply': 'Συγγνώμη, ο βοηθός δεν είναι διαθέσιμος αυτή τη στιγμή.'})
+    if not chatbot_available():
+        return jsonify({'reply': CHATBOT_UNAVAILABLE_REPLY})
 
-    bot_reply = "Sorry, I am unable to respond right now." 
+    # Αν το LLM αργεί ή είναι εκτός (ανοιχτό circuit), απαντάμε αμέσως με συγγνώμη
+    bot_reply = CHATBOT_UNAVAILABLE_REPLY
 
-    try:
-        # -- ΕΠΙΚΟΙΝΩΝΙΑ ΜΕ GEMINI --
-        # ΧΡΗΣΗ ΤΗΣ GLOBAL ΜΕΤΑΒΛΗΤΗΣ (ΓΙΑ ΤΑΧΥΤΗΤΑ)
-        properties_data = ALL_PROPERTIES 
-        context = "Here is the available property data:\n"
-        for prop in properties_data:
-            price_str = f"€{prop['price']:,}".replace(',', '.') if prop.get('price', 0) > 0 else 'On request'
-            context += f"- Property ID: {prop['id']}, Type: {prop['type']}, Location: {prop['location']}, Price: {price_str}\n"
-        
-        context += "\nCompany Contact Info:\n"
-        context += "Phone: +30 694 619 3307\n"
-        context += "Email: info@grouprealestate.gr\n"
-        context += "Address: El. Venizelou 40, Nea Vrasna, 57021\n"
+    property_ids = None
 
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        
-        prompt = f"""
-        You are a helpful and professional real estate assistant for "Group Real Estate" and your answers must always be in Greek.
-        Your role is to answer user questions based ONLY on the information provided below.
-        Be friendly, concise, and act like a real estate expert.
-        If the user asks for something not in the provided data, politely state that you don't have that information.
-        Never mention that you are an AI.
+    catalog = get_catalog()
+    cache_key = answer_cache_key(catalog, user_message)
+    cached = answer_cache.get(cache_key)
 
-        --- PROVIDED DATA ---
-        {context}
-        --- END OF DATA ---
+    if cached is not None:
+        # Η cache κρατά και τα ακίνητα της ερώτησης, ώστε να μην ξαναγίνεται αναζήτηση
+        bot_reply, property_ids = cached
+    else:
+        try:
+            # -- ΕΠΙΚΟΙΝΩΝΙΑ ΜΕ GEMINI --
+            # Στο prompt μπαίνουν μόνο τα ακίνητα που σχετίζονται με την ερώτηση
+            context, property_ids = chatbot_context(catalog, user_message)
+            prompt = build_prompt(context, user_message)
 
-        User Question: "{user_message}"
-        """
-        
-        response = model.generate_content(prompt)
-        bot_reply = response.text
+            bot_reply = llm_client.generate(prompt)
+            answer_cache.set(cache_key, (bot_reply, property_ids))
 
-    except Exception as e:
-        print(f"Error communicating with Gemini API: {e}")
+        except LLMUnavailable as e:
+            print(f"Chatbot LLM unavailable: {e}")
+        except Exception as e:
+            print(f"Error communicating with Gemini API: {e}")
 
     # -- ΑΠΟΘΗΚΕΥΣΗ ΣΤΗ ΒΑΣΗ ΔΕΔΟΜΕΝΩΝ --
-    try:
-        new_convo = Conversation(
-            timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            user_question=user_message,
-            bot_answer=bot_reply
-        )
-        db.session.add(new_convo)
-        db.session.commit()
+    log_conversation(user_message, bot_reply, chat_session_id(), property_ids)
+
+    return jsonify({'reply': bot_reply})
+
+@app.route('/ask-chatbot/stream', methods=['POST'])
+def ask_chatbot_stream():
+    """
+    Ίδιο με το /ask-chatbot, αλλά στέλνει την απάντηση με Server-Sent Events
+    καθώς φτάνουν τα κομμάτια από το Gemini (event "delta"), και στο τέλος
+    ένα event "done" με ολόκληρη την απάντηση.
+    """
+    user_message = (request.get_json(silent=True) or {}).get('message')
+    if not user_message:
+        return jsonify({'error': 'No message provided'}), 400
+
+    catalog = get_catalog()
+    session_id = chat_session_id()
+
+    def generate():
+        if not chatbot_available():
+            yield sse_event({'reply': CHATBOT_UNAVAILABLE_REPLY}, event='done')
+            return
+
+        cache_key = answer_cache_key(catalog, user_message)
+        cached = answer_cache.get(cache_key)
+        if cached is not None:
+            cached_reply, property_ids = cached
+            yield sse_event({'delta': cached_reply}, event='delta')
+            yield sse_event({'reply': cached_reply}, event='done')
+            log_conversation(user_message, cached_reply, session_id, property_ids)
+            return
+
+        parts = []
+        property_ids = None
+        try:
+            context, property_ids = chatbot_context(catalog, user_message)
+            prompt = build_prompt(context, user_message)
+            for text in llm_client.stream(prompt):
+                parts.append(text)
+                yield sse_event({'delta': text}, event='delta')
+            bot_reply = ''.join(parts)
+            answer_cache.set(cache_key, (bot_reply, property_ids))
+        except Exception as e:
+            print(f"Error communicating with Gemini API: {e}")
+            bot_reply = ''.join(parts) or CHATBOT_UNAVAILABLE_REPLY
+
+        yield sse_event({'reply': bot_reply}, event='done')
+        log_conversation(user_message, bot_reply, session_id, property_ids)
 
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/llm/stats')
+@admin_token_required
+def llm_stats():
+    """
+    Κλήσεις, αποτυχίες/timeouts, απορρίψεις και κατάσταση του circuit breaker
+    του LLM για το chatbot· των μεταφράσεων στο 'translation'.
+    """
+    return jsonify({**llm_client.stats(), 'translation': translation_llm_client.stats()})
+
+@app.route('/api/chatbot/stats')
+@admin_token_required
+def chatbot_stats():
+    """Μετρητές hit/miss της cache απαντήσεων του chatbot."""
+    return jsonify({
+        'answer_cache': answer_cache.stats(),
+        'conversation_log': conversation_logger.stats()
+    })
+
+# --- Ιστορικό συνομιλιών (βλ. conversations.py) ---
+# Οι συνομιλίες παλαιότερες από CHAT_RETENTION_DAYS συνοψίζονται ανά ημέρα και
+# σβήνονται από μια εργασία της ουράς που τρέχει κάθε μέρα στις CHAT_RETENTION_HOUR.
+conversation_store = ConversationStore(
+    db, Conversation, ConversationDay, ConversationDayProperty,
+    retention_days=int(os.environ.get('CHAT_RETENTION_DAYS', '90'))
+)
+CHAT_RETENTION_HOUR = int(os.environ.get('CHAT_RETENTION_HOUR', '3'))
+# Αν ο προγραμματισμός αποτύχει (π.χ. πριν το init_db.py), ξανά το πολύ μία φορά ανά τόσα δευτερόλεπτα
+CHAT_RETENTION_SCHEDULE_RETRY = float(os.environ.get('CHAT_RETENTION_SCHEDULE_RETRY', '60'))
+_retention_scheduled_pid = None
+_retention_retry_at = None
+
+@job_queue.handler('conversation_retention')
+def run_conversation_retention(payload, report):
+    try:
+        return conversation_store.rollup()
+    except Exception:
+        db.session.rollback()
+        raise
+    finally:
+        # Η αυριανή εκτέλεση μπαίνει ακόμη κι αν αποτύχει η σημερινή
+        enqueue_conversation_retention()
+
+def enqueue_conversation_retention():
+    """Η επόμενη εκτέλεση· σταθερό id ανά ημέρα, άρα μία ακόμη κι αν τη ζητήσουν όλοι οι workers."""
+    now = datetime.now()
+    run_after = datetime.combine(now.date(), dtime(hour=CHAT_RETENTION_HOUR))
+    if run_after <= now:
+        run_after += timedelta(days=1)
+    return job_queue.enqueue('conversation_retention', {}, run_after=run_after,
+                             job_id=f"conversation-retention-{run_after:%Y%m%d}")
+
+def schedule_conversation_retention():
+    # Μία φορά ανά process (φθηνός έλεγχος pid), όπως οι workers της ουράς
+    global _retention_scheduled_pid, _retention_retry_at
+    if _retention_scheduled_pid == os.getpid() and (
+            _retention_retry_at is None or time.monotonic() < _retention_retry_at):
+        return
+    _retention_scheduled_pid = os.getpid()
+    _retention_retry_at = None
+    try:
+        enqueue_conversation_retention()
     except Exception as e:
-        db.session.rollback() 
-        print(f"Error logging to database: {e}")
+        db.session.rollback()
+        _retention_retry_at = time.monotonic() + CHAT_RETENTION_SCHEDULE_RETRY
+        print(f"Could not schedule conversation retention (retrying in {CHAT_RETENTION_SCHEDULE_RETRY:.0f}s): {e}")
 
-    return jsonify({'reply': bot_reply})
-    
-# --- Βοηθητική Συνάρτηση για τη φόρτωση των ακινήτων (Την αφήνουμε, αλλά αλλάζουμε όνομα) ---
-# (Το όνομά της άλλαξε σε load_properties_from_json παραπάνω)
+def _conversation_days():
+    return parse_day(request.args.get('from')), parse_day(request.args.get('to'))
+
+@app.route('/api/admin/conversations')
+@admin_token_required
+def conversations_api():
+    """
+    Οι συνομιλίες, νεότερες πρώτα: φίλτρα ?from= / ?to= (YYYY-MM-DD, μαζί και
+    οι δύο ημέρες) και ?session_id=, ?limit=. Η επόμενη σελίδα ζητιέται με το
+    next_cursor της απάντησης.
+    """
+    try:
+        first_day, last_day = _conversation_days()
+        limit = min(max(_int_arg('limit') or CONVERSATIONS_PAGE_SIZE, 1), CONVERSATIONS_MAX_PAGE_SIZE)
+        cursor = request.args.get('cursor')
+        cursor = decode_conversation_cursor(cursor) if cursor else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    rows, next_cursor = conversation_store.page(
+        first_day, last_day, request.args.get('session_id'), cursor, limit
+    )
+    return jsonify({
+        'items': [conversation_store.to_dict(row) for row in rows],
+        'next_cursor': next_cursor
+    })
+
+@app.route('/api/admin/conversations/daily')
+@admin_token_required
+def conversations_daily_api():
+    """Ερωτήσεις και συνεδρίες ανά ημέρα και τα πιο ζητημένα ακίνητα (?from= / ?to=)."""
+    try:
+        first_day, last_day = _conversation_days()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(conversation_store.daily(first_day, last_day))
     
 @app.context_processor
 def inject_locations():
-    # ΧΡΗΣΗ ΤΗΣ GLOBAL ΜΕΤΑΒΛΗΤΗΣ (ΓΙΑ ΤΑΧΥΤΗΤΑ)
-    properties = ALL_PROPERTIES
-    location_counts = {}
-    location_names = {}
-    for prop in properties:
-       if prop.get('lat') and prop.get('lon'):
-            slug = prop.get('location_slug')
-            name = prop.get('location')
-            if slug and name:
-                location_counts[slug] = location_counts.get(slug, 0) + 1
-                if slug not in location_names:
-                    location_names[slug] = name
-
-    sorted_locations = sorted(location_names.items(), key=lambda item: item[1])
-
-    return dict(
-        location_counts=location_counts,
-        sorted_locations=sorted_locations
-    )
+    # Οι μετρητές υπολογίζονται μία φορά ανά έκδοση καταλόγου (βλ. catalog.py)
+    return get_catalog().template_context
 
 @app.template_filter('formatprice')
 def format_price(value):
@@ -209,80 +759,262 @@ def format_price(value):
         return f'{price:,}'.replace(',', '.')
     except (ValueError, TypeError):
         return value
+
+@app.template_filter('srcsets')
+def srcsets_filter(prop):
+    """srcset (avif/webp) για κάθε εικόνα του ακινήτου, με τη σειρά του prop.images."""
+    return image_srcsets(prop)
+
+@app.template_filter('main_srcset')
+def main_srcset_filter(prop):
+    return main_image_srcsets(prop)
+
+# --- Static αρχεία ---
+asset_manifest = AssetManifest(os.path.join(app.root_path, 'static'))
+
+@app.url_defaults
+def fingerprint_static_urls(endpoint, values):
+    """Κάθε url_for('static', filename=...) δίνει το URL με το hash του περιεχομένου."""
+    if endpoint == 'static' and 'filename' in values:
+        values['filename'] = asset_manifest.hashed(values['filename'])
+
+@app.route('/static/<path:filename>', endpoint='static')
+def serve_static(filename):
+    return send_static(asset_manifest, filename)
+
+# Ένα bundle ανά entry stylesheet, που ξαναφτιάχνεται όταν αλλάξει κάποιο αρχείο του
+css_bundles = {}
+
+@app.template_global()
+def css_bundle_url(entry):
+    """URL του minified bundle του `entry` (ή του ίδιου του entry αν αποτύχει το build)."""
+    bundle = css_bundles.get(entry)
+    if bundle is None:
+        bundle = css_bundles.setdefault(entry, CssBundle(asset_manifest.static_dir, entry))
+    try:
+        filename = bundle.current()
+    except Exception as e:
+        print(f"Error building CSS bundle for {entry}: {e}")
+        filename = entry
+    return url_for('static', filename=filename)
+
     
 @app.route('/')
 def home():
-    # all_properties = load_properties() # <-- ΠΑΛΙΟΣ ΤΡΟΠΟΣ (ΑΡΓΟΣ)
-    
-    # ΧΡΗΣΗ ΤΗΣ GLOBAL ΜΕΤΑΒΛΗΤΗΣ (ΓΙΑ ΤΑΧΥΤΗΤΑ)
-    # 1. Βρίσκουμε τα δεδομένα για το "The Twins"
-    twins_project_data = next((p for p in ALL_PROPERTIES if p['id'] == 'the-twins'), None)
+    # 1. Βρίσκουμε τα δεδομένα για το "The Twins" (lookup στο ευρετήριο id)
+    catalog = get_catalog()
+    twins_project_data = catalog.get('the-twins')
 
     # 2. Παίρνουμε 3 δείγματα ακινήτων
     excluded_ids = ['kerdylia-monokatoikia', 'the-twins', 'kerdylia-maisonette-m1', 'kerdylia-apartment-d1', 'kerdylia-isogio', 'kerdylia-orofos']
-    sample_listings_pool = [p for p in ALL_PROPERTIES if p['id'] not in excluded_ids]
-    sample_listings = sample_listings_pool[:3]
+    sample_listings = catalog.first_excluding(excluded_ids, 3)
 
-    return render_template('index.html', 
-                           twins_project=twins_project_data, 
-                           sample_listings=sample_listings)
+    return render_cached('home', catalog.version, lambda: render_template(
+        'index.html',
+        twins_project=twins_project_data,
+        sample_listings=sample_listings))
 
 @app.route('/about')
 def about_page():
     return render_template('about.html')
 
+# Ακίνητα ανά σελίδα στο /listings (τα επόμενα φορτώνονται με cursor)
+LISTINGS_PAGE_SIZE = 12
+API_MAX_PAGE_SIZE = 100
+# Πεδία που μπορεί να ζητήσει το ?fields= του /api/properties
+# (title: μεταφρασμένος τίτλος, url: η σελίδα του ακινήτου)
+PROPERTY_API_FIELDS = (
+    'id', 'title_key', 'title', 'url', 'type', 'status', 'location', 'location_slug',
+    'project_id', 'price', 'area', 'bedrooms', 'bathrooms', 'lat', 'lon',
+    'main_image', 'images', 'features_keys'
+)
+PROPERTY_API_DEFAULT_FIELDS = (
+    'id', 'title_key', 'title', 'url', 'type', 'location', 'price', 'area',
+    'bedrooms', 'bathrooms', 'main_image'
+)
+
 @app.route('/listings')
 def listings_page():
-    # all_properties = load_properties() # <-- ΠΑΛΙΟΣ ΤΡΟΠΟΣ (ΑΡΓΟΣ)
-    
-    # ΧΡΗΣΗ ΤΗΣ GLOBAL ΜΕΤΑΒΛΗΤΗΣ (ΓΙΑ ΤΑΧΥΤΗΤΑ)
-    all_properties = ALL_PROPERTIES
-    
     current_filters = {
         'type': request.args.get('type', 'all'),
         'location': request.args.get('location', 'all'),
         'sort': request.args.get('sort', '')
     }
+    # partial=1: μόνο οι κάρτες της σελίδας και το κουμπί για την επόμενη (για το main.js)
+    partial = request.args.get('partial') == '1'
+    try:
+        cursor = decode_cursor(request.args['cursor']) if request.args.get('cursor') else None
+    except ValueError:
+        cursor = None
 
-    map_data = []
-    for prop in all_properties:
-       if prop.get('lat') and prop.get('lon'):
-            map_data.append({
-                'id': prop['id'],
-                'lat': prop['lat'],
-                'lon': prop['lon'],
-                'title_key': prop['title_key'],
-                'main_image': prop['main_image'],
-                'price': prop.get('price', 0),
-                'area': prop.get('area', 0),
-                'bedrooms': prop.get('bedrooms', 0),
-                'bathrooms': prop.get('bathrooms', 0)
-            })
-
-    # filtered_properties = all_properties[:] # <-- ΠΑΛΙΟΣ ΤΡΟΠΟΣ
-    filtered_properties = ALL_PROPERTIES[:] # ΧΡΗΣΗ ΤΗΣ GLOBAL ΜΕΤΑΒΛΗΤΗΣ
-
-    if current_filters['type'] != 'all':
-        filtered_properties = [p for p in filtered_properties if p['type'] == current_filters['type']]
-    if current_filters['location'] != 'all':
-        filtered_properties = [p for p in filtered_properties if p['location_slug'] == current_filters['location']]
-    
-    if current_filters['sort'] == 'price_asc':
-        filtered_properties.sort(key=lambda p: p.get('price', 0) if p.get('price', 0) > 0 else float('inf'))
-    elif current_filters['sort'] == 'price_desc':
-        filtered_properties.sort(key=lambda p: p.get('price', 0), reverse=True)
-
-    return render_template('listings.html', 
-                           properties=filtered_properties, 
-                           current_filters=current_filters,
-                           map_data=map_data)
+    catalog = get_catalog()
+    try:
+        page_properties, next_cursor, total = catalog.page(
+            prop_type=current_filters['type'],
+            location=current_filters['location'],
+            sort=current_filters['sort'],
+            cursor=cursor,
+            limit=LISTINGS_PAGE_SIZE
+        )
+    except ValueError:
+        # Cursor άλλης ταξινόμησης: από την αρχή
+        cursor = None
+        page_properties, next_cursor, total = catalog.page(
+            current_filters['type'], current_filters['location'], current_filters['sort'],
+            limit=LISTINGS_PAGE_SIZE)
+    facets = catalog.facet_counts(current_filters['type'], current_filters['location'])
+
+    cache_args = {name: value for name, value in current_filters.items() if value != 'all'}
+    next_page_url = None
+    if next_cursor:
+        next_args = {name: value for name, value in cache_args.items() if value}
+        next_page_url = url_for('listings_page', **next_args, cursor=next_cursor)
+    if cursor is not None:
+        cache_args['cursor'] = request.args['cursor']
+    if partial:
+        cache_args['partial'] = '1'
+
+    return render_cached('listings', catalog.version, lambda: render_template(
+        'partials/listings-page.html' if partial else 'listings.html',
+        properties=page_properties,
+        total=total,
+        next_page_url=next_page_url,
+        current_filters=current_filters,
+        facets=facets,
+        map_bounds=catalog.spatial.bounds), args=cache_args)
+
+def _int_arg(name):
+    value = request.args.get(name, '').strip()
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f'{name} must be an integer') from None
+
+def _project_property(prop, fields):
+    item = {}
+    for field in fields:
+        if field == 'title':
+            item['title'] = translation_store.translate(g.lang, prop['title_key'])
+        elif field == 'url':
+            item['url'] = url_for('property_single_page', property_id=prop['id'])
+        else:
+            item[field] = prop.get(field)
+    return item
+
+@app.route('/api/properties')
+def properties_api():
+    """
+    Σελιδοποιημένα ακίνητα σε JSON: τα φίλτρα του /listings (type, location,
+    sort), εύρη min_/max_ για price/area/bedrooms, ?fields= για τα πεδία και
+    ?limit=. Η επόμενη σελίδα ζητιέται με το next_cursor της απάντησης.
+    """
+    catalog = get_catalog()
+    args = request.args
+    try:
+        limit = min(max(_int_arg('limit') or LISTINGS_PAGE_SIZE, 1), API_MAX_PAGE_SIZE)
+        ranges = {field: (_int_arg(f'min_{field}'), _int_arg(f'max_{field}')) for field in RANGE_FIELDS}
+        fields = [field for field in args.get('fields', '').split(',') if field] or PROPERTY_API_DEFAULT_FIELDS
+        unknown = [field for field in fields if field not in PROPERTY_API_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        cursor = decode_cursor(args['cursor']) if args.get('cursor') else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    etag = page_etag((catalog.version, sorted(args.items(multi=True)), g.lang))
+    if etag in request.if_none_match:
+        response = Response(status=304, mimetype='application/json')
+    else:
+        try:
+            items, next_cursor, total = catalog.page(
+                prop_type=args.get('type'),
+                location=args.get('location'),
+                sort=args.get('sort', ''),
+                ranges=ranges,
+                cursor=cursor,
+                limit=limit
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        response = jsonify({
+            'items': [_project_property(prop, fields) for prop in items],
+            'next_cursor': next_cursor,
+            'total': total,
+        })
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    if 'title' in fields:
+        response.vary.update(('Cookie', 'Accept-Language'))
+    return response
+
+@app.route('/api/map')
+def map_api():
+    """
+    Τα ακίνητα του viewport (?bbox=west,south,east,north&zoom=) για τον χάρτη
+    του /listings: clusters στα μικρά zoom, μεμονωμένα markers στα μεγάλα.
+    """
+    catalog = get_catalog()
+    try:
+        bbox = parse_bbox(request.args.get('bbox'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    zoom = request.args.get('zoom', '')
+    if not zoom.isdigit():
+        return jsonify({'error': 'zoom must be an integer'}), 400
+    zoom = int(zoom)
+
+    etag = page_etag((catalog.version, bbox, zoom, g.lang))
+    if etag in request.if_none_match:
+        response = Response(status=304, mimetype='application/json')
+    else:
+        clusters, markers = catalog.spatial.query(bbox, zoom)
+        response = jsonify({
+            'clusters': clusters,
+            'markers': [dict(marker, title=translation_store.translate(g.lang, marker['title_key']))
+                        for marker in markers],
+        })
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.vary.update(('Cookie', 'Accept-Language'))
+    return response
+
+SEARCH_MAX_RESULTS = 50
+
+@app.route('/api/search')
+def search_api():
+    """Ακίνητα για το ?q= (π.χ. "vrasna", "Βρασνά"), με φθίνουσα βαθμολογία."""
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'No query provided'}), 400
+    limit = request.args.get('limit', '10')
+    limit = min(max(int(limit), 1), SEARCH_MAX_RESULTS) if limit.isdigit() else 10
+
+    started = time.perf_counter()
+    catalog = get_catalog()
+    search_index.sync(catalog, translation_store)
+    results = []
+    for property_id, score in search_index.search(query, limit):
+        prop = catalog.get(property_id)
+        if prop is None:
+            continue
+        item = _project_property(prop, PROPERTY_API_DEFAULT_FIELDS)
+        item['score'] = score
+        results.append(item)
+
+    response = jsonify({
+        'query': query,
+        'results': results,
+        'took_ms': round((time.perf_counter() - started) * 1000, 2),
+    })
+    response.vary.update(('Cookie', 'Accept-Language'))
+    return response
 
 @app.route('/property/<property_id>')
 def property_single_page(property_id):
-    # properties = load_properties() # <-- ΠΑΛΙΟΣ ΤΡΟΠΟΣ (ΑΡΓΟΣ)
-    
-    # ΧΡΗΣΗ ΤΗΣ GLOBAL ΜΕΤΑΒΛΗΤΗΣ (ΓΙΑ ΤΑΧΥΤΗΤΑ)
-    selected_property = next((prop for prop in ALL_PROPERTIES if prop['id'] == property_id), None)
+    catalog = get_catalog()
+    selected_property = catalog.get(property_id)
     
     if selected_property is None:
         return "Property not found", 404
@@ -297,21 +1029,20 @@ def property_single_page(property_id):
             'price': selected_property.get('price', 0)
         })
 
-    return render_template(
-        'property-single.html', 
-        prop=selected_property, 
-        map_data=map_data)
+    # Εξαρτάται μόνο από το ίδιο το ακίνητο και τους μετρητές του footer, οπότε
+    # η αλλαγή ενός ακινήτου δεν ακυρώνει τις σελίδες των υπολοίπων
+    key = (catalog.property_version(property_id), catalog.context_version)
+    return render_cached(f'property:{property_id}', key, lambda: render_template(
+        'property-single.html',
+        prop=selected_property,
+        map_data=map_data))
 
 @app.route('/project-kerdylia')
 def project_kerdylia_page():
-    # all_properties = load_properties() # <-- ΠΑΛΙΟΣ ΤΡΟΠΟΣ (ΑΡΓΟΣ)
-    
-    # ΧΡΗΣΗ ΤΗΣ GLOBAL ΜΕΤΑΒΛΗΤΗΣ (ΓΙΑ ΤΑΧΥΤΗΤΑ)
-    project_properties = [
-        prop for prop in ALL_PROPERTIES 
-        if prop.get("project_id") == "kerdylia_riviera"
-    ]
-    return render_template('project-kerdylia.html', properties=project_properties)
+    catalog = get_catalog()
+    project_properties = catalog.in_project("kerdylia_riviera")
+    return render_cached('project-kerdylia', catalog.version, lambda: render_template(
+        'project-kerdylia.html', properties=project_properties))
 
 @app.route('/contact', methods=['GET', 'POST'])
 def contact_page():
@@ -351,36 +1082,26 @@ def contact_page():
     return render_template('contact.html')
 
 def send_email_logic(subject, body):
+    """
+    Αποθηκεύει το email στο outbox και επιστρέφει αμέσως· η αποστολή γίνεται
+    από τον background sender με επαναλήψεις, οπότε κανένα lead δεν χάνεται.
+    """
     if not MAIL_USERNAME or not MAIL_PASSWORD:
-        print("!!! MAIL_USERNAME or MAIL_PASSWORD not set in environment variables. Email not sent.")
-        return False
-
-    em = EmailMessage()
-    em['From'] = MAIL_USERNAME
-    em['To'] = MAIL_RECEIVER
-    em['Subject'] = subject
-    em.set_content(body)
-
-    context = ssl.create_default_context()
+        print("!!! MAIL_USERNAME or MAIL_PASSWORD not set in environment variables. Email kept in outbox until they are.")
 
     try:
-        with smtplib.SMTP('smtp.office365.com', 587) as smtp:
-            smtp.starttls(context=context)
-            smtp.login(MAIL_USERNAME, MAIL_PASSWORD)
-            smtp.send_message(em)
-        print("Email sent successfully!")
+        mail_outbox.enqueue(subject, body)
         return True
     except Exception as e:
-        try:
-            with smtplib.SMTP_SSL('smtp.gmail.com', 465, context=context) as smtp:
-                smtp.login(MAIL_USERNAME, MAIL_PASSWORD)
-                smtp.send_message(em)
-            print("Email sent successfully via GMail fallback!")
-            return True
-        except Exception as e_gmail:
-            print(f"Error sending email via Office365: {e}")
-            print(f"Error sending email via GMail: {e_gmail}")
-            return False
+        db.session.rollback()
+        print(f"Error storing email in outbox: {e}")
+        return False
+
+@app.route('/api/outbox/stats')
+@admin_token_required
+def outbox_stats():
+    """Πλήθος emails του outbox ανά κατάσταση (pending/sending/sent/failed)."""
+    return jsonify(mail_outbox.stats())
 
 @app.route('/send_message', methods=['POST'])
 def send_message():
@@ -431,18 +1152,16 @@ def get_existing_data():
     features = {}
     try:
         # Παίρνουμε τις τοποθεσίες από το properties.json
-        with open('static/js/data/properties.json', 'r', encoding='utf-8') as f:
-            properties = json.load(f)
-            for prop in properties:
-                if 'location' in prop:
-                    locations.add(prop['location'])
+        properties = read_json('static/js/data/properties.json')
+        for prop in properties:
+            if 'location' in prop:
+                locations.add(prop['location'])
         
         # Παίρνουμε τα features από το el.json
-        with open('static/js/data/i18n/el.json', 'r', encoding='utf-8') as f:
-            translations = json.load(f)
-            for key, value in translations.items():
-                if key.startswith('feature_'):
-                    features[key] = value # π.χ. {'feature_parking': 'Ιδιωτικό Πάρκινγκ'}
+        translations = read_json('static/js/data/i18n/el.json')
+        for key, value in translations.items():
+            if key.startswith('feature_'):
+                features[key] = value # π.χ. {'feature_parking': 'Ιδιωτικό Πάρκινγκ'}
     except Exception as e:
         print(f"Could not load existing data: {e}")
         
@@ -460,11 +1179,8 @@ def edit_page(property_id):
         properties_path = 'static/js/data/properties.json'
         el_path = 'static/js/data/i18n/el.json'
 
-        with open(properties_path, 'r', encoding='utf-8') as f:
-            properties_list = json.load(f)
-        
-        with open(el_path, 'r', encoding='utf-8') as f:
-            translations = json.load(f)
+        properties_list = read_json(properties_path)
+        translations = read_json(el_path)
 
         # Βρίσκουμε το συγκεκριμένο ακίνητο που θέλουμε να επεξεργαστούμε
         property_to_edit = next((p for p in properties_list if p.get('id') == property_id), None)
@@ -498,151 +1214,209 @@ def add_new_feature_to_all_languages(feature_key, greek_label):
 
     # 1. Ενημέρωση του Ελληνικού αρχείου
     try:
-        el_path = 'static/js/data/i18n/el.json'
-        with open(el_path, 'r+', encoding='utf-8') as f:
-            translations = json.load(f)
-            if feature_key in translations:
-                print(f"Feature key '{feature_key}' already exists. Skipping addition.")
-                return # Αν υπάρχει ήδη, δεν κάνουμε τίποτα
-            translations[feature_key] = greek_label
-            f.seek(0); f.truncate()
-            json.dump(translations, f, ensure_ascii=False, indent=4)
+        if feature_key in catalog_backend.get_translations('el'):
+            print(f"Feature key '{feature_key}' already exists. Skipping addition.")
+            return # Αν υπάρχει ήδη, δεν κάνουμε τίποτα
+        catalog_backend.set_translations('el', {feature_key: greek_label})
     except Exception as e:
         print(f"ERROR updating el.json with new feature: {e}")
         return # Αν αποτύχει εδώ, δεν συνεχίζουμε
 
-    # 2. Μετάφραση και ενημέρωση των υπολοίπων γλωσσών
+    # 2. Μετάφραση (όλες οι γλώσσες ταυτόχρονα) και ενημέρωση των υπολοίπων αρχείων
+    print(f"--- Translating new feature '{feature_key}' to {len(LANGUAGES)} languages ---")
+    all_translations = translation_engine.translate({"label": greek_label}, LANGUAGES)
+
     for lang_name, lang_code in LANGUAGES.items():
-        print(f"--- Translating new feature for {lang_name} ---")
-        
         # Μεταφράζουμε μόνο την ετικέτα
-        translated_label = translate_texts_with_gemini({"label": greek_label}, lang_name).get("label", f"[TRANSLATION_FAILED] {greek_label}")
-        
-        lang_path = f'static/js/data/i18n/{lang_code}.json'
+        translated_label = all_translations[lang_code].get("label", f"[TRANSLATION_FAILED] {greek_label}")
         try:
-            with open(lang_path, 'r+', encoding='utf-8') as f:
-                translations = json.load(f)
-                translations[feature_key] = translated_label
-                f.seek(0); f.truncate()
-                json.dump(translations, f, ensure_ascii=False, indent=4)
+            catalog_backend.set_translations(lang_code, {feature_key: translated_label})
             print(f"Updated {lang_code}.json with new feature '{feature_key}'.")
         except Exception as e:
             print(f"ERROR updating {lang_code}.json with new feature: {e}")
 
+def save_uploaded_images(uploaded_files, property_id):
+    """Αποθηκεύει τις εικόνες του αιτήματος και επιστρέφει [(filename, web_path)]."""
+    saved = []
+    property_image_dir = os.path.join('static', 'assets', 'images', 'properties', property_id)
+    os.makedirs(property_image_dir, exist_ok=True)
+
+    for file in uploaded_files:
+        if file.filename:
+            filename = secure_filename(file.filename)
+            save_path = os.path.join(property_image_dir, filename)
+            file.save(save_path)
+            web_path = save_path.replace(os.path.sep, '/').replace('static/', '')
+            saved.append((filename, web_path))
+    return saved
+
+def write_property_translations(title_key, description_key, greek_texts, report=None):
+    """Γράφει τίτλο/περιγραφή στα ελληνικά και τις μεταφράσεις τους σε όλες τις γλώσσες."""
+    catalog_backend.set_translations('el', {
+        title_key: greek_texts['title'],
+        description_key: greek_texts['description']
+    })
+
+    if report:
+        report('translating')
+    all_translations = translation_engine.translate(greek_texts, LANGUAGES)
+    for lang_name, lang_code in LANGUAGES.items():
+        translated_texts = all_translations[lang_code]
+        try:
+            catalog_backend.set_translations(lang_code, {
+                title_key: translated_texts.get('title'),
+                description_key: translated_texts.get('description')
+            })
+        except Exception as e:
+            print(f"Could not update {lang_code}.json: {e}")
+
+def parse_property_form(data):
+    """
+    Ελέγχει και μετατρέπει τα πεδία της φόρμας ακινήτου πριν μπουν σε ουρά,
+    ώστε η εργασία να μην αποτύχει (και να ξαναδοκιμάζεται) σε άκυρη είσοδο.
+    ValueError με μήνυμα για τον χρήστη αν κάποιο πεδίο δεν είναι έγκυρο.
+    """
+    location = data.get('new_location') if data.get('location') == 'add_new_location' else data.get('location')
+    location = (location or '').strip()
+    if not location:
+        raise ValueError('Η τοποθεσία είναι υποχρεωτική.')
+    location_slug = re.sub(r'[^a-z0-9]+', '-', location.lower()).strip('-')
+    prop_type = (data.get('type') or '').strip()
+    if not prop_type:
+        raise ValueError('Ο τύπος ακινήτου είναι υποχρεωτικός.')
+
+    fields = {'location': location, 'location_slug': location_slug, 'type': prop_type}
+    for name in ('price', 'area', 'bedrooms', 'bathrooms'):
+        value = (data.get(name) or '0').strip()
+        try:
+            fields[name] = int(value)
+        except ValueError:
+            raise ValueError(f'Το πεδίο "{name}" πρέπει να είναι ακέραιος αριθμός.') from None
+        if fields[name] < 0:
+            raise ValueError(f'Το πεδίο "{name}" δεν μπορεί να είναι αρνητικό.')
+    if prop_type == 'plot':
+        fields['bedrooms'] = fields['bathrooms'] = 0
+    return fields
+
+def job_response(message, job_id, **extra):
+    """Άμεση απάντηση 202 με το id της εργασίας για polling στο /api/jobs/<id>."""
+    body = {'message': message, 'job_id': job_id, 'status_url': f'/api/jobs/{job_id}'}
+    body.update(extra)
+    return jsonify(body), 202
+
 @app.route('/api/update_property/<string:property_id>', methods=['POST'])
 def update_property(property_id):
     """
-    Ενημερώνει ένα υπάρχον ακίνητο, συμπεριλαμβανομένης της πλήρους διαχείρισης εικόνων
-    (προσθήκη νέων, διαγραφή παλιών, αλλαγή σειράς και κύριας εικόνας).
+    Δέχεται την ενημέρωση ενός ακινήτου: αποθηκεύει αμέσως τις νέες εικόνες
+    και βάζει σε ουρά τα υπόλοιπα (properties.json, διαγραφές, μεταφράσεις).
     """
     try:
-        data = request.form.to_dict()
-        newly_uploaded_files = request.files.getlist('images')
-
-        properties_path = 'static/js/data/properties.json'
-        with open(properties_path, 'r+', encoding='utf-8') as f:
-            properties_list = json.load(f)
-            
-            prop_index = next((i for i, p in enumerate(properties_list) if p.get('id') == property_id), -1)
-            
-            if prop_index == -1:
-                return jsonify({'message': 'Property not found to update'}), 404
-
-            prop_to_update = properties_list[prop_index]
-            original_image_paths = prop_to_update.get('images', [])
-
-            # --- 1. Διαχείριση Εικόνων ---
-            final_image_paths = []
-            
-            # Παίρνουμε τη λίστα με τις υπάρχουσες εικόνες που ο χρήστης κράτησε (και τη νέα τους σειρά)
-            kept_existing_images_str = request.form.get('existing_images', '')
-            kept_existing_images = kept_existing_images_str.split(',') if kept_existing_images_str else []
-            
-            # Προσθέτουμε τις νέες εικόνες
-            new_image_paths = []
-            property_image_dir = os.path.join('static', 'assets', 'images', 'properties', property_id)
-            os.makedirs(property_image_dir, exist_ok=True)
-            
-            for file in newly_uploaded_files:
-                if file.filename:
-                    filename = secure_filename(file.filename)
-                    save_path = os.path.join(property_image_dir, filename)
-                    file.save(save_path)
-                    web_path = save_path.replace(os.path.sep, '/').replace('static/', '')
-                    new_image_paths.append(web_path)
-
-            # Συνθέτουμε την τελική λίστα εικόνων με βάση τη σειρά που έστειλε το frontend
-            final_ordered_paths_str = request.form.get('final_image_order', '')
-            final_ordered_paths = final_ordered_paths_str.split(',') if final_ordered_paths_str else []
-
-            # Διαγραφή των παλιών εικόνων που αφαιρέθηκαν
-            images_to_delete = set(original_image_paths) - set(kept_existing_images)
-            for img_path in images_to_delete:
-                try:
-                    full_path = os.path.join('static', img_path)
-                    if os.path.exists(full_path):
-                        os.remove(full_path)
-                        print(f"Deleted image: {full_path}")
-                except Exception as e:
-                    print(f"Error deleting image {img_path}: {e}")
-
-            prop_to_update['images'] = final_ordered_paths
-            
-            # Ενημέρωση της κύριας εικόνας
-            main_image_path = request.form.get('main_image')
-            if main_image_path in final_ordered_paths:
-                prop_to_update['main_image'] = main_image_path
-            elif final_ordered_paths:
-                prop_to_update['main_image'] = final_ordered_paths[0] # Fallback στην πρώτη
-            else:
-                prop_to_update['main_image'] = "assets/images/placeholder.webp"
-
-            # --- 2. Ενημέρωση των υπόλοιπων πεδίων ---
-            location = data['new_location'] if data.get('location') == 'add_new_location' else data.get('location')
-            prop_to_update['location'] = location
-            prop_to_update['location_slug'] = re.sub(r'[^a-z0-9]+', '-', location.lower()).strip('-')
-            prop_to_update['type'] = data.get('type')
-            prop_to_update['price'] = int(data.get('price', 0))
-            prop_to_update['area'] = int(data.get('area', 0))
-            prop_to_update['bedrooms'] = int(data.get('bedrooms', 0)) if data.get('type') != 'plot' else 0
-            prop_to_update['bathrooms'] = int(data.get('bathrooms', 0)) if data.get('type') != 'plot' else 0
-            prop_to_update['features_keys'] = request.form.getlist('features_keys')
-            
-            # --- 3. Αποθήκευση στο properties.json ---
-            f.seek(0)
-            f.truncate()
-            json.dump(properties_list, f, ensure_ascii=False, indent=4)
-
-        # --- 4. Ενημέρωση Μεταφράσεων ---
-        greek_texts = {"title": data.get('title'), "description": data.get('description')}
-        el_path = 'static/js/data/i18n/el.json'
-        with open(el_path, 'r+', encoding='utf-8') as f:
-            translations = json.load(f)
-            translations[prop_to_update['title_key']] = greek_texts['title']
-            translations[prop_to_update['description_key']] = greek_texts['description']
-            f.seek(0); f.truncate()
-            json.dump(translations, f, ensure_ascii=False, indent=4)
-
-        for lang_name, lang_code in LANGUAGES.items():
-            translated_texts = translate_texts_with_gemini(greek_texts, lang_name)
-            lang_path = f'static/js/data/i18n/{lang_code}.json'
-            try:
-                with open(lang_path, 'r+', encoding='utf-8') as f:
-                    translations = json.load(f)
-                    translations[prop_to_update['title_key']] = translated_texts.get('title')
-                    translations[prop_to_update['description_key']] = translated_texts.get('description')
-                    f.seek(0); f.truncate()
-                    json.dump(translations, f, ensure_ascii=False, indent=4)
-            except Exception as e:
-                print(f"Could not update {lang_code}.json: {e}")
-
-        return jsonify({'message': f'Το ακίνητο "{property_id}" ενημερώθηκε με επιτυχία!'}), 200
+        if get_catalog().get(property_id) is None:
+            return jsonify({'message': 'Property not found to update'}), 404
+        try:
+            fields = parse_property_form(request.form)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+
+        # Οι νέες εικόνες πρέπει να γραφτούν τώρα, όσο υπάρχει το αίτημα
+        save_uploaded_images(request.files.getlist('images'), property_id)
+
+        kept_existing_images_str = request.form.get('existing_images', '')
+        final_ordered_paths_str = request.form.get('final_image_order', '')
+        payload = {
+            'property_id': property_id,
+            'data': request.form.to_dict(),
+            'fields': fields,
+            'features_keys': request.form.getlist('features_keys'),
+            'kept_existing_images': kept_existing_images_str.split(',') if kept_existing_images_str else [],
+            'final_ordered_paths': final_ordered_paths_str.split(',') if final_ordered_paths_str else [],
+            'main_image': request.form.get('main_image')
+        }
+        job_id = job_queue.enqueue('update_property', payload, serial_key=f'property:{property_id}')
+        return job_response(f'Η ενημέρωση του ακινήτου "{property_id}" μπήκε σε ουρά.', job_id)
 
     except Exception as e:
         import traceback
         traceback.print_exc()
         return jsonify({'message': f'Παρουσιάστηκε σφάλμα κατά την ενημέρωση: {e}'}), 500
 
+@job_queue.handler('update_property')
+def run_update_property_job(payload, report):
+    """
+    Ενημερώνει ένα υπάρχον ακίνητο, συμπεριλαμβανομένης της πλήρους διαχείρισης εικόνων
+    (προσθήκη νέων, διαγραφή παλιών, αλλαγή σειράς και κύριας εικόνας).
+    Οι εικόνες που αφαιρέθηκαν σβήνονται μόνο αφού αποθηκευτεί το ακίνητο,
+    οπότε μια αποτυχία πριν από αυτό αφήνει τα αρχεία όπως ήταν και η
+    εργασία μπορεί να ξανατρέξει.
+    """
+    property_id = payload['property_id']
+    data = payload['data']
+    # Εργασίες που μπήκαν σε ουρά πριν από τον έλεγχο της φόρμας δεν έχουν 'fields'
+    fields = payload.get('fields') or parse_property_form(data)
+
+    prop_to_update = catalog_backend.get_property(property_id)
+    if prop_to_update is None:
+        raise LookupError(f'Property "{property_id}" not found to update')
+
+    # --- 1. Διαχείριση Εικόνων ---
+    report('images')
+    original_image_paths = prop_to_update.get('images', [])
+    final_ordered_paths = payload['final_ordered_paths']
+
+    images_to_delete = set(original_image_paths) - set(payload['kept_existing_images'])
+
+    prop_to_update['images'] = final_ordered_paths
+    # Παράγωγα (thumb/card/gallery/full) μόνο για όσες εικόνες δεν έχουν ήδη
+    prop_to_update['image_variants'] = build_image_variants(
+        final_ordered_paths, prop_to_update.get('image_variants'))
+
+    # Ενημέρωση της κύριας εικόνας
+    main_image_path = payload['main_image']
+    if main_image_path in final_ordered_paths:
+        prop_to_update['main_image'] = main_image_path
+    elif final_ordered_paths:
+        prop_to_update['main_image'] = final_ordered_paths[0] # Fallback στην πρώτη
+    else:
+        prop_to_update['main_image'] = "assets/images/placeholder.webp"
+
+    # --- 2. Ενημέρωση των υπόλοιπων πεδίων (ελεγμένα στο update_property) ---
+    prop_to_update.update(fields)
+    prop_to_update['features_keys'] = payload['features_keys']
+
+    # --- 3. Αποθήκευση (μόνο αυτό το ακίνητο) ---
+    report('saving')
+    catalog_backend.save_property(prop_to_update)
+    catalog_store.reload()
+    invalidate_property_pages(property_id)
+
+    # Διαγραφή των παλιών εικόνων που αφαιρέθηκαν (μαζί με τα παράγωγά τους),
+    # μόνο τώρα που το properties.json δεν τις αναφέρει πια
+    for img_path in images_to_delete:
+        try:
+            full_path = os.path.join('static', img_path)
+            if os.path.exists(full_path):
+                os.remove(full_path)
+                print(f"Deleted image: {full_path}")
+            remove_variants(img_path)
+        except Exception as e:
+            print(f"Error deleting image {img_path}: {e}")
+
+    # --- 4. Ενημέρωση Μεταφράσεων ---
+    greek_texts = {"title": data.get('title'), "description": data.get('description')}
+    write_property_translations(prop_to_update['title_key'], prop_to_update['description_key'], greek_texts, report)
+    search_index.sync(catalog_store.current(), translation_store)
+
+    return {'message': f'Το ακίνητο "{property_id}" ενημερώθηκε με επιτυχία!', 'property_id': property_id}
+
+@app.route('/api/jobs/<string:job_id>')
+@admin_token_required
+def job_status(job_id):
+    """Κατάσταση μιας εργασίας της ουράς (queued/running/done/failed) για polling από το admin."""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'message': 'Job not found'}), 404
+    return jsonify(job)
+
 @app.route('/admin/dashboard')
 def dashboard():
     """Εμφανίζει τη λίστα όλων των ακινήτων για διαχείριση."""
@@ -650,11 +1424,8 @@ def dashboard():
         properties_path = 'static/js/data/properties.json'
         el_path = 'static/js/data/i18n/el.json'
 
-        with open(properties_path, 'r', encoding='utf-8') as f:
-            properties_data = json.load(f)
-        
-        with open(el_path, 'r', encoding='utf-8') as f:
-            translations_data = json.load(f)
+        properties_data = read_json(properties_path)
+        translations_data = read_json(el_path)
 
         # Συνδυάζουμε τα δεδομένα για να τα στείλουμε στο template
         # Θέλουμε τον πραγματικό τίτλο, όχι μόνο το κλειδί
@@ -691,6 +1462,10 @@ def admin_page():
 
 @app.route('/api/add_property', methods=['POST'])
 def add_property():
+    """
+    Δέχεται νέο ακίνητο: ελέγχει το ID, αποθηκεύει αμέσως τις εικόνες και
+    βάζει σε ουρά την εγγραφή στα JSON αρχεία και τις μεταφράσεις.
+    """
     try:
         data = request.form.to_dict()
         uploaded_files = request.files.getlist('images')
@@ -700,103 +1475,130 @@ def add_property():
         if not new_id:
             return jsonify({'message': 'Το πεδίο ID είναι υποχρεωτικό.'}), 400
 
-        properties_path = 'static/js/data/properties.json'
-        with open(properties_path, 'r', encoding='utf-8') as f:
-            properties_list = json.load(f)
-        
-        existing_ids = {p['id'] for p in properties_list}
-        if new_id in existing_ids:
+        # Και όσα δεν έχουν γραφτεί ακόμη: μια προσθήκη (ή διπλό submit) στην ουρά
+        if get_catalog().get(new_id) is not None or job_queue.pending(f'property:{new_id}'):
             return jsonify({'message': f'Το ID "{new_id}" υπάρχει ήδη. Παρακαλώ επιλέξτε ένα μοναδικό ID.'}), 409
+        try:
+            fields = parse_property_form(data)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
 
-        # --- 2. Δυναμική Προσθήκη Νέου Χαρακτηριστικού (Feature) ---
-        new_feature_key = data.get('new_feature_key')
-        new_feature_label = data.get('new_feature_label')
-        if new_feature_key and new_feature_label:
-            add_new_feature_to_all_languages(new_feature_key, new_feature_label)
-
-        # --- 3. Δημιουργία Αντικειμένου Ακινήτου ---
-        new_property = {
-            'id': new_id,
-            'title_key': f"prop_title_{new_id}",
-            'description_key': f"prop_desc_{new_id}"
-        }
-        
-        location = data['new_location'] if data.get('location') == 'add_new_location' else data.get('location')
-        
-        new_property['location'] = location
-        new_property['location_slug'] = re.sub(r'[^a-z0-9]+', '-', location.lower()).strip('-')
-        new_property['status'] = "for_sale"
-        new_property['type'] = data.get('type')
-        new_property['price'] = int(data.get('price', 0))
-        new_property['area'] = int(data.get('area', 0))
-        new_property['bedrooms'] = int(data.get('bedrooms', 0)) if data.get('type') != 'plot' else 0
-        new_property['bathrooms'] = int(data.get('bathrooms', 0)) if data.get('type') != 'plot' else 0
-        new_property['lat'] = None
-        new_property['lon'] = None
-        
-        selected_features = request.form.getlist('features_keys')
-        if new_feature_key and new_feature_key not in selected_features:
-            selected_features.append(new_feature_key)
-        new_property['features_keys'] = selected_features
-
-        # --- 4. Διαχείριση Εικόνων ---
+        # --- 2. Διαχείριση Εικόνων ---
         image_paths = []
         main_image_filename = data.get('main_image_filename')
         main_image_path = "assets/images/placeholder.webp"
 
         if uploaded_files and uploaded_files[0].filename:
-            property_image_dir = os.path.join('static', 'assets', 'images', 'properties', new_id)
-            os.makedirs(property_image_dir, exist_ok=True)
-            
-            for file in uploaded_files:
-                filename = secure_filename(file.filename)
-                save_path = os.path.join(property_image_dir, filename)
-                file.save(save_path)
-                web_path = save_path.replace(os.path.sep, '/').replace('static/', '')
+            for filename, web_path in save_uploaded_images(uploaded_files, new_id):
                 image_paths.append(web_path)
-                
                 if filename == main_image_filename:
                     main_image_path = web_path
         
         if not main_image_filename and image_paths:
             main_image_path = image_paths[0]
 
-        new_property['images'] = image_paths
-        new_property['main_image'] = main_image_path
-
-        # --- 5. Αποθήκευση στα JSON αρχεία ---
-        properties_list.append(new_property)
-        with open(properties_path, 'w', encoding='utf-8') as f:
-            json.dump(properties_list, f, ensure_ascii=False, indent=4)
-        
-        greek_texts = {"title": data.get('title'), "description": data.get('description')}
-        el_path = 'static/js/data/i18n/el.json'
-        with open(el_path, 'r+', encoding='utf-8') as f:
-            translations = json.load(f)
-            translations[new_property['title_key']] = greek_texts['title']
-            translations[new_property['description_key']] = greek_texts['description']
-            f.seek(0); f.truncate()
-            json.dump(translations, f, ensure_ascii=False, indent=4)
-
-        for lang_name, lang_code in LANGUAGES.items():
-            translated_texts = translate_texts_with_gemini(greek_texts, lang_name)
-            lang_path = f'static/js/data/i18n/{lang_code}.json'
-            try:
-                with open(lang_path, 'r+', encoding='utf-8') as f:
-                    translations = json.load(f)
-                    translations[new_property['title_key']] = translated_texts.get('title')
-                    translations[new_property['description_key']] = translated_texts.get('description')
-                    f.seek(0); f.truncate()
-                    json.dump(translations, f, ensure_ascii=False, indent=4)
-            except Exception as e:
-                print(f"Could not update {lang_code}.json: {e}")
-
-        return jsonify({'message': 'Το ακίνητο και οι μεταφράσεις αποθηκεύτηκαν!', 'new_id': new_id}), 200
+        # Το id της εργασίας γράφεται στο ακίνητο: έτσι μια επανάληψή της το αναγνωρίζει
+        job_id = uuid.uuid4().hex
+        payload = {
+            'data': data,
+            'fields': fields,
+            'features_keys': request.form.getlist('features_keys'),
+            'images': image_paths,
+            'main_image': main_image_path,
+            'job_id': job_id
+        }
+        job_queue.enqueue('add_property', payload, job_id=job_id, serial_key=f'property:{new_id}')
+        return job_response('Το ακίνητο μπήκε σε ουρά για αποθήκευση και μετάφραση.', job_id, new_id=new_id)
 
     except Exception as e:
         import traceback
         traceback.print_exc()
         return jsonify({'message': f'Παρουσιάστηκε ένα γενικό σφάλμα: {e}'}), 500
 
+@job_queue.handler('add_property')
+def run_add_property_job(payload, report):
+    """
+    Γράφει το νέο ακίνητο και τις μεταφράσεις του. Αποτυγχάνει αν το id υπάρχει
+    ήδη, εκτός αν το έγραψε η ίδια εργασία σε προηγούμενη προσπάθεια (upsert).
+    """
+    data = payload['data']
+    new_id = data['id']
+    fields = payload.get('fields') or parse_property_form(data)
+    job_id = payload.get('job_id')
+
+    # Οι εργασίες ενός ακινήτου τρέχουν μία-μία (serial_key): κανείς δεν το γράφει ανάμεσα
+    existing = catalog_backend.get_property(new_id)
+    if existing is not None and (job_id is None or existing.get('added_by_job') != job_id):
+        raise JobFailed(f'Το ID "{new_id}" υπάρχει ήδη.')
+
+    # --- 1. Δυναμική Προσθήκη Νέου Χαρακτηριστικού (Feature) ---
+    new_feature_key = data.get('new_feature_key')
+    new_feature_label = data.get('new_feature_label')
+    if new_feature_key and new_feature_label:
+        report('new feature')
+        add_new_feature_to_all_languages(new_feature_key, new_feature_label)
+
+    # --- 2. Δημιουργία Αντικειμένου Ακινήτου ---
+    new_property = {
+        'id': new_id,
+        'title_key': f"prop_title_{new_id}",
+        'description_key': f"prop_desc_{new_id}"
+    }
+    if job_id:
+        new_property['added_by_job'] = job_id
+    
+    new_property.update(fields)
+    new_property['status'] = "for_sale"
+    new_property['lat'] = None
+    new_property['lon'] = None
+    
+    selected_features = payload['features_keys']
+    if new_feature_key and new_feature_key not in selected_features:
+        selected_features.append(new_feature_key)
+    new_property['features_keys'] = selected_features
+    new_property['images'] = payload['images']
+    new_property['main_image'] = payload['main_image']
+    report('images')
+    new_property['image_variants'] = build_image_variants(payload['images'])
+
+    # --- 3. Αποθήκευση ---
+    # Upsert: σε επανάληψη της ίδιας εργασίας αντικαθιστούμε την εγγραφή αντί να τη διπλασιάσουμε
+    report('saving')
+    catalog_backend.save_property(new_property)
+    catalog_store.reload()
+    invalidate_property_pages(new_id)
+    
+    greek_texts = {"title": data.get('title'), "description": data.get('description')}
+    write_property_translations(new_property['title_key'], new_property['description_key'], greek_texts, report)
+    search_index.sync(catalog_store.current(), translation_store)
+
+    return {'message': 'Το ακίνητο και οι μεταφράσεις αποθηκεύτηκαν!', 'new_id': new_id}
+
+def preload():
+    """
+    Για gunicorn --preload (βλ. gunicorn.conf.py): ό,τι αλλιώς θα έχτιζε κάθε
+    worker στο πρώτο του αίτημα χτίζεται μία φορά στον master και μοιράζεται
+    copy-on-write με τους workers. Το ευρετήριο αναζήτησης μένει εκτός με
+    PRELOAD_SEARCH_INDEX=0 (γρηγορότερο boot του master σε μεγάλους καταλόγους).
+    """
+    if os.environ.get('PRELOAD_SEARCH_INDEX', '1') == '1':
+        with startup.phase('search index'):
+            search_index.sync(catalog_store.current(), translation_store)
+    with startup.phase('templates'):
+        for name in app.jinja_env.list_templates():
+            app.jinja_env.get_template(name)
+    # Το CSS bundle και τα .br/.gz που δεν έγραψε το build_assets.py, πριν από
+    # το πρώτο request (το request σερβίρει μόνο έτοιμα variants)
+    with startup.phase('precompress'):
+        entry = 'css/main.css'
+        try:
+            css_bundles.setdefault(entry, CssBundle(asset_manifest.static_dir, entry)).current()
+        except Exception as e:
+            print(f"Error building CSS bundle for {entry}: {e}")
+        precompress_all(asset_manifest.static_dir)
+
+startup.mark('routes')
+print(startup.summary())
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
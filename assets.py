@@ -0,0 +1,284 @@
+# assets.py
+"""
+Σερβίρισμα των static αρχείων με fingerprint, προσυμπιεσμένα variants και Range.
+
+- Το url_for('static', filename=...) δίνει URL με το hash του περιεχομένου,
+  π.χ. js/main.3f2a1b9c0d4e.js (βλ. AssetManifest.hashed). Επειδή το URL
+  αλλάζει μόλις αλλάξει το αρχείο, τα hashed URLs σερβίρονται με
+  "Cache-Control: immutable" για ένα χρόνο και ο browser δεν ξαναρωτά.
+- Για τα αρχεία κειμένου (css/js/json/svg...) υπάρχουν .br/.gz δίπλα στο
+  πρωτότυπο (build_assets.py ή το preload του gunicorn) και επιλέγονται με
+  βάση το Accept-Encoding. Το request δεν συμπιέζει ποτέ: αν ένα variant
+  λείπει ή είναι παλιό (π.χ. i18n μετά από admin save), σερβίρεται το
+  αρχικό αρχείο και η συμπίεση γίνεται σε background thread.
+- Τα υπόλοιπα (π.χ. τα videos) σερβίρονται με υποστήριξη Range (206).
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import queue
+import re
+import threading
+
+from flask import request, send_file
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # Χωρίς το Brotli σερβίρεται μόνο gzip
+    brotli = None
+
+HASH_LENGTH = 12
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'no-cache'
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.json', '.svg', '.html', '.txt', '.xml', '.map'}
+MIN_COMPRESS_SIZE = 1024
+MANIFEST_NAME = 'assets-manifest.json'
+# Με προτεραιότητα: πρώτα brotli, μετά gzip
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+_HASHED_NAME = re.compile(r'^(?P<base>.+)\.(?P<hash>[0-9a-f]{%d})(?P<ext>\.[^./]+)$' % HASH_LENGTH)
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+def hashed_name(filename, digest):
+    base, ext = os.path.splitext(filename)
+    return f"{base}.{digest}{ext}"
+
+
+def is_compressible(filename):
+    return os.path.splitext(filename)[1].lower() in COMPRESSIBLE_EXTENSIONS
+
+
+def _write_atomic(path, data):
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def precompress(path):
+    """
+    Γράφει path.gz (και path.br αν υπάρχει το Brotli) όταν λείπουν ή είναι
+    παλιότερα από το αρχείο. Variant που δεν είναι μικρότερο δεν κρατιέται.
+    """
+    if os.path.getsize(path) < MIN_COMPRESS_SIZE:
+        return []
+    source_mtime = os.path.getmtime(path)
+    data = None
+    written = []
+    for encoding, suffix in ENCODINGS:
+        if encoding == 'br' and brotli is None:
+            continue
+        target = path + suffix
+        if os.path.exists(target) and os.path.getmtime(target) >= source_mtime:
+            continue
+        if data is None:
+            with open(path, 'rb') as f:
+                data = f.read()
+        if encoding == 'br':
+            compressed = brotli.compress(data, quality=11)
+        else:
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(compressed) < len(data):
+            _write_atomic(target, compressed)
+            written.append(target)
+        elif os.path.exists(target):
+            os.remove(target)
+    return written
+
+
+def precompress_all(static_dir):
+    """Προσυμπιέζει όσα αρχεία κειμένου του static_dir δεν έχουν ήδη φρέσκα variants."""
+    written = 0
+    for root, dirs, files in os.walk(static_dir):
+        for name in files:
+            if is_compressible(name) and '.tmp' not in name:
+                try:
+                    written += len(precompress(os.path.join(root, name)))
+                except OSError as e:
+                    print(f"Could not precompress {name}: {e}")
+    return written
+
+
+class BackgroundCompressor:
+    """
+    Γράφει τα variants που λείπουν σε ένα background thread ανά process, έξω
+    από το request. Κάθε αρχείο δοκιμάζεται μία φορά ανά (mtime, size).
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._attempted = {}  # path -> stamp της τελευταίας προσπάθειας
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def submit(self, path):
+        try:
+            stamp = _stamp(path)
+        except OSError:
+            return
+        with self._lock:
+            if self._attempted.get(path) == stamp:
+                return
+            self._attempted[path] = stamp
+            # Το thread ξεκινά τεμπέλικα και ξανά μετά από fork (gunicorn workers)
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._queue = queue.Queue()
+                threading.Thread(target=self._run, name='precompress', daemon=True).start()
+            self._queue.put(path)
+
+    def _run(self):
+        while True:
+            path = self._queue.get()
+            try:
+                precompress(path)
+            except OSError as e:
+                print(f"Could not precompress {path}: {e}")
+
+
+_compressor = BackgroundCompressor()
+
+
+class AssetManifest:
+    """
+    Αντιστοίχιση αρχείο -> hash περιεχομένου. Κάθε εγγραφή έχει το (mtime, size)
+    του αρχείου, οπότε αρχεία που αλλάζουν όσο τρέχει το app (π.χ. i18n/*.json
+    από το admin, νέες εικόνες) παίρνουν αμέσως νέο hash.
+    """
+
+    def __init__(self, static_dir):
+        self.static_dir = static_dir
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Φορτώνει το manifest του build_assets.py, αν υπάρχει, για να μη χρειαστεί hashing."""
+        path = os.path.join(self.static_dir, MANIFEST_NAME)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        self._entries = {name: (tuple(entry['stamp']), entry['hash']) for name, entry in entries.items()}
+
+    def save(self):
+        entries = {name: {'hash': digest, 'stamp': list(stamp)}
+                   for name, (stamp, digest) in sorted(self._entries.items())}
+        _write_atomic(os.path.join(self.static_dir, MANIFEST_NAME),
+                      json.dumps(entries, indent=1, ensure_ascii=False).encode('utf-8'))
+
+    def digest(self, filename):
+        """Το hash του αρχείου ή None αν δεν υπάρχει."""
+        path = safe_join(self.static_dir, filename)
+        if path is None:
+            return None
+        try:
+            stamp = _stamp(path)
+        except OSError:
+            return None
+        entry = self._entries.get(filename)
+        if entry and entry[0] == stamp:
+            return entry[1]
+        digest = file_hash(path)
+        with self._lock:
+            self._entries[filename] = (stamp, digest)
+        return digest
+
+    def hashed(self, filename):
+        """Το fingerprinted όνομα για το url_for· αμετάβλητο αν το αρχείο δεν υπάρχει."""
+        digest = self.digest(filename)
+        return hashed_name(filename, digest) if digest else filename
+
+    def resolve(self, requested):
+        """
+        (πραγματικό όνομα, immutable) για ένα ζητούμενο όνομα. Ένα hash που δεν
+        είναι πια το τρέχον (παλιά σελίδα σε cache) σερβίρει το τρέχον αρχείο,
+        αλλά χωρίς immutable.
+        """
+        match = _HASHED_NAME.match(requested)
+        if match and not os.path.isfile(safe_join(self.static_dir, requested) or ''):
+            original = match.group('base') + match.group('ext')
+            return original, self.digest(original) == match.group('hash')
+        return requested, False
+
+    def build(self, compress=True):
+        """Hash (και προσυμπίεση) όλων των static αρχείων. Για το build_assets.py."""
+        count = compressed = 0
+        for root, dirs, files in os.walk(self.static_dir):
+            for name in files:
+                if name == MANIFEST_NAME or name.endswith(('.gz', '.br')) or '.tmp' in name:
+                    continue
+                path = os.path.join(root, name)
+                filename = os.path.relpath(path, self.static_dir).replace(os.path.sep, '/')
+                self.digest(filename)
+                count += 1
+                if compress and is_compressible(name):
+                    compressed += len(precompress(path))
+        self.save()
+        return count, compressed
+
+
+def _is_fresh(encoded_path, source_mtime):
+    try:
+        return os.path.getmtime(encoded_path) >= source_mtime
+    except OSError:
+        return False
+
+
+def _accepted_encodings(path):
+    """Τα προσυμπιεσμένα variants που δέχεται ο client, με σειρά προτίμησης."""
+    for encoding, suffix in ENCODINGS:
+        if request.accept_encodings.quality(encoding) > 0:
+            yield encoding, path + suffix
+
+
+def send_static(manifest, requested):
+    """Το view του /static/<path:filename>."""
+    filename, immutable = manifest.resolve(requested)
+    path = safe_join(manifest.static_dir, filename)
+    if path is None or not os.path.isfile(path):
+        raise NotFound()
+
+    cache_control = IMMUTABLE_CACHE if immutable else REVALIDATE_CACHE
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+    if is_compressible(filename):
+        response = None
+        # Τα Range requests παίρνουν πάντα τα αρχικά bytes
+        if 'Range' not in request.headers:
+            source_mtime = os.path.getmtime(path)
+            for encoding, encoded_path in _accepted_encodings(path):
+                if _is_fresh(encoded_path, source_mtime):
+                    response = send_file(encoded_path, mimetype=mimetype, conditional=True)
+                    response.headers['Content-Encoding'] = encoding
+                    break
+            if response is None and os.path.getsize(path) >= MIN_COMPRESS_SIZE:
+                # Λείπει ή είναι παλιό: το αρχικό τώρα, τα variants για τα επόμενα requests
+                _compressor.submit(path)
+        if response is None:
+            response = send_file(path, mimetype=mimetype, conditional=True)
+        response.vary.add('Accept-Encoding')
+    else:
+        # conditional=True: ETag/304 και byte ranges (206) για videos και εικόνες
+        response = send_file(path, mimetype=mimetype, conditional=True)
+
+    response.headers['Cache-Control'] = cache_control
+    return response
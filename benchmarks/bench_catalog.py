@@ -0,0 +1,136 @@
+# benchmarks/bench_catalog.py
+"""
+Μετράει τα lookups/φίλτρα του PropertyCatalog σε σχέση με τις παλιές
+γραμμικές σαρώσεις πάνω σε συνθετικό κατάλογο 10k-100k ακινήτων.
+
+Χρήση:
+    python benchmarks/bench_catalog.py
+    python benchmarks/bench_catalog.py --sizes 10000 50000 100000 --repeat 200
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import PropertyCatalog  # noqa: E402
+
+TYPES = ['maisonette', 'maisonette_detached', 'apartment', 'plot', 'detached']
+LOCATIONS = ['nea-vrasna', 'paralia-vrasna', 'asprovalta', 'nea-kerdilia', 'logkari',
+             'stavros', 'olympiada', 'kerdylia', 'amfipoli', 'rentina']
+PROJECTS = ['kerdylia_riviera', 'the_twins', 'vrasna_gardens']
+
+
+def make_properties(count, seed=42):
+    """Συνθετικά ακίνητα με τα ίδια πεδία που έχει το properties.json."""
+    rnd = random.Random(seed)
+    properties = []
+    for i in range(count):
+        prop_id = f"synthetic-{i}"
+        prop_type = rnd.choice(TYPES)
+        slug = rnd.choice(LOCATIONS)
+        prop = {
+            'id': prop_id,
+            'title_key': f"prop_title_{prop_id}",
+            'description_key': f"prop_desc_{prop_id}",
+            'location': slug.replace('-', ' ').title(),
+            'location_slug': slug,
+            'status': 'for_sale',
+            'type': prop_type,
+            'price': 0 if rnd.random() < 0.1 else rnd.randrange(20000, 900000, 500),
+            'area': rnd.randint(30, 600),
+            'bedrooms': 0 if prop_type == 'plot' else rnd.randint(1, 5),
+            'bathrooms': 0 if prop_type == 'plot' else rnd.randint(1, 3),
+            'lat': round(40.65 + rnd.random() * 0.2, 6) if rnd.random() < 0.7 else None,
+            'lon': round(23.60 + rnd.random() * 0.4, 6) if rnd.random() < 0.7 else None,
+            'features_keys': [],
+            'images': [f"assets/images/properties/{prop_id}/1.webp"],
+            'main_image': f"assets/images/properties/{prop_id}/1.webp",
+        }
+        if rnd.random() < 0.05:
+            prop['project_id'] = rnd.choice(PROJECTS)
+        properties.append(prop)
+    return properties
+
+
+# --- Οι παλιές υλοποιήσεις των routes (γραμμικές σαρώσεις) ---
+
+def scan_get(properties, property_id):
+    return next((p for p in properties if p['id'] == property_id), None)
+
+
+def scan_filter(properties, prop_type, location, sort):
+    result = properties[:]
+    if prop_type != 'all':
+        result = [p for p in result if p['type'] == prop_type]
+    if location != 'all':
+        result = [p for p in result if p['location_slug'] == location]
+    if sort == 'price_asc':
+        result.sort(key=lambda p: p.get('price', 0) if p.get('price', 0) > 0 else float('inf'))
+    elif sort == 'price_desc':
+        result.sort(key=lambda p: p.get('price', 0), reverse=True)
+    return result
+
+
+def scan_project(properties, project_id):
+    return [p for p in properties if p.get('project_id') == project_id]
+
+
+def timeit(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6  # μs ανά κλήση
+
+
+def run(size, repeat):
+    properties = make_properties(size)
+    start = time.perf_counter()
+    catalog = PropertyCatalog(properties)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    rnd = random.Random(size)
+    ids = [p['id'] for p in rnd.sample(properties, 50)]
+    queries = [
+        ('all', 'all', ''),
+        ('plot', 'all', 'price_asc'),
+        ('apartment', 'nea-vrasna', 'price_desc'),
+        ('maisonette', 'logkari', ''),
+    ]
+
+    # Ζέσταμα των lazily ταξινομημένων κάδων, όπως μετά τα πρώτα αιτήματα
+    for q in queries:
+        catalog.filter(*q)
+
+    for q in queries:
+        assert catalog.filter(*q) == scan_filter(properties, *q), q
+
+    print(f"\n== {size:,} properties (index build {build_ms:.1f} ms) ==")
+    rows = [
+        ('get by id', lambda: [scan_get(properties, i) for i in ids], lambda: [catalog.get(i) for i in ids], len(ids)),
+        ('project', lambda: scan_project(properties, 'kerdylia_riviera'), lambda: catalog.in_project('kerdylia_riviera'), 1),
+    ]
+    for q in queries:
+        rows.append((f"filter {'/'.join(x or '-' for x in q)}",
+                     lambda q=q: scan_filter(properties, *q), lambda q=q: catalog.filter(*q), 1))
+
+    print(f"{'operation':<36}{'scan (us)':>14}{'catalog (us)':>14}{'speedup':>10}")
+    for name, old, new, per in rows:
+        old_us = timeit(old, repeat) / per
+        new_us = timeit(new, repeat) / per
+        print(f"{name:<36}{old_us:>14.2f}{new_us:>14.2f}{old_us / new_us:>9.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+# benchmarks/fixtures.py
+"""
+Συνθετικά δεδομένα για τα benchmarks: ένας φάκελος εργασίας με αντίγραφο
+του κώδικα (app.py, modules, templates, css/js) και συνθετικά properties.json
+και i18n/*.json μεγέθους `size`, ώστε η εφαρμογή να τρέχει ακριβώς όπως
+στην παραγωγή (σχετικά paths static/js/data/...) χωρίς να αγγίζει τα
+πραγματικά δεδομένα. Τα static/assets (εικόνες) συνδέονται με symlink.
+
+Τα ίδια `size` και `seed` δίνουν πάντα τα ίδια αρχεία.
+"""
+import json
+import os
+import random
+import shutil
+
+from bench_catalog import make_properties
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join('static', 'js', 'data')
+
+
+def _copy_code(workdir):
+    """Φρέσκο αντίγραφο του κώδικα σε κάθε run (τα δεδομένα ξαναχρησιμοποιούνται)."""
+    for name in os.listdir(REPO_ROOT):
+        if name.endswith('.py'):
+            shutil.copy2(os.path.join(REPO_ROOT, name), workdir)
+    for folder in ('templates', os.path.join('static', 'css')):
+        shutil.rmtree(os.path.join(workdir, folder), ignore_errors=True)
+        shutil.copytree(os.path.join(REPO_ROOT, folder), os.path.join(workdir, folder),
+                        ignore=shutil.ignore_patterns('*.bundle.css'))
+    js_dir = os.path.join(workdir, 'static', 'js')
+    for name in os.listdir(js_dir):
+        path = os.path.join(js_dir, name)
+        if name == 'data':
+            continue
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+    shutil.copytree(os.path.join(REPO_ROOT, 'static', 'js'), js_dir,
+                    ignore=shutil.ignore_patterns('data'), dirs_exist_ok=True)
+    assets = os.path.join(workdir, 'static', 'assets')
+    if not os.path.lexists(assets):
+        os.symlink(os.path.join(REPO_ROOT, 'static', 'assets'), assets)
+
+
+def _property_texts(prop, translations, rnd):
+    """Τίτλος και περιγραφή στη γλώσσα των `translations`, από πραγματικές ετικέτες."""
+    type_label = translations.get(f"type_{prop['type']}") or prop['type']
+    title = f"{type_label} {prop['area']} m² - {prop['location']}"
+    features = [translations.get(key) or key for key in prop['features_keys']]
+    rnd.shuffle(features)
+    sentences = [f"{type_label} {prop['area']} m², {prop['location']}."]
+    sentences.extend(f"{label}." for label in features)
+    return title, ' '.join(sentences)
+
+
+def build_workdir(root, size, seed=42):
+    """
+    Φτιάχνει τον φάκελο εργασίας για `size` ακίνητα. Τα συνθετικά δεδομένα
+    ενός προηγούμενου run ξαναχρησιμοποιούνται· ο κώδικας αντιγράφεται πάντα.
+    """
+    workdir = os.path.join(root, f'catalog-{size}-{seed}')
+    if os.path.exists(os.path.join(workdir, DATA_DIR, 'properties.json')):
+        _copy_code(workdir)
+        return workdir
+    shutil.rmtree(workdir, ignore_errors=True)
+    os.makedirs(os.path.join(workdir, DATA_DIR, 'i18n'))
+    _copy_code(workdir)
+
+    source_i18n = os.path.join(REPO_ROOT, DATA_DIR, 'i18n')
+    languages = sorted(name[:-5] for name in os.listdir(source_i18n) if name.endswith('.json'))
+    base = {}
+    for lang in languages:
+        with open(os.path.join(source_i18n, f'{lang}.json'), encoding='utf-8') as f:
+            base[lang] = json.load(f)
+    feature_keys = sorted(key for key in base['el'] if key.startswith('feature_'))
+
+    rnd = random.Random(seed)
+    properties = make_properties(size, seed=seed)
+    for prop in properties:
+        prop['features_keys'] = rnd.sample(feature_keys, rnd.randint(2, 6))
+
+    for lang in languages:
+        translations = dict(base[lang])
+        lang_rnd = random.Random(f'{seed}-{lang}')
+        for prop in properties:
+            title, description = _property_texts(prop, base[lang], lang_rnd)
+            translations[prop['title_key']] = title
+            translations[prop['description_key']] = description
+        with open(os.path.join(workdir, DATA_DIR, 'i18n', f'{lang}.json'), 'w', encoding='utf-8') as f:
+            json.dump(translations, f, ensure_ascii=False)
+
+    with open(os.path.join(workdir, DATA_DIR, 'properties.json'), 'w', encoding='utf-8') as f:
+        json.dump(properties, f, ensure_ascii=False)
+    return workdir
@@ -0,0 +1,507 @@
+# benchmarks/loadtest.py
+"""
+Benchmark / load test των βασικών routes πάνω σε συνθετικούς καταλόγους.
+
+Για κάθε μέγεθος καταλόγου (--sizes) φτιάχνεται ένας φάκελος εργασίας με
+αντίγραφο της εφαρμογής και συνθετικά δεδομένα (βλ. fixtures.py) και κάθε
+route τρέχει με ταυτόχρονους clients σε δύο modes:
+- client:   Flask test client, ένα νέο process ανά route (χωρίς δίκτυο),
+- gunicorn: τοπικός gunicorn με --workers workers και HTTP load generator.
+Το Gemini είναι το FakeChatModel (LLM_BACKEND=fake) και το SMTP ένας
+τοπικός stub server (stub_smtp.py), οπότε δεν χρειάζεται δίκτυο ή κλειδιά.
+
+Για κάθε route: throughput (req/s), latency p50/p95/p99 (ms), peak RSS (MB·
+στο gunicorn το άθροισμα του PSS master και workers) και σφάλματα
+(5xx/αποτυχίες σύνδεσης). Τα αποτελέσματα συγκρίνονται με το
+baseline (benchmarks/baseline.json)· σύγκριση έχει νόημα μόνο για baseline
+από το ίδιο μηχάνημα, οπότε στο meta γράφονται CPU/Python του run.
+
+Χρήση:
+    python benchmarks/loadtest.py
+    python benchmarks/loadtest.py --sizes 100 10000 100000 --modes client gunicorn
+    python benchmarks/loadtest.py --routes listings ask_chatbot --requests 500 --concurrency 16
+    python benchmarks/loadtest.py --save-baseline        # ενημερώνει το baseline
+    python benchmarks/loadtest.py --fail-on-regression   # exit 1 αν κάτι χειροτέρεψε
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from urllib.parse import quote, urlencode
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+RESULT_PREFIX = 'RESULT '
+
+TYPES = ['maisonette', 'maisonette_detached', 'apartment', 'plot', 'detached']
+LOCATIONS = ['nea-vrasna', 'paralia-vrasna', 'asprovalta', 'nea-kerdilia', 'logkari', 'stavros']
+SEARCH_QUERIES = ['vrasna', 'θάλασσα', 'parking', 'asprovalta apart', 'κήπος', 'sea view', 'Ставрос']
+CHATBOT_QUESTIONS = [
+    'Ψάχνω {kind} στη {place} έως {price} ευρώ',
+    'Do you have a {kind} near {place} under {price} euro?',
+    'Έχετε {kind} με θέα θάλασσα κοντά στη {place} μέχρι {price}€;',
+]
+
+
+# ===============================================
+# ==                  ROUTES                   ==
+# ===============================================
+# Κάθε route: (rnd, size) -> (method, path, body, content type)
+
+def _property_id(rnd, size):
+    return f'synthetic-{rnd.randrange(size)}'
+
+
+def _chatbot_body(rnd, size):
+    question = rnd.choice(CHATBOT_QUESTIONS).format(
+        kind=rnd.choice(TYPES).replace('_', ' '), place=rnd.choice(LOCATIONS).replace('-', ' '),
+        price=rnd.randrange(50000, 500000, 1000))
+    return json.dumps({'message': question}).encode('utf-8')
+
+
+def _message_body(rnd, size):
+    prop_id = _property_id(rnd, size)
+    return urlencode({
+        'property_id': prop_id, 'property_title': prop_id, 'name': 'Load Test',
+        'email': 'loadtest@example.com', 'phone_full': '+30 690 000 0000', 'message': 'Benchmark',
+    }).encode('utf-8')
+
+
+ROUTES = {
+    'home': lambda rnd, size: ('GET', '/', None, None),
+    'listings': lambda rnd, size: ('GET', '/listings', None, None),
+    'listings_filtered': lambda rnd, size: (
+        'GET', '/listings?' + urlencode({'type': rnd.choice(TYPES), 'location': rnd.choice(LOCATIONS),
+                                         'sort': rnd.choice(['price_asc', 'price_desc'])}), None, None),
+    'property': lambda rnd, size: ('GET', f'/property/{_property_id(rnd, size)}', None, None),
+    'api_properties': lambda rnd, size: (
+        'GET', '/api/properties?' + urlencode({'type': rnd.choice(TYPES), 'sort': 'price_desc', 'limit': 24}),
+        None, None),
+    'api_search': lambda rnd, size: ('GET', '/api/search?q=' + quote(rnd.choice(SEARCH_QUERIES)), None, None),
+    'api_map': lambda rnd, size: (
+        'GET', f'/api/map?bbox=23.55,40.6,24.05,40.9&zoom={rnd.choice([10, 12, 14, 16])}', None, None),
+    'ask_chatbot': lambda rnd, size: ('POST', '/ask-chatbot', _chatbot_body(rnd, size), 'application/json'),
+    'send_message': lambda rnd, size: (
+        'POST', '/send_message', _message_body(rnd, size), 'application/x-www-form-urlencoded'),
+}
+
+
+def make_plan(route, count, size, seed):
+    rnd = random.Random(f'{seed}-{route}-{size}')
+    return [ROUTES[route](rnd, size) for _ in range(count)]
+
+
+# ===============================================
+# ==              ΜΕΤΡΗΣΗ / ΑΝΑΦΟΡΑ            ==
+# ===============================================
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, elapsed, errors, rss_mb):
+    values = sorted(latencies)
+    return {
+        'requests': len(values),
+        'rps': round(len(values) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(values, 50) * 1000, 2),
+        'p95_ms': round(percentile(values, 95) * 1000, 2),
+        'p99_ms': round(percentile(values, 99) * 1000, 2),
+        'rss_mb': round(rss_mb, 1) if rss_mb is not None else None,
+        'errors': errors,
+    }
+
+
+def run_concurrently(plan, concurrency, send):
+    """
+    Μοιράζει το plan σε `concurrency` threads· το send(worker_state, request)
+    επιστρέφει το status code. (latencies, elapsed, errors)
+    """
+    chunks = [plan[i::concurrency] for i in range(concurrency)]
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def worker(chunk):
+        state = {}
+        local = []
+        local_errors = 0
+        for request in chunk:
+            started = time.perf_counter()
+            try:
+                status = send(state, request)
+            except Exception:
+                status = None
+            local.append(time.perf_counter() - started)
+            if status is None or status >= 500:
+                local_errors += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=worker, args=(chunk,)) for chunk in chunks if chunk]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, time.perf_counter() - started, errors[0]
+
+
+# ===============================================
+# ==            MODE: FLASK TEST CLIENT        ==
+# ===============================================
+
+def client_worker(args):
+    """Τρέχει μέσα στον φάκελο εργασίας (νέο process ανά route)."""
+    import resource
+    sys.path.insert(0, os.getcwd())
+    from app import app, db
+
+    with app.app_context():
+        db.create_all()
+
+    def send(state, request):
+        client = state.get('client')
+        if client is None:
+            client = state['client'] = app.test_client()
+        method, path, body, content_type = request
+        return client.open(path, method=method, data=body, content_type=content_type).status_code
+
+    run_concurrently(make_plan(args.route, args.warmup, args.size, f'warmup-{args.seed}'), 1, send)
+    latencies, elapsed, errors = run_concurrently(
+        make_plan(args.route, args.requests, args.size, args.seed), args.concurrency, send)
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(RESULT_PREFIX + json.dumps(summarize(latencies, elapsed, errors, rss_mb)), flush=True)
+
+
+def run_client_mode(workdir, env, size, routes, args):
+    results = {}
+    for route in routes:
+        command = [sys.executable, os.path.abspath(__file__), '_client', '--route', route,
+                   '--size', str(size), '--requests', str(args.requests),
+                   '--concurrency', str(args.concurrency), '--warmup', str(args.warmup),
+                   '--seed', str(args.seed)]
+        proc = subprocess.run(command, cwd=workdir, env=env, capture_output=True, text=True)
+        lines = [line for line in proc.stdout.splitlines() if line.startswith(RESULT_PREFIX)]
+        if proc.returncode != 0 or not lines:
+            print(f"  client/{route}: failed\n{proc.stderr[-2000:]}")
+            continue
+        results[route] = json.loads(lines[-1][len(RESULT_PREFIX):])
+        print_row('client', size, route, results[route])
+    return results
+
+
+# ===============================================
+# ==               MODE: GUNICORN              ==
+# ===============================================
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _rss_kb(pid):
+    # Pss: οι σελίδες που μοιράζονται master και workers (preload) μετρούν μία φορά
+    for path, field in ((f'/proc/{pid}/smaps_rollup', 'Pss:'), (f'/proc/{pid}/status', 'VmRSS:')):
+        try:
+            with open(path) as f:
+                for line in f:
+                    if line.startswith(field):
+                        return int(line.split()[1])
+        except OSError:
+            pass
+    return 0
+
+
+def _children(pid):
+    children = []
+    for name in os.listdir('/proc'):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f'/proc/{name}/stat') as f:
+                # Το comm μπορεί να έχει κενά: το ppid είναι μετά το ')'
+                fields = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(name))
+    return children
+
+
+class GunicornServer:
+
+    def __init__(self, workdir, env, workers, threads):
+        self.workdir = workdir
+        self.env = env
+        self.workers = workers
+        self.threads = threads
+        self.port = _free_port()
+        self.proc = None
+        self._peak_kb = 0
+        self._sampling = False
+
+    def start(self, timeout=120):
+        log = open(os.path.join(self.workdir, 'gunicorn.log'), 'ab')
+        self.proc = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '--workers', str(self.workers), '--threads', str(self.threads),
+             '--bind', f'127.0.0.1:{self.port}', '--timeout', '120', 'app:app'],
+            cwd=self.workdir, env=self.env, stdout=log, stderr=log)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.proc.poll() is not None:
+                raise RuntimeError(f'gunicorn exited, see {self.workdir}/gunicorn.log')
+            try:
+                conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=5)
+                conn.request('GET', '/api/http/stats')
+                conn.getresponse().read()
+                return self
+            except OSError:
+                time.sleep(0.2)
+        raise RuntimeError('gunicorn did not start in time')
+
+    def stop(self):
+        if self.proc and self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+
+    def total_rss_kb(self):
+        return _rss_kb(self.proc.pid) + sum(_rss_kb(pid) for pid in _children(self.proc.pid))
+
+    def _sample(self):
+        while self._sampling:
+            self._peak_kb = max(self._peak_kb, self.total_rss_kb())
+            time.sleep(0.1)
+
+    def measure(self, plan, concurrency):
+        def send(state, request):
+            conn = state.get('conn')
+            if conn is None:
+                conn = state['conn'] = http.client.HTTPConnection('127.0.0.1', self.port, timeout=60)
+            method, path, body, content_type = request
+            headers = {'Content-Type': content_type} if content_type else {}
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                return response.status
+            except (OSError, http.client.HTTPException):
+                state.pop('conn').close()
+                raise
+
+        self._peak_kb = self.total_rss_kb()
+        self._sampling = True
+        sampler = threading.Thread(target=self._sample, daemon=True)
+        sampler.start()
+        try:
+            latencies, elapsed, errors = run_concurrently(plan, concurrency, send)
+        finally:
+            self._sampling = False
+            sampler.join()
+        return latencies, elapsed, errors, self._peak_kb / 1024
+
+
+def run_gunicorn_mode(workdir, env, size, routes, args):
+    results = {}
+    server = GunicornServer(workdir, env, args.workers, args.threads).start()
+    try:
+        for route in routes:
+            server.measure(make_plan(route, args.warmup * args.workers, size, f'warmup-{args.seed}'), args.workers)
+            latencies, elapsed, errors, rss_mb = server.measure(
+                make_plan(route, args.requests, size, args.seed), args.concurrency)
+            results[route] = summarize(latencies, elapsed, errors, rss_mb)
+            print_row('gunicorn', size, route, results[route])
+    finally:
+        server.stop()
+    return results
+
+
+# ===============================================
+# ==                  BASELINE                 ==
+# ===============================================
+
+def print_header():
+    print(f"{'mode':<10}{'size':>8}  {'route':<19}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+          f"{'p99 ms':>9}{'RSS MB':>9}{'errors':>8}")
+
+
+def print_row(mode, size, route, r):
+    rss = f"{r['rss_mb']:.1f}" if r['rss_mb'] is not None else '-'
+    print(f"{mode:<10}{size:>8}  {route:<19}{r['rps']:>9.1f}{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}"
+          f"{r['p99_ms']:>9.2f}{rss:>9}{r['errors']:>8}", flush=True)
+
+
+def compare(results, baseline, tolerance):
+    """
+    Τυπώνει τις διαφορές από το baseline και επιστρέφει τα keys που
+    χειροτέρεψαν (p95 ή req/s πέρα από το `tolerance`, ή νέα σφάλματα).
+    """
+    regressions = []
+    rows = [(key, r, baseline[key]) for key, r in sorted(results.items()) if key in baseline]
+    if not rows:
+        print('\nNo matching baseline entries.')
+        return regressions
+    print(f"\n{'vs baseline':<44}{'req/s':>10}{'p95':>10}{'RSS':>10}")
+    for key, r, base in rows:
+        deltas = {}
+        for field in ('rps', 'p95_ms', 'rss_mb'):
+            if base.get(field) and r.get(field) is not None:
+                deltas[field] = (r[field] - base[field]) / base[field]
+        worse = (deltas.get('p95_ms', 0) > tolerance or deltas.get('rps', 0) < -tolerance
+                 or r['errors'] > base.get('errors', 0))
+        if worse:
+            regressions.append(key)
+        cells = ''.join(f"{deltas[f] * 100:>+9.1f}%" if f in deltas else f"{'-':>10}"
+                        for f in ('rps', 'p95_ms', 'rss_mb'))
+        print(f"{key:<44}{cells}{'  REGRESSION' if worse else ''}")
+    return regressions
+
+
+def load_baseline(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'meta': {}, 'results': {}}
+
+
+def save_baseline(path, results, args):
+    baseline = load_baseline(path)
+    # Ένα μερικό run (λίγα routes/μεγέθη) ενημερώνει μόνο τα δικά του keys
+    baseline['results'].update(results)
+    baseline['results'] = dict(sorted(baseline['results'].items()))
+    baseline['meta'] = {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'workers': args.workers,
+        'threads': args.threads,
+        'llm_delay': args.llm_delay,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+    print(f'\nBaseline written to {path}')
+
+
+# ===============================================
+# ==                    MAIN                   ==
+# ===============================================
+
+def app_env(workdir, smtp_port, args):
+    env = dict(os.environ)
+    env.update({
+        'LLM_BACKEND': 'fake',
+        'FAKE_LLM_DELAY': str(args.llm_delay),
+        'FAKE_LLM_LATENCY': '0',
+        'FAKE_LLM_FAIL_RATE': '0',
+        'MAIL_SERVER': '127.0.0.1',
+        'MAIL_PORT': str(smtp_port),
+        'MAIL_SECURITY': 'plain',
+        'MAIL_FALLBACK_SERVER': '',
+        'MAIL_USERNAME': 'bench@example.com',
+        'MAIL_PASSWORD': 'bench',
+        'MAIL_RECEIVER': 'leads@example.com',
+        'DATABASE_URL': 'sqlite:///' + os.path.join(workdir, 'bench.db'),
+        'CATALOG_BACKEND': 'json',
+        # Χωρίς page cache μετράμε το πραγματικό κόστος του route (Jinja, φίλτρα)
+        'PAGE_CACHE': '1' if args.page_cache else '0',
+        'PYTHONDONTWRITEBYTECODE': '1',
+    })
+    env.pop('GEMINI_API_KEY', None)
+    return env
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command')
+    worker = sub.add_parser('_client', help=argparse.SUPPRESS)
+    worker.add_argument('--route', required=True)
+    worker.add_argument('--size', type=int, required=True)
+    worker.add_argument('--requests', type=int, default=200)
+    worker.add_argument('--concurrency', type=int, default=8)
+    worker.add_argument('--warmup', type=int, default=10)
+    worker.add_argument('--seed', default='42')
+
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 10000, 100000])
+    parser.add_argument('--modes', nargs='+', choices=['client', 'gunicorn'], default=['client', 'gunicorn'])
+    parser.add_argument('--routes', nargs='+', choices=sorted(ROUTES), default=list(ROUTES))
+    parser.add_argument('--requests', type=int, default=200, help='μετρημένα αιτήματα ανά route')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn workers')
+    parser.add_argument('--threads', type=int, default=1, help='gunicorn threads ανά worker')
+    parser.add_argument('--llm-delay', type=float, default=0.05, help='καθυστέρηση του ψεύτικου Gemini (s)')
+    parser.add_argument('--page-cache', action='store_true', help='με ενεργό page cache')
+    parser.add_argument('--seed', default='42')
+    parser.add_argument('--workdir', default=os.path.join(tempfile.gettempdir(), 'property-site-bench'))
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='επιτρεπτή χειροτέρευση (0.25 = 25%%)')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    parser.add_argument('--output', help='αποθήκευση των αποτελεσμάτων σε JSON')
+    args = parser.parse_args()
+
+    if args.command == '_client':
+        client_worker(args)
+        return
+
+    # SIGTERM (π.χ. timeout) σαν Ctrl-C, ώστε να σταματήσει και ο gunicorn
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+    sys.path.insert(0, BENCH_DIR)
+    from fixtures import build_workdir
+    from stub_smtp import StubSmtpServer
+
+    smtp = StubSmtpServer().start()
+    results = {}
+    print_header()
+    for size in args.sizes:
+        started = time.perf_counter()
+        workdir = build_workdir(args.workdir, size, seed=int(args.seed))
+        print(f"-- {size:,} properties ({workdir}, ready in {time.perf_counter() - started:.1f}s)", flush=True)
+        env = app_env(workdir, smtp.port, args)
+        subprocess.run([sys.executable, 'init_db.py'], cwd=workdir, env=env, capture_output=True, check=True)
+        if 'client' in args.modes:
+            for route, r in run_client_mode(workdir, env, size, args.routes, args).items():
+                results[f'client/{size}/{route}'] = r
+        if 'gunicorn' in args.modes:
+            for route, r in run_gunicorn_mode(workdir, env, size, args.routes, args).items():
+                results[f'gunicorn/{size}/{route}'] = r
+    smtp.shutdown()
+    print(f"\nStub SMTP received {smtp.messages} message(s).")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'results': results}, f, indent=2)
+
+    regressions = compare(results, load_baseline(args.baseline)['results'], args.tolerance)
+    if args.save_baseline:
+        save_baseline(args.baseline, results, args)
+    if regressions and args.fail_on_regression:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}.")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+# benchmarks/stub_smtp.py
+"""
+Ελάχιστος τοπικός SMTP server για τα benchmarks: δέχεται EHLO, AUTH, MAIL,
+RCPT και DATA χωρίς να στέλνει τίποτα και μετρά τα μηνύματα, ώστε ο
+background sender του outbox (mailer.py) να δουλεύει όπως στην παραγωγή.
+Με `disconnect_after` κλείνει τη σύνδεση μετά από τόσα μηνύματα (για τα tests).
+"""
+import socketserver
+import threading
+
+
+class _Handler(socketserver.StreamRequestHandler):
+
+    def _reply(self, line):
+        self.wfile.write(line.encode('ascii') + b'\r\n')
+
+    def handle(self):
+        try:
+            self._session()
+        except ConnectionError:
+            # Ο sender μπορεί να κλείσει τη σύνδεση χωρίς QUIT
+            pass
+
+    def _session(self):
+        with self.server.lock:
+            self.server.connections += 1
+        self._reply('220 stub ESMTP')
+        in_data = False
+        received = 0
+        for raw in self.rfile:
+            line = raw.decode('utf-8', 'replace').rstrip('\r\n')
+            if in_data:
+                if line == '.':
+                    in_data = False
+                    received += 1
+                    with self.server.lock:
+                        self.server.messages += 1
+                    self._reply('250 OK queued')
+                continue
+            command = line.split(' ', 1)[0].upper()
+            if command == 'MAIL' and received == self.server.disconnect_after:
+                return  # Κλείνει χωρίς απάντηση, όπως ένας server που έπεσε
+            if command == 'EHLO':
+                self._reply('250-stub')
+                self._reply('250 AUTH PLAIN LOGIN')
+            elif command == 'AUTH':
+                self._reply('235 Authentication successful')
+            elif command == 'DATA':
+                in_data = True
+                self._reply('354 End data with <CR><LF>.<CR><LF>')
+            elif command == 'QUIT':
+                self._reply('221 Bye')
+                return
+            else:
+                self._reply('250 OK')
+
+
+class StubSmtpServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=0, disconnect_after=None):
+        super().__init__((host, port), _Handler)
+        self.disconnect_after = disconnect_after
+        self.connections = 0
+        self.messages = 0
+        self.lock = threading.Lock()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name='stub-smtp', daemon=True).start()
+        return self
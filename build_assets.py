@@ -0,0 +1,18 @@
+# build_assets.py
+# Φτιάχνει το CSS bundle (βλ. bundles.py), υπολογίζει τα hashes όλων των static
+# αρχείων (static/assets-manifest.json) και γράφει τα προσυμπιεσμένα .br/.gz
+# δίπλα στα css/js/json. Τρέχει σε κάθε deploy, πριν ξεκινήσει ο gunicorn,
+# ώστε τα workers να μην κάνουν hashing/συμπίεση.
+# Χρήση:  python build_assets.py
+import os
+
+from assets import AssetManifest, brotli
+from bundles import CssBundle
+
+if __name__ == '__main__':
+    static_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+    CssBundle(static_dir, 'css/main.css').build()
+    if brotli is None:
+        print("Brotli not installed: writing gzip variants only.")
+    count, compressed = AssetManifest(static_dir).build()
+    print(f"Hashed {count} static files, wrote {compressed} compressed variants.")
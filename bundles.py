@@ -0,0 +1,153 @@
+# bundles.py
+"""
+Ένα minified CSS bundle αντί για την αλυσίδα @import του main.css.
+
+Το CssBundle διαβάζει το entry (π.χ. css/main.css), λύνει αναδρομικά τα
+@import με τη σειρά τους, ξαναγράφει τα σχετικά url(...) ώστε να δείχνουν
+στο σωστό αρχείο και γράφει το αποτέλεσμα minified δίπλα στο entry
+(css/main.bundle.css). Το url του bundle περνά από το url_for('static'),
+οπότε παίρνει fingerprint, immutable caching και br/gzip (βλ. assets.py).
+
+Το bundle ξαναφτιάχνεται μόνο του όταν αλλάξει, προστεθεί ή αφαιρεθεί
+κάποιο από τα αρχεία του (έλεγχος με os.stat, το πολύ μία φορά ανά
+check_interval). Για διαφορετικό bundle ανά σελίδα αρκεί άλλο entry.
+"""
+import os
+import posixpath
+import re
+import threading
+import time
+
+BUNDLE_SUFFIX = '.bundle.css'
+
+_IMPORT = re.compile(
+    r"""@import\s+(?:url\(\s*(?P<q1>['"]?)(?P<url>[^'")]+)(?P=q1)\s*\)|(?P<q2>['"])(?P<url2>[^'"]+)(?P=q2))\s*(?P<media>[^;]*);"""
+)
+_URL = re.compile(r"""url\(\s*(?P<q>['"]?)(?P<url>[^'")]+)(?P=q)\s*\)""")
+# Strings και σχόλια: τα strings μένουν ως έχουν, τα σχόλια φεύγουν
+_TOKENS = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|(/\*.*?\*/)""", re.S)
+
+
+def _is_external(url):
+    return url.startswith(('/', 'data:', 'http:', 'https:', '#')) or '//' in url
+
+
+def _stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _strip_comments(css):
+    return _TOKENS.sub(lambda m: m.group(1) or '', css)
+
+
+def minify_css(css):
+    """Αφαιρεί σχόλια και περιττά κενά, χωρίς να αγγίζει τα strings."""
+    parts = []
+    last = 0
+    for match in _TOKENS.finditer(css):
+        parts.append(_minify_code(css[last:match.start()]))
+        if match.group(1):
+            parts.append(match.group(1))
+        last = match.end()
+    parts.append(_minify_code(css[last:]))
+    return ''.join(parts).strip()
+
+
+def _minify_code(code):
+    code = re.sub(r'\s+', ' ', code)
+    # Χωρίς τα + και ~, που χρειάζονται κενά μέσα σε calc() ή έχουν νόημα στους selectors
+    code = re.sub(r'\s*([{};,>])\s*', r'\1', code)
+    code = re.sub(r':\s+', ':', code)
+    return code.replace(';}', '}')
+
+
+class CssBundle:
+
+    def __init__(self, static_dir, entry, check_interval=1.0):
+        self.static_dir = static_dir
+        self.entry = entry
+        self.output = entry[:-len('.css')] + BUNDLE_SUFFIX
+        self.check_interval = check_interval
+        self._sources = {}
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def _path(self, filename):
+        return os.path.join(self.static_dir, *filename.split('/'))
+
+    def _inline(self, filename, seen):
+        """Το CSS του αρχείου με τα @import του ενσωματωμένα (κάθε αρχείο μία φορά)."""
+        if filename in seen:
+            return ''
+        seen.add(filename)
+        path = self._path(filename)
+        self._sources[filename] = _stamp(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            css = f.read()
+
+        folder = posixpath.dirname(filename)
+        output_folder = posixpath.dirname(self.output)
+
+        def rebase(match):
+            url = match.group('url').strip()
+            if _is_external(url):
+                return match.group(0)
+            target = posixpath.normpath(posixpath.join(folder, url))
+            return f"url('{posixpath.relpath(target, output_folder)}')"
+
+        def inline_import(match):
+            url = (match.group('url') or match.group('url2')).strip()
+            media = match.group('media').strip()
+            if _is_external(url):
+                return match.group(0)
+            imported = self._inline(posixpath.normpath(posixpath.join(folder, url)), seen)
+            return f"@media {media}{{{imported}}}" if media else imported
+
+        # Τα σχόλια φεύγουν πρώτα, ώστε να αγνοούνται και τα σχολιασμένα @import
+        css = _strip_comments(css)
+        parts = []
+        last = 0
+        for match in _IMPORT.finditer(css):
+            parts.append(_URL.sub(rebase, css[last:match.start()]))
+            parts.append(inline_import(match))
+            last = match.end()
+        parts.append(_URL.sub(rebase, css[last:]))
+        return ''.join(parts)
+
+    def build(self):
+        """Ξαναφτιάχνει το bundle. Γράφει μόνο αν άλλαξε το περιεχόμενο (σταθερό hash)."""
+        self._sources = {}
+        css = minify_css(self._inline(self.entry, set()))
+        path = self._path(self.output)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                unchanged = f.read() == css
+        except OSError:
+            unchanged = False
+        if not unchanged:
+            tmp_path = f"{path}.tmp{os.getpid()}"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(css)
+            os.replace(tmp_path, path)
+            print(f"Built {self.output} from {len(self._sources)} stylesheets ({os.path.getsize(path)} bytes).")
+        return self.output
+
+    def is_stale(self):
+        if not os.path.exists(self._path(self.output)) or not self._sources:
+            return True
+        return any(_stamp(self._path(name)) != stamp for name, stamp in self._sources.items())
+
+    def current(self):
+        """Το όνομα του bundle (σχετικό με το static/), αφού το ξαναφτιάξει αν χρειάζεται."""
+        now = time.monotonic()
+        if now >= self._next_check:
+            with self._lock:
+                if now >= self._next_check:
+                    if self.is_stale():
+                        self.build()
+                    self._next_check = now + self.check_interval
+        return self.output
@@ -0,0 +1,405 @@
+# catalog.py
+"""
+Ευρετηριασμένος κατάλογος ακινήτων στη μνήμη.
+
+Χτίζεται ΜΙΑ ΦΟΡΑ από τη λίστα του properties.json και κρατά:
+- χάρτη id -> ακίνητο,
+- ανεστραμμένα ευρετήρια ανά type, location_slug και project_id,
+- προταξινομημένες σειρές τιμών (αύξουσα/φθίνουσα),
+ώστε τα lookups και οι συνδυασμοί φίλτρων/ταξινόμησης να κοστίζουν
+όσο το μέγεθος του αποτελέσματος και όχι όσο ολόκληρος ο κατάλογος.
+Η σελιδοποίηση (page) είναι keyset: ο cursor κρατά τη θέση με βάση το
+τελευταίο ακίνητο της σελίδας και όχι ένα offset.
+"""
+import base64
+import bisect
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from metrics import span
+from spatial import SpatialIndex
+
+
+def _price(prop):
+    return prop.get('price') or 0
+
+
+# Κλειδί ταξινόμησης (αύξουσα σειρά) ανά sort. Η φθίνουσα τιμή είναι -price,
+# τα "κατόπιν επικοινωνίας" (0) πάνε στο τέλος της αύξουσας. Το id λύνει τις
+# ισοβαθμίες, ώστε κάθε ακίνητο να έχει μοναδική θέση (βλ. page).
+SORT_KEYS = {
+    'price_asc': lambda p: (_price(p) or float('inf'), p['id']),
+    'price_desc': lambda p: (-_price(p), p['id']),
+}
+# Φίλτρα εύρους: όνομα -> πεδίο του ακινήτου
+RANGE_FIELDS = ('price', 'area', 'bedrooms')
+
+
+def encode_cursor(sort, prop, position):
+    """Αδιαφανής cursor: sort, τιμή ταξινόμησης και id του τελευταίου ακινήτου, θέση."""
+    payload = [sort, _price(prop) if sort in SORT_KEYS else None, prop['id'], position]
+    raw = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Το αντίστροφο του encode_cursor· ValueError αν ο cursor δεν είναι έγκυρος."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        sort, value, prop_id, position = json.loads(raw)
+    except (TypeError, ValueError) as e:
+        raise ValueError('Invalid cursor') from e
+    if not isinstance(position, int) or position < 0:
+        raise ValueError('Invalid cursor')
+    return sort, value, prop_id, position
+
+
+def _in_ranges(prop, ranges):
+    for field, (low, high) in ranges.items():
+        value = prop.get(field) or 0
+        # Τιμή 0 = "κατόπιν επικοινωνίας", δεν ταιριάζει σε κανένα εύρος τιμής
+        if field == 'price' and not value:
+            return False
+        if (low is not None and value < low) or (high is not None and value > high):
+            return False
+    return True
+
+
+def _digest(data):
+    payload = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
+
+
+class PropertyCatalog:
+    """Αμετάβλητο (read-only) στιγμιότυπο του καταλόγου ακινήτων."""
+
+    def __init__(self, properties, version=0):
+        self.properties = list(properties)
+        self.version = version
+
+        self.by_id = {}
+        self.by_project = {}
+        # Κλειδί: (type ή None, location_slug ή None) -> ακίνητα στη φυσική σειρά.
+        # Το None σημαίνει "all", άρα κάθε ακίνητο μπαίνει σε 4 κάδους.
+        self._buckets = {(None, None): self.properties}
+        self.map_data = []
+
+        for prop in self.properties:
+            self.by_id[prop['id']] = prop
+
+            project_id = prop.get('project_id')
+            if project_id:
+                self.by_project.setdefault(project_id, []).append(prop)
+
+            prop_type = prop.get('type')
+            slug = prop.get('location_slug')
+            # Χωρίς type ή location_slug κάποια κλειδιά συμπίπτουν· το (None, None)
+            # είναι η ίδια η self.properties (που διατρέχουμε) και δεν ξαναμπαίνει
+            for key in {(prop_type, None), (None, slug), (prop_type, slug)} - {(None, None)}:
+                self._buckets.setdefault(key, []).append(prop)
+
+            if prop.get('lat') and prop.get('lon'):
+                self.map_data.append({
+                    'id': prop['id'],
+                    'lat': prop['lat'],
+                    'lon': prop['lon'],
+                    'title_key': prop['title_key'],
+                    'main_image': prop['main_image'],
+                    'price': prop.get('price', 0),
+                    'area': prop.get('area', 0),
+                    'bedrooms': prop.get('bedrooms', 0),
+                    'bathrooms': prop.get('bathrooms', 0)
+                })
+
+        # Καθολική κατάταξη κάθε ακινήτου (ανά id) για τις δύο ταξινομήσεις τιμής.
+        # Τα ακίνητα "κατόπιν επικοινωνίας" (τιμή 0) πάνε στο τέλος της αύξουσας.
+        asc = sorted(self.properties, key=SORT_KEYS['price_asc'])
+        desc = sorted(self.properties, key=SORT_KEYS['price_desc'])
+        self._rank = {
+            'price_asc': {p['id']: rank for rank, p in enumerate(asc)},
+            'price_desc': {p['id']: rank for rank, p in enumerate(desc)},
+        }
+        self._sorted = {
+            ((None, None), 'price_asc'): asc,
+            ((None, None), 'price_desc'): desc,
+        }
+        # Για τη σελιδοποίηση: θέση κάθε id και κλειδιά ταξινόμησης ανά σειρά
+        self._positions = {}
+        self._sort_values = {}
+
+        # Χωρικό ευρετήριο (πλέγμα ανά zoom) για το /api/map
+        self.spatial = SpatialIndex(self.map_data)
+
+        self._build_facets()
+
+    def _build_facets(self):
+        """
+        Μετρητές (facets) που υπολογίζονται μία φορά ανά έκδοση καταλόγου,
+        ώστε ο context processor και τα φίλτρα να κάνουν μόνο lookups.
+        """
+        # Footer: μόνο τα ακίνητα με συντεταγμένες, όπως έκανε ο inject_locations
+        location_counts = {}
+        location_names = {}
+        for prop in self.properties:
+            if prop.get('lat') and prop.get('lon'):
+                slug = prop.get('location_slug')
+                name = prop.get('location')
+                if slug and name:
+                    location_counts[slug] = location_counts.get(slug, 0) + 1
+                    location_names.setdefault(slug, name)
+        sorted_locations = sorted(location_names.items(), key=lambda item: item[1])
+
+        # Φίλτρα listings: μετρητές ανά location μέσα σε κάθε type και
+        # ανά type μέσα σε κάθε location. Το κλειδί None σημαίνει "all".
+        self._locations_by_type = {}
+        self._types_by_location = {}
+        for (prop_type, slug), bucket in self._buckets.items():
+            if slug is not None:
+                self._locations_by_type.setdefault(prop_type, {})[slug] = len(bucket)
+            if prop_type is not None:
+                self._types_by_location.setdefault(slug, {})[prop_type] = len(bucket)
+
+        self.template_context = dict(
+            location_counts=location_counts,
+            sorted_locations=sorted_locations,
+            type_counts=self._types_by_location.get(None, {}),
+        )
+        # Αλλάζει μόνο όταν αλλάξουν οι κοινοί μετρητές (π.χ. νέο ακίνητο),
+        # όχι σε κάθε αλλαγή τιμής ή περιγραφής (βλ. page cache στο app)
+        self.context_version = _digest(self.template_context)
+        self._property_versions = {}
+
+    def facet_counts(self, prop_type=None, location=None):
+        """
+        Μετρητές για το sidebar του /listings με βάση τα τρέχοντα φίλτρα:
+        πόσα ακίνητα ανά location για τον επιλεγμένο type και πόσα ανά
+        type για το επιλεγμένο location.
+        """
+        prop_type = None if prop_type in (None, '', 'all') else prop_type
+        location = None if location in (None, '', 'all') else location
+        return {
+            'location': self._locations_by_type.get(prop_type, {}),
+            'type': self._types_by_location.get(location, {}),
+            'total': len(self._buckets.get((prop_type, location), ())),
+        }
+
+    def property_version(self, property_id):
+        """Hash του περιεχομένου ενός ακινήτου, για caches ανά ακίνητο."""
+        version = self._property_versions.get(property_id)
+        if version is None:
+            version = self._property_versions[property_id] = _digest(self.by_id.get(property_id))
+        return version
+
+    def __len__(self):
+        return len(self.properties)
+
+    def __iter__(self):
+        return iter(self.properties)
+
+    def get(self, property_id):
+        return self.by_id.get(property_id)
+
+    def of_type(self, prop_type):
+        return self.filter(prop_type=prop_type)
+
+    def in_location(self, location_slug):
+        return self.filter(location=location_slug)
+
+    def in_project(self, project_id):
+        return list(self.by_project.get(project_id, ()))
+
+    def types(self):
+        return sorted(self._types_by_location.get(None, {}))
+
+    def first_excluding(self, excluded_ids, limit):
+        """Τα πρώτα `limit` ακίνητα (φυσική σειρά) που δεν ανήκουν στα excluded_ids."""
+        excluded = set(excluded_ids)
+        result = []
+        for prop in self.properties:
+            if len(result) >= limit:
+                break
+            if prop['id'] not in excluded:
+                result.append(prop)
+        return result
+
+    def _ordered(self, prop_type, location, sort):
+        key = (prop_type, location)
+        if sort not in self._rank:
+            return self._buckets.get(key, ())
+        cached = self._sorted.get((key, sort))
+        if cached is None:
+            # Ταξινόμηση του κάδου μόνο την πρώτη φορά που ζητηθεί.
+            rank = self._rank[sort]
+            cached = sorted(self._buckets.get(key, ()), key=lambda p: rank[p['id']])
+            self._sorted[(key, sort)] = cached
+        return cached
+
+    def _position_of(self, key, sort, ordered, prop_id):
+        positions = self._positions.get((key, sort))
+        if positions is None:
+            positions = {p['id']: i for i, p in enumerate(ordered)}
+            self._positions[(key, sort)] = positions
+        return positions.get(prop_id)
+
+    def _resume_at(self, key, sort, ordered, cursor):
+        """Η θέση από την οποία συνεχίζει η επόμενη σελίδα μετά τον cursor."""
+        cursor_sort, value, prop_id, position = cursor
+        found = self._position_of(key, sort, ordered, prop_id)
+        if sort not in SORT_KEYS:
+            # Φυσική σειρά: αν το ακίνητο διαγράφηκε, συνεχίζουμε από την ίδια θέση
+            return found + 1 if found is not None else min(position, len(ordered))
+        sort_key = SORT_KEYS[sort]
+        last_key = sort_key({'price': value, 'id': prop_id})
+        if found is not None and sort_key(ordered[found]) == last_key:
+            return found + 1
+        # Το ακίνητο άλλαξε τιμή ή διαγράφηκε: συνεχίζουμε από εκεί που θα ήταν
+        values = self._sort_values.get((key, sort))
+        if values is None:
+            values = self._sort_values[(key, sort)] = [sort_key(p) for p in ordered]
+        return bisect.bisect_right(values, last_key)
+
+    def page(self, prop_type=None, location=None, sort='', ranges=None, cursor=None, limit=12):
+        """
+        Μία σελίδα αποτελεσμάτων: (ακίνητα, επόμενος cursor ή None, σύνολο).
+        Οι αλλαγές σε άλλα ακίνητα ανάμεσα σε δύο σελίδες δεν προκαλούν
+        διπλοεγγραφές ή κενά. Το σύνολο είναι None όταν υπάρχουν φίλτρα εύρους
+        (θα χρειαζόταν σάρωση όλου του κάδου).
+        `ranges`: {'price'|'area'|'bedrooms': (min ή None, max ή None)}.
+        """
+        prop_type = None if prop_type in (None, '', 'all') else prop_type
+        location = None if location in (None, '', 'all') else location
+        sort = sort if sort in SORT_KEYS else ''
+        key = (prop_type, location)
+        ordered = self._ordered(prop_type, location, sort)
+        ranges = {field: bounds for field, bounds in (ranges or {}).items() if bounds != (None, None)}
+
+        start = 0
+        if cursor is not None:
+            if cursor[0] != sort:
+                raise ValueError('Cursor does not match the requested sort')
+            start = self._resume_at(key, sort, ordered, cursor)
+
+        items = []
+        next_cursor = None
+        for position in range(start, len(ordered)):
+            prop = ordered[position]
+            if ranges and not _in_ranges(prop, ranges):
+                continue
+            if len(items) == limit:
+                # Υπάρχει τουλάχιστον ένα ακόμη: ο cursor δείχνει στο τελευταίο της σελίδας
+                next_cursor = encode_cursor(sort, items[-1][1], items[-1][0])
+                break
+            items.append((position, prop))
+        total = None if ranges else len(ordered)
+        return [prop for _, prop in items], next_cursor, total
+
+    def filter(self, prop_type=None, location=None, sort=''):
+        """
+        Επιστρέφει νέα λίστα με τα ακίνητα που ταιριάζουν. Τα 'all' και ''
+        αντιστοιχούν σε "χωρίς φίλτρο", όπως στα query params του /listings.
+        """
+        prop_type = None if prop_type in (None, '', 'all') else prop_type
+        location = None if location in (None, '', 'all') else location
+        return list(self._ordered(prop_type, location, sort))
+
+
+# ===============================================
+# ==        ΖΩΝΤΑΝΗ ΑΝΑΝΕΩΣΗ ΚΑΤΑΛΟΓΟΥ          ==
+# ===============================================
+
+def write_json_atomic(path, data):
+    """
+    Γράφει το JSON σε προσωρινό αρχείο στον ίδιο φάκελο και το αντικαθιστά
+    με os.replace(), ώστε κανένας αναγνώστης να μη δει ποτέ μισογραμμένο αρχείο.
+    """
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(prefix='.tmp-', suffix='.json', dir=directory)
+    try:
+        with span('json', 'write'), os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        # Το mkstemp δημιουργεί αρχεία 0600· κρατάμε τα δικαιώματα του αρχικού
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except OSError:
+            mode = 0o644
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class CatalogStore:
+    """
+    Κρατά τον τρέχοντα PropertyCatalog ενός worker και τον ανανεώνει όταν
+    αλλάξει το properties.json στον δίσκο (από οποιονδήποτε worker).
+
+    Ο έλεγχος είναι ένα os.stat() (inode, mtime, μέγεθος) το πολύ μία φορά ανά
+    `check_interval` δευτερόλεπτα. Ο νέος κατάλογος χτίζεται πλήρως και μετά
+    αντικαθιστά τον παλιό με μία ανάθεση, οπότε τα αιτήματα βλέπουν πάντα
+    είτε τον παλιό είτε τον νέο, ποτέ κάτι ενδιάμεσο.
+    """
+
+    def __init__(self, path, check_interval=1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._next_check = 0.0
+        self._catalog = PropertyCatalog([])
+        self.reload(force=True)
+
+    def _stat_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def current(self):
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.check_interval
+            if self._stat_stamp() != self._stamp:
+                self.reload()
+        return self._catalog
+
+    def reload(self, force=False):
+        """
+        Ξαναδιαβάζει το αρχείο αν άλλαξε. Αν κάποιο άλλο thread κάνει ήδη
+        reload, επιστρέφουμε αμέσως και συνεχίζουμε με τον τρέχοντα κατάλογο.
+        """
+        if not self._lock.acquire(blocking=force):
+            return self._catalog
+        try:
+            stamp = self._stat_stamp()
+            if not force and stamp == self._stamp:
+                return self._catalog
+            try:
+                with span('json', 'read'):
+                    with open(self.path, 'rb') as f:
+                        raw = f.read()
+                    properties = json.loads(raw)
+            except Exception as e:
+                # Κρατάμε τον παλιό κατάλογο· θα ξαναδοκιμάσουμε στον επόμενο έλεγχο
+                print(f"FATAL ERROR: Could not load properties.json. {e}")
+                return self._catalog
+
+            # Η έκδοση βγαίνει από το περιεχόμενο, άρα είναι ίδια σε όλους τους workers
+            version = hashlib.sha1(raw).hexdigest()[:12]
+            if version != self._catalog.version:
+                self._catalog = PropertyCatalog(properties, version=version)
+                # Η πρώτη φόρτωση φαίνεται στην αναφορά εκκίνησης (βλ. startup.py)
+                if self._stamp is not None:
+                    print(f"Loaded {len(self._catalog)} properties into memory (version {version}).")
+            self._stamp = stamp
+            return self._catalog
+        finally:
+            self._lock.release()
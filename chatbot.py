@@ -0,0 +1,332 @@
+# chatbot.py
+"""
+Βοηθητικά για το /ask-chatbot: context με μόνο τα ακίνητα που σχετίζονται
+με την ερώτηση (retrieval από το SearchIndex) και μια σύνοψη του καταλόγου
+ανά έκδοση, cache απαντήσεων (TTL + LRU) για επαναλαμβανόμενες ερωτήσεις,
+streaming (SSE) και write-behind καταγραφή των συνομιλιών στη βάση.
+Οι κλήσεις στο μοντέλο γίνονται μέσω του llm.LLMClient.
+"""
+import atexit
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict, deque
+
+COMPANY_CONTACT_INFO = (
+    "\nCompany Contact Info:\n"
+    "Phone: +30 694 619 3307\n"
+    "Email: info@grouprealestate.gr\n"
+    "Address: El. Venizelou 40, Nea Vrasna, 57021\n"
+)
+
+PROMPT_TEMPLATE = """
+        You are a helpful and professional real estate assistant for "Group Real Estate" and your answers must always be in Greek.
+        Your role is to answer user questions based ONLY on the information provided below.
+        Be friendly, concise, and act like a real estate expert.
+        If the user asks for something not in the provided data, politely state that you don't have that information.
+        Never mention that you are an AI.
+
+        --- PROVIDED DATA ---
+        {context}
+        --- END OF DATA ---
+
+        User Question: "{question}"
+        """
+
+
+# Πόσα ακίνητα (τα πιο σχετικά με την ερώτηση) μπαίνουν με λεπτομέρειες στο prompt
+RETRIEVAL_TOP_K = 5
+MAX_DESCRIPTION_CHARS = 600
+_TAG_RE = re.compile(r'<[^>]+>')
+
+
+def format_price(prop):
+    price = prop.get('price') or 0
+    return f"€{price:,}".replace(',', '.') if price > 0 else 'On request'
+
+
+def format_property_details(prop, translations):
+    """Ένα ακίνητο με τίτλο, περιγραφή και χαρακτηριστικά (στα ελληνικά)."""
+    description = _TAG_RE.sub(' ', translations.get(prop.get('description_key')) or '')
+    description = ' '.join(description.split())
+    if len(description) > MAX_DESCRIPTION_CHARS:
+        description = description[:MAX_DESCRIPTION_CHARS].rsplit(' ', 1)[0] + '…'
+    features = [translations.get(key) or key for key in prop.get('features_keys') or ()]
+    lines = [
+        f"- Property ID: {prop['id']}",
+        f"  Title: {translations.get(prop.get('title_key')) or prop['id']}",
+        f"  Type: {prop.get('type')}, Location: {prop.get('location')}, Price: {format_price(prop)}",
+        f"  Area: {prop.get('area') or 0} m², Bedrooms: {prop.get('bedrooms') or 0}, Bathrooms: {prop.get('bathrooms') or 0}",
+    ]
+    if features:
+        lines.append(f"  Features: {', '.join(features)}")
+    if description:
+        lines.append(f"  Description: {description}")
+    return '\n'.join(lines) + '\n'
+
+
+def build_catalog_summary(catalog):
+    """Σύνοψη όλου του καταλόγου (πλήθη ανά τύπο/περιοχή, εύρος τιμών), σταθερού μεγέθους."""
+    counts = catalog.template_context
+    prices = [prop['price'] for prop in catalog if prop.get('price')]
+    lines = [f"The company currently lists {len(catalog)} properties.\n"]
+    if counts['type_counts']:
+        lines.append("By type: " + ', '.join(f"{t}: {n}" for t, n in sorted(counts['type_counts'].items())) + "\n")
+    locations = {}
+    for prop in catalog:
+        if prop.get('location'):
+            locations[prop['location']] = locations.get(prop['location'], 0) + 1
+    if locations:
+        lines.append("By location: " + ', '.join(f"{name}: {n}" for name, n in sorted(locations.items())) + "\n")
+    if prices:
+        lines.append(f"Prices range from €{min(prices):,} to €{max(prices):,}.\n".replace(',', '.'))
+    return ''.join(lines)
+
+
+_summary_lock = threading.Lock()
+_summary_cache = (None, '')
+
+
+def get_catalog_summary(catalog):
+    """Επιστρέφει τη σύνοψη για την τρέχουσα έκδοση, χτίζοντάς την μόνο όταν αλλάξει."""
+    global _summary_cache
+    version, summary = _summary_cache
+    if version == catalog.version and summary:
+        return summary
+    with _summary_lock:
+        version, summary = _summary_cache
+        if version != catalog.version or not summary:
+            summary = build_catalog_summary(catalog)
+            _summary_cache = (catalog.version, summary)
+        return summary
+
+
+def build_property_context(catalog, properties, translations):
+    """
+    Το μπλοκ δεδομένων του prompt: σύνοψη του καταλόγου και λεπτομέρειες
+    μόνο για τα ακίνητα που επέλεξε το retrieval, ώστε το μέγεθος του
+    prompt να μη μεγαλώνει μαζί με τον κατάλογο.
+    """
+    lines = [get_catalog_summary(catalog)]
+    if properties:
+        lines.append("\nThe properties most relevant to the question:\n")
+        lines.extend(format_property_details(prop, translations) for prop in properties)
+    lines.append(COMPANY_CONTACT_INFO)
+    return ''.join(lines)
+
+
+def build_prompt(context, question):
+    return PROMPT_TEMPLATE.format(context=context, question=question)
+
+
+_PUNCTUATION_RE = re.compile(r'[\s;;?!.,·…]+')
+
+
+def normalize_question(text):
+    """
+    Κανονικοποίηση για το κλειδί της cache: πεζά, χωρίς τόνους/διαλυτικά,
+    χωρίς σημεία στίξης και με ενιαία κενά. Έτσι το "Τι τιμή έχει;" και
+    το "τι τιμη εχει" πέφτουν στην ίδια εγγραφή.
+    """
+    decomposed = unicodedata.normalize('NFD', text.casefold())
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _PUNCTUATION_RE.sub(' ', stripped).strip()
+
+
+class AnswerCache:
+    """Thread-safe cache απαντήσεων με όριο μεγέθους (LRU) και λήξη (TTL)."""
+
+    def __init__(self, maxsize=512, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# ===============================================
+# ==                 STREAMING                 ==
+# ===============================================
+
+def sse_event(data, event=None):
+    """Μορφοποιεί ένα Server-Sent Event με JSON payload."""
+    payload = json.dumps(data, ensure_ascii=False)
+    prefix = f"event: {event}\n" if event else ''
+    return f"{prefix}data: {payload}\n\n"
+
+
+# ===============================================
+# ==     WRITE-BEHIND ΚΑΤΑΓΡΑΦΗ ΣΥΝΟΜΙΛΙΩΝ      ==
+# ===============================================
+
+DROP_OLDEST = 'drop_oldest'
+DROP_NEWEST = 'drop_newest'
+
+
+class ConversationLogger:
+    """
+    Ουρά στη μνήμη για τις εγγραφές συνομιλιών. Ένα background thread τις
+    γράφει σε batches μέσω του `flush_func(records)` όταν μαζευτούν
+    `batch_size` εγγραφές ή περάσουν `flush_interval` δευτερόλεπτα.
+
+    Το log() δεν μπλοκάρει ποτέ: αν η ουρά γεμίσει (π.χ. αργή βάση),
+    πετάμε την παλαιότερη (drop_oldest) ή τη νέα (drop_newest) εγγραφή.
+    """
+
+    def __init__(self, flush_func, max_queue=10000, batch_size=100,
+                 flush_interval=2.0, policy=DROP_OLDEST):
+        if policy not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"Unknown conversation log policy: {policy}")
+        self.flush_func = flush_func
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.policy = policy
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._pid = None
+        self._stopping = False
+        self.written = 0
+        self.dropped = 0
+        self.failed_batches = 0
+        atexit.register(self.stop)
+
+    def _ensure_started(self):
+        # Το thread ξεκινά τεμπέλικα και ξανά μετά από fork (gunicorn workers)
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._cond:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name='conversation-logger', daemon=True)
+            self._thread.start()
+
+    def log(self, record):
+        """Βάζει μια εγγραφή στην ουρά. Επιστρέφει False αν πετάχτηκε."""
+        self._ensure_started()
+        with self._cond:
+            if len(self._queue) >= self.max_queue:
+                self.dropped += 1
+                if self.policy == DROP_NEWEST:
+                    return False
+                self._queue.popleft()
+            self._queue.append(record)
+            if len(self._queue) >= self.batch_size:
+                self._cond.notify()
+        return True
+
+    def _take_batch(self):
+        batch = []
+        while self._queue and len(batch) < self.batch_size:
+            batch.append(self._queue.popleft())
+        return batch
+
+    def _write(self, batch):
+        try:
+            self.flush_func(batch)
+            self.written += len(batch)
+        except Exception as e:
+            self.failed_batches += 1
+            print(f"Error logging {len(batch)} conversations to database: {e}")
+            # Ξαναβάζουμε το batch μπροστά στην ουρά όσο χωράει
+            with self._cond:
+                room = self.max_queue - len(self._queue)
+                if room < len(batch):
+                    self.dropped += len(batch) - max(room, 0)
+                    batch = batch[:max(room, 0)]
+                self._queue.extendleft(reversed(batch))
+            return False
+        return True
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if len(self._queue) < self.batch_size and not self._stopping:
+                    self._cond.wait(self.flush_interval)
+                batch = self._take_batch()
+                stopping = self._stopping
+            if batch and not self._write(batch):
+                # Η βάση απέτυχε· περιμένουμε ένα διάστημα πριν ξαναδοκιμάσουμε
+                if stopping:
+                    return
+                time.sleep(self.flush_interval)
+            if stopping and not self._queue:
+                return
+
+    def flush(self):
+        """Γράφει συγχρονισμένα ό,τι υπάρχει στην ουρά (π.χ. σε shutdown)."""
+        while True:
+            with self._cond:
+                batch = self._take_batch()
+            if not batch or not self._write(batch):
+                return
+
+    def stop(self, timeout=5.0):
+        thread = self._thread
+        if thread is not None and thread.is_alive() and self._pid == os.getpid():
+            with self._cond:
+                self._stopping = True
+                self._cond.notify()
+            thread.join(timeout)
+        self.flush()
+
+    def stats(self):
+        with self._cond:
+            queued = len(self._queue)
+        return {
+            'queued': queued,
+            'max_queue': self.max_queue,
+            'policy': self.policy,
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed_batches': self.failed_batches,
+        }
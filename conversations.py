@@ -0,0 +1,254 @@
+# conversations.py
+"""
+Οι συνομιλίες του chatbot: σελιδοποίηση για το admin, σύνολα ανά ημέρα και retention.
+
+- page(): keyset σελιδοποίηση (νεότερες πρώτα) πάνω στο index (timestamp, id),
+  με φίλτρο ημερομηνιών/συνεδρίας· κάθε σελίδα είναι ένα range scan, όσο
+  βαθιά κι αν βρίσκεται, αντί για OFFSET που σαρώνει όλες τις προηγούμενες.
+- rollup(): οι συνομιλίες παλαιότερες από `retention_days` συνοψίζονται ανά
+  ημέρα (ερωτήσεις, συνεδρίες, ακίνητα) στους πίνακες conversation_days και
+  conversation_day_properties και μετά σβήνονται, μία ημέρα ανά transaction.
+  Έτσι ο πίνακας conversations μένει μικρός.
+- daily(): τα σύνολα ανά ημέρα, από τους πίνακες συνόλων για όσες ημέρες
+  έχουν σβηστεί και από τις ίδιες τις συνομιλίες για τις πρόσφατες. Τα
+  ακίνητα μετριούνται με GROUP BY πάνω στα στοιχεία του property_ids
+  (json_each στο SQLite, json_array_elements_text στο PostgreSQL).
+- upgrade_schema(): αναβάθμιση παλιών βάσεων (timestamp ως κείμενο, χωρίς indexes).
+"""
+import base64
+import json
+from datetime import date, datetime, time, timedelta
+
+import sqlalchemy as sa
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+TOP_PROPERTIES = 10
+
+
+def encode_cursor(timestamp, conversation_id):
+    """Αδιαφανής cursor: timestamp και id της τελευταίας συνομιλίας της σελίδας."""
+    raw = json.dumps([timestamp.isoformat(), conversation_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Το αντίστροφο του encode_cursor· ValueError αν ο cursor δεν είναι έγκυρος."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        timestamp, conversation_id = json.loads(raw)
+        timestamp = datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError) as e:
+        raise ValueError('Invalid cursor') from e
+    if not isinstance(conversation_id, int):
+        raise ValueError('Invalid cursor')
+    return timestamp, conversation_id
+
+
+def parse_day(value):
+    """'YYYY-MM-DD' -> date (None αν είναι κενό)· ValueError αν δεν είναι έγκυρο."""
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError('dates must be YYYY-MM-DD') from None
+
+
+def _day_start(day):
+    return datetime.combine(day, time.min) if day else None
+
+
+class ConversationStore:
+
+    def __init__(self, db, model, day_model, day_property_model, retention_days=90):
+        self.db = db
+        self.model = model
+        self.day_model = day_model
+        self.day_property_model = day_property_model
+        self.retention_days = retention_days
+
+    def _in_range(self, query, start, end):
+        """Φίλτρο [start, end) σε datetimes (None = ανοιχτό άκρο)."""
+        Conversation = self.model
+        if start is not None:
+            query = query.where(Conversation.timestamp >= start)
+        if end is not None:
+            query = query.where(Conversation.timestamp < end)
+        return query
+
+    def page(self, first_day=None, last_day=None, session_id=None, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """
+        (συνομιλίες, next_cursor): οι νεότερες πρώτα, από την πρώτη έως και την
+        τελευταία ημέρα. next_cursor είναι None στην τελευταία σελίδα.
+        """
+        Conversation = self.model
+        query = self.db.select(Conversation).order_by(Conversation.timestamp.desc(), Conversation.id.desc())
+        end = _day_start(last_day + timedelta(days=1)) if last_day else None
+        query = self._in_range(query, _day_start(first_day), end)
+        if session_id:
+            query = query.where(Conversation.session_id == session_id)
+        if cursor is not None:
+            timestamp, conversation_id = cursor
+            query = query.where(self.db.or_(
+                Conversation.timestamp < timestamp,
+                self.db.and_(Conversation.timestamp == timestamp, Conversation.id < conversation_id)
+            ))
+        rows = self.db.session.execute(query.limit(limit + 1)).scalars().all()
+        if len(rows) <= limit:
+            return rows, None
+        last = rows[limit - 1]
+        return rows[:limit], encode_cursor(last.timestamp, last.id)
+
+    @staticmethod
+    def to_dict(conversation):
+        return {
+            'id': conversation.id,
+            'timestamp': conversation.timestamp.isoformat(timespec='seconds'),
+            'session_id': conversation.session_id,
+            'user_question': conversation.user_question,
+            'bot_answer': conversation.bot_answer,
+            'property_ids': conversation.property_ids or [],
+        }
+
+    # --- Σύνολα ανά ημέρα ---
+
+    def _property_ids(self):
+        """Τα στοιχεία του JSON πίνακα property_ids, ως πίνακας σε join με τις συνομιλίες."""
+        property_ids = self.model.property_ids
+        if self.db.session.get_bind().dialect.name == 'postgresql':
+            return self.db.func.json_array_elements_text(property_ids).table_valued('value').lateral()
+        return self.db.func.json_each(property_ids).table_valued('value')
+
+    def _property_counts(self, start, end):
+        """SELECT (property_id, questions): σε πόσες συνομιλίες του [start, end) ανασύρθηκε κάθε ακίνητο."""
+        Conversation = self.model
+        elements = self._property_ids()
+        query = self.db.select(
+            elements.c.value.label('property_id'),
+            self.db.func.count(Conversation.id.distinct()).label('questions')
+        ).select_from(Conversation).join(elements, sa.true()).where(elements.c.value.is_not(None))
+        return self._in_range(query, start, end).group_by(elements.c.value)
+
+    def _summarize(self, start, end):
+        """(ερωτήσεις, συνεδρίες, {ακίνητο: ερωτήσεις}) των συνομιλιών στο [start, end)."""
+        Conversation = self.model
+        questions, sessions = self.db.session.execute(self._in_range(
+            self.db.select(self.db.func.count(), self.db.func.count(Conversation.session_id.distinct())), start, end
+        )).one()
+        properties = dict(self.db.session.execute(self._property_counts(start, end)).all())
+        return questions, sessions, properties
+
+    def daily(self, first_day=None, last_day=None, top=TOP_PROPERTIES):
+        """
+        {'days': [{day, questions, sessions}], 'top_properties': [{property_id, questions}]}
+        για τις ημέρες [first_day, last_day], σβησμένες και μη.
+        """
+        Day, DayProperty, Conversation = self.day_model, self.day_property_model, self.model
+        days = {}
+
+        rolled = self.db.select(Day)
+        rolled_properties = self.db.select(DayProperty.property_id, DayProperty.questions)
+        if first_day:
+            rolled = rolled.where(Day.day >= first_day)
+            rolled_properties = rolled_properties.where(DayProperty.day >= first_day)
+        if last_day:
+            rolled = rolled.where(Day.day <= last_day)
+            rolled_properties = rolled_properties.where(DayProperty.day <= last_day)
+        for row in self.db.session.execute(rolled).scalars():
+            days[row.day.isoformat()] = {'questions': row.questions, 'sessions': row.sessions}
+
+        # Οι πρόσφατες ημέρες από τις ίδιες τις συνομιλίες (range scan στο index)
+        end = _day_start(last_day + timedelta(days=1)) if last_day else None
+        day_column = self.db.func.date(Conversation.timestamp)
+        live = self._in_range(
+            self.db.select(day_column, self.db.func.count(), self.db.func.count(Conversation.session_id.distinct())),
+            _day_start(first_day), end
+        ).group_by(day_column)
+        for day, questions, sessions in self.db.session.execute(live):
+            entry = days.setdefault(str(day), {'questions': 0, 'sessions': 0})
+            entry['questions'] += questions
+            entry['sessions'] += sessions
+
+        # Τα πιο ζητημένα ακίνητα υπολογίζονται όλα στη βάση: μόνο τα `top` φτάνουν εδώ
+        property_counts = sa.union_all(rolled_properties, self._property_counts(_day_start(first_day), end)).subquery()
+        total = self.db.func.sum(property_counts.c.questions)
+        top_properties = self.db.session.execute(
+            self.db.select(property_counts.c.property_id, total)
+            .group_by(property_counts.c.property_id)
+            .order_by(total.desc(), property_counts.c.property_id)
+            .limit(top)
+        ).all()
+
+        return {
+            'days': [{'day': day, **counts} for day, counts in sorted(days.items())],
+            'top_properties': [{'property_id': property_id, 'questions': questions}
+                               for property_id, questions in top_properties],
+        }
+
+    # --- Retention ---
+
+    def rollup(self, now=None):
+        """
+        Συνοψίζει και σβήνει τις συνομιλίες πριν από τα μεσάνυχτα της ημέρας
+        (σήμερα - retention_days), μία ημέρα ανά transaction. Επιστρέφει
+        {'days': ..., 'conversations': ...} όσων σβήστηκαν.
+        """
+        Day, DayProperty, Conversation = self.day_model, self.day_property_model, self.model
+        session = self.db.session
+        cutoff = _day_start((now or datetime.now()).date() - timedelta(days=self.retention_days))
+        rolled_days = rolled_rows = 0
+        while True:
+            oldest = session.execute(
+                self.db.select(self.db.func.min(Conversation.timestamp)).where(Conversation.timestamp < cutoff)
+            ).scalar()
+            if oldest is None:
+                break
+            day = oldest.date()
+            start, end = _day_start(day), min(_day_start(day + timedelta(days=1)), cutoff)
+            try:
+                questions, sessions, properties = self._summarize(start, end)
+                summary = session.get(Day, day) or Day(day=day, questions=0, sessions=0)
+                summary.questions += questions
+                summary.sessions += sessions
+                session.add(summary)
+                for property_id, count in properties.items():
+                    row = session.get(DayProperty, (day, property_id)) or DayProperty(
+                        day=day, property_id=property_id, questions=0)
+                    row.questions += count
+                    session.add(row)
+                session.execute(self._in_range(self.db.delete(Conversation), start, end))
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+            rolled_days += 1
+            rolled_rows += questions
+        return {'days': rolled_days, 'conversations': rolled_rows}
+
+
+def upgrade_schema(db, model):
+    """
+    Αναβαθμίζει μια παλιά βάση στο τρέχον σχήμα (ασφαλές να τρέξει ξανά):
+    νέοι πίνακες, στήλη property_ids, timestamp ως TIMESTAMP (PostgreSQL) ή
+    στη μορφή που γράφει το SQLAlchemy (SQLite) και τα indexes.
+    """
+    engine = db.engine
+    db.create_all()
+    columns = {column['name']: column for column in sa.inspect(engine).get_columns(model.__tablename__)}
+    with engine.begin() as conn:
+        if 'property_ids' not in columns:
+            conn.execute(sa.text(f'ALTER TABLE {model.__tablename__} ADD COLUMN property_ids JSON'))
+        if engine.dialect.name == 'postgresql' and not isinstance(columns['timestamp']['type'], sa.DateTime):
+            conn.execute(sa.text(
+                f'ALTER TABLE {model.__tablename__} ALTER COLUMN "timestamp" TYPE TIMESTAMP '
+                'USING "timestamp"::timestamp'
+            ))
+        elif engine.dialect.name == 'sqlite':
+            # Τα παλιά 'YYYY-MM-DD HH:MM:SS' συγκρίνονται σωστά με τα νέα μόνο με ίδια μορφή
+            conn.execute(sa.text(
+                f"UPDATE {model.__tablename__} SET timestamp = timestamp || '.000000' "
+                "WHERE length(timestamp) = 19"
+            ))
+    for index in model.__table__.indexes:
+        index.create(engine, checkfirst=True)
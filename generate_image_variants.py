@@ -0,0 +1,32 @@
+# generate_image_variants.py
+# Φτιάχνει (backfill) τα responsive παράγωγα για τις εικόνες των ακινήτων που
+# υπάρχουν ήδη, παράλληλα σε process pool, και τα καταγράφει στα ακίνητα.
+# Ό,τι υπάρχει ήδη και είναι ενημερωμένο παραλείπεται, οπότε ξανατρέχει με ασφάλεια.
+# Χρήση:  python generate_image_variants.py [αριθμός processes]
+import sys
+
+from app import app, catalog_backend, catalog_store
+from images import backfill_variants, supported_formats
+
+if __name__ == '__main__':
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    formats = supported_formats()
+    if not formats:
+        sys.exit("Pillow with WebP/AVIF support is required: pip install Pillow")
+    print(f"Generating {', '.join(formats)} variants...")
+
+    properties = catalog_store.current().properties
+    image_paths = [path for prop in properties for path in prop.get('images') or []]
+    variants, errors = backfill_variants(image_paths, workers=workers)
+    for path, error in errors.items():
+        print(f"Error creating variants for {path}: {error}")
+
+    updated = 0
+    with app.app_context():
+        for prop in properties:
+            image_variants = {path: variants[path] for path in prop.get('images') or [] if path in variants}
+            if image_variants != (prop.get('image_variants') or {}):
+                catalog_backend.save_property(dict(prop, image_variants=image_variants))
+                updated += 1
+    catalog_store.reload(force=True)
+    print(f"Created variants for {len(variants)} of {len(set(image_paths))} images; updated {updated} properties.")
@@ -0,0 +1,50 @@
+# gunicorn.conf.py
+"""
+Ρυθμίσεις του gunicorn (τις διαβάζει αυτόματα από τον τρέχοντα φάκελο):
+
+    gunicorn --workers 4
+
+Το app φορτώνεται μία φορά στον master (preload): ο κατάλογος, όλα τα i18n
+λεξικά, το ευρετήριο αναζήτησης και τα templates χτίζονται μία φορά και οι
+workers τα μοιράζονται copy-on-write, αντί για ένα αντίγραφο ο καθένας.
+Το gc.freeze() πριν το fork κρατά τα κοινά αντικείμενα έξω από τον garbage
+collector των workers, ώστε να μην "λερώνει" τις κοινές σελίδες μνήμης.
+
+PRELOAD_APP=0 επαναφέρει το φόρτωμα ανά worker (π.χ. για --reload).
+"""
+import gc
+import os
+
+wsgi_app = 'app:app'
+preload_app = os.environ.get('PRELOAD_APP', '1') == '1'
+
+if preload_app:
+    # Χωρίς συλλογές όσο χτίζονται τα δεδομένα: ούτε κενά στις σελίδες που θα
+    # μοιραστούν, ούτε άσκοπα περάσματα πάνω σε εκατομμύρια νέα αντικείμενα
+    gc.disable()
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    import app
+    app.preload()
+    server.log.info(app.startup.summary())
+    gc.freeze()
+    gc.enable()
+
+
+def pre_fork(server, worker):
+    # Και ό,τι δημιούργησε ο master μετά το when_ready (π.χ. πριν από restart ενός worker)
+    if preload_app:
+        gc.freeze()
+
+
+def post_worker_init(worker):
+    from startup import memory_usage
+    memory = memory_usage()
+    if memory:
+        worker.log.info(
+            "Worker %s ready: rss %.1f MB (shared %.1f MB, private %.1f MB)",
+            worker.pid, memory['rss_mb'], memory['shared_mb'], memory['private_mb']
+        )
@@ -0,0 +1,75 @@
+# http_cache.py
+"""
+Validators (ETag) για τις σελίδες και μετρητές για το πόσα bytes γλιτώνουμε.
+
+Το ETag μιας σελίδας βγαίνει από το ίδιο κλειδί με το page cache (εκδόσεις
+καταλόγου/ακινήτου, γλώσσα, μεταφράσεις, templates, args) και όχι από το
+rendered HTML, οπότε ένα If-None-Match που ταιριάζει απαντιέται με 304 πριν
+καν αποδοθεί ή διαβαστεί η σελίδα. Τα static (i18n, properties.json κ.λπ.)
+έχουν ήδη ETag από το send_file (βλ. assets.py).
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def page_etag(key):
+    """Strong ETag από το κλειδί της σελίδας (ίδιο σε όλους τους workers)."""
+    return hashlib.sha1(repr(key).encode('utf-8')).hexdigest()[:20]
+
+
+class ResponseStats:
+    """
+    Μετρητές ανά κατηγορία (html/json/static/other) για αυτόν τον worker:
+    απαντήσεις, 304, bytes που στάλθηκαν και (κατά προσέγγιση) bytes που
+    γλιτώσαμε, με βάση το μέγεθος της τελευταίας πλήρους απάντησης ανά ETag.
+    """
+
+    def __init__(self, max_etags=4096):
+        self.max_etags = max_etags
+        self._sizes = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def category(endpoint, mimetype):
+        if endpoint == 'static':
+            return 'static'
+        if mimetype == 'text/html':
+            return 'html'
+        if mimetype == 'application/json':
+            return 'json'
+        return 'other'
+
+    def record(self, endpoint, response):
+        category = self.category(endpoint, response.mimetype)
+        etag = response.get_etag()[0]
+        # Από το header, ώστε να μετρούν και τα αρχεία του send_file (streamed)
+        size = response.content_length
+        with self._lock:
+            counters = self._counters.setdefault(category, {
+                'responses': 0, 'not_modified': 0, 'bytes_sent': 0, 'bytes_saved': 0
+            })
+            counters['responses'] += 1
+            if response.status_code == 304:
+                counters['not_modified'] += 1
+                counters['bytes_saved'] += self._sizes.get(etag, 0) if etag else 0
+                return
+            if size:
+                counters['bytes_sent'] += size
+                if etag and response.status_code == 200:
+                    self._sizes[etag] = size
+                    self._sizes.move_to_end(etag)
+                    while len(self._sizes) > self.max_etags:
+                        self._sizes.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            result = {}
+            for category, counters in self._counters.items():
+                responses = counters['responses']
+                result[category] = dict(
+                    counters,
+                    not_modified_rate=round(counters['not_modified'] / responses, 4) if responses else 0.0
+                )
+            return result
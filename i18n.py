@@ -0,0 +1,134 @@
+# i18n.py
+"""
+Μεταφράσεις στον server: οι σελίδες αποδίδονται κατευθείαν στη γλώσσα του
+επισκέπτη, χωρίς fetch ολόκληρου του i18n/<lang>.json από τον browser.
+
+- TranslationStore: όλα τα i18n/*.json στη μνήμη, μία φορά ανά process.
+  Ξαναφορτώνει ένα αρχείο μόνο όταν αλλάξει (π.χ. μετά από admin save).
+- LanguagePrefixMiddleware: τα /en/listings, /de/property/... σερβίρονται από
+  τα ίδια routes· το πρόθεμα αφαιρείται και κρατιέται στο WSGI environ.
+- choose_language: πρόθεμα URL, μετά cookie, μετά Accept-Language.
+Στον client πηγαίνει μόνο το "slice" με τα κλειδιά που χρησιμοποίησε η σελίδα.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+from metrics import span
+
+PREFIX_ENVIRON_KEY = 'i18n.prefix_lang'
+LANGUAGE_COOKIE = 'lang'
+# Κωδικοί του Accept-Language που στο site έχουν άλλο όνομα αρχείου
+LANGUAGE_ALIASES = {'tr': 'tu', 'gr': 'el'}
+
+
+class TranslationStore:
+
+    def __init__(self, i18n_dir, default_lang='el', check_interval=1.0):
+        self.i18n_dir = i18n_dir
+        self.default_lang = default_lang
+        self.check_interval = check_interval
+        self._dicts = {}
+        self._stamps = {}
+        self._versions = {}
+        self._next_check = {}
+        self._lock = threading.Lock()
+        self.languages = sorted(
+            name[:-5] for name in os.listdir(i18n_dir) if name.endswith('.json')
+        )
+
+    def _path(self, lang):
+        return os.path.join(self.i18n_dir, f'{lang}.json')
+
+    def _load(self, lang):
+        path = self._path(lang)
+        st = os.stat(path)
+        stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if self._stamps.get(lang) == stamp:
+            return
+        try:
+            with span('json', 'read'):
+                with open(path, 'rb') as f:
+                    raw = f.read()
+                translations = json.loads(raw)
+        except ValueError as e:
+            # Κρατάμε την προηγούμενη έκδοση αν το αρχείο είναι (προσωρινά) χαλασμένο
+            print(f"ERROR: Could not load {lang}.json: {e}")
+            if lang in self._dicts:
+                return
+            translations = {}
+        self._dicts[lang] = translations
+        self._versions[lang] = hashlib.sha1(raw).hexdigest()[:12]
+        self._stamps[lang] = stamp
+
+    def load_all(self):
+        """Φορτώνει από πριν όλες τις γλώσσες (π.χ. στον gunicorn master, πριν το fork)."""
+        for lang in self.languages:
+            self.get(lang)
+
+    def get(self, lang):
+        """Το λεξικό της γλώσσας (το ίδιο αντικείμενο, μόνο για ανάγνωση)."""
+        if lang not in self.languages:
+            lang = self.default_lang
+        now = time.monotonic()
+        if now >= self._next_check.get(lang, 0.0):
+            with self._lock:
+                if now >= self._next_check.get(lang, 0.0):
+                    self._load(lang)
+                    self._next_check[lang] = now + self.check_interval
+        return self._dicts[lang]
+
+    def version(self, lang):
+        self.get(lang)
+        return self._versions.get(lang if lang in self.languages else self.default_lang)
+
+    def translate(self, lang, key):
+        return self.get(lang).get(key) or ''
+
+    def slice(self, lang, keys):
+        translations = self.get(lang)
+        return {key: translations[key] for key in sorted(keys) if translations.get(key)}
+
+    def slice_etag(self, lang, keys):
+        """Αλλάζει όταν αλλάξει το αρχείο της γλώσσας ή το σύνολο των κλειδιών."""
+        keys_hash = hashlib.sha1(','.join(sorted(keys)).encode('utf-8')).hexdigest()[:12]
+        return f"{lang}-{self.version(lang)}-{keys_hash}"
+
+
+def normalize_language(code, languages):
+    if not code:
+        return None
+    code = code.strip().lower().replace('_', '-').split('-')[0]
+    code = LANGUAGE_ALIASES.get(code, code)
+    return code if code in languages else None
+
+
+def choose_language(prefix_lang, cookie_lang, accept_languages, languages, default):
+    """Πρόθεμα URL > cookie > Accept-Language > προεπιλογή."""
+    for candidate in (prefix_lang, cookie_lang):
+        lang = normalize_language(candidate, languages)
+        if lang:
+            return lang
+    for value, _quality in accept_languages:
+        lang = normalize_language(value, languages)
+        if lang:
+            return lang
+    return default
+
+
+class LanguagePrefixMiddleware:
+    """Αφαιρεί το /<lang> από την αρχή του path και το περνά στο environ."""
+
+    def __init__(self, wsgi_app, languages):
+        self.wsgi_app = wsgi_app
+        self.languages = set(languages)
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        segment, _, rest = path.lstrip('/').partition('/')
+        if segment in self.languages:
+            environ[PREFIX_ENVIRON_KEY] = segment
+            environ['PATH_INFO'] = '/' + rest
+        return self.wsgi_app(environ, start_response)
@@ -0,0 +1,184 @@
+# images.py
+"""
+Responsive παράγωγα (derivatives) για τις φωτογραφίες των ακινήτων.
+
+Για κάθε ανεβασμένη εικόνα φτιάχνονται λίγα σταθερά πλάτη (thumb, card,
+gallery, full) σε AVIF και WebP, χωρίς metadata (EXIF/ICC/GPS), στον φάκελο
+`_variants/` δίπλα στο πρωτότυπο, με το πλήρες όνομά του (και την κατάληξη)
+στο όνομα του παραγώγου, ώστε τα a.jpg και a.png να μη μοιράζονται αρχεία.
+Τα παράγωγα καταγράφονται στο ακίνητο ως
+    'image_variants': {web_path: {'avif': [[320, path], ...], 'webp': [...], 'source': ...}}
+ώστε τα templates να βγάζουν srcset· το 'source' (mtime και μέγεθος του
+πρωτοτύπου) δείχνει αν μια εικόνα ανέβηκε ξανά με το ίδιο όνομα. Το Pillow είναι προαιρετικό: χωρίς αυτό
+δεν φτιάχνονται παράγωγα και οι σελίδες δείχνουν τα πρωτότυπα όπως πριν.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+VARIANT_WIDTHS = {'thumb': 320, 'card': 640, 'gallery': 1024, 'full': 1600}
+VARIANT_FORMATS = ('avif', 'webp')
+VARIANT_QUALITY = {'avif': 55, 'webp': 80}
+VARIANT_DIR = '_variants'
+STATIC_DIR = 'static'
+
+
+def _load_pillow():
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        return None, None
+    try:
+        import pillow_avif  # noqa: F401  (AVIF για Pillow < 11.3)
+    except ImportError:
+        pass
+    return Image, ImageOps
+
+
+def supported_formats():
+    """Όσα από τα VARIANT_FORMATS μπορεί να γράψει το εγκατεστημένο Pillow."""
+    Image, _ = _load_pillow()
+    if Image is None:
+        return ()
+    Image.init()
+    return tuple(fmt for fmt in VARIANT_FORMATS if fmt.upper() in Image.SAVE)
+
+
+def variant_path(web_path, width, fmt):
+    folder, name = os.path.split(web_path)
+    return f"{folder}/{VARIANT_DIR}/{name}-{width}w.{fmt}"
+
+
+def source_stamp(web_path, static_dir=STATIC_DIR):
+    """'mtime_ns-μέγεθος' του πρωτοτύπου· None αν δεν υπάρχει."""
+    try:
+        stat = os.stat(os.path.join(static_dir, web_path))
+    except OSError:
+        return None
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def _target_widths(original_width):
+    widths = sorted(w for w in VARIANT_WIDTHS.values() if w <= original_width)
+    # Μικρότερη από το thumb: ένα μόνο παράγωγο στο αρχικό πλάτος (όχι upscale)
+    return widths or [original_width]
+
+
+def make_variants(web_path, static_dir=STATIC_DIR):
+    """
+    Φτιάχνει τα παράγωγα μίας εικόνας (`web_path` σχετικό με το static/).
+    Όσα υπάρχουν ήδη και είναι νεότερα από το πρωτότυπο δεν ξαναγράφονται.
+    Επιστρέφει {format: [[πλάτος, web_path], ...], 'source': source_stamp}
+    ή {} αν δεν γίνεται.
+    """
+    Image, ImageOps = _load_pillow()
+    formats = supported_formats()
+    source = os.path.join(static_dir, web_path)
+    if Image is None or not formats or not os.path.isfile(source):
+        return {}
+    stamp = source_stamp(web_path, static_dir)
+
+    source_mtime = os.path.getmtime(source)
+    with Image.open(source) as original:
+        # Εφαρμόζουμε το EXIF orientation πριν πετάξουμε τα metadata
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+        image.load()
+
+    variants = {}
+    for fmt in formats:
+        variants[fmt] = []
+        for width in _target_widths(image.width):
+            path = variant_path(web_path, width, fmt)
+            target = os.path.join(static_dir, path)
+            if not (os.path.exists(target) and os.path.getmtime(target) >= source_mtime):
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                height = max(1, round(image.height * width / image.width))
+                resized = image.resize((width, height), Image.LANCZOS) if width != image.width else image.copy()
+                resized.info = {}  # Χωρίς EXIF/ICC/XMP στο αποτέλεσμα
+                tmp_path = f"{target}.tmp"
+                resized.save(tmp_path, format=fmt.upper(), quality=VARIANT_QUALITY[fmt])
+                os.replace(tmp_path, target)
+            variants[fmt].append([width, path])
+    variants['source'] = stamp
+    return variants
+
+
+def remove_variants(web_path, static_dir=STATIC_DIR):
+    """Διαγράφει τα παράγωγα μίας εικόνας (π.χ. όταν αφαιρείται από το ακίνητο)."""
+    folder = os.path.join(static_dir, os.path.dirname(web_path), VARIANT_DIR)
+    original = os.path.basename(web_path)
+    if not os.path.isdir(folder):
+        return
+    for name in os.listdir(folder):
+        if name.rsplit('-', 1)[0] == original:
+            os.remove(os.path.join(folder, name))
+
+
+def build_image_variants(image_paths, existing=None, static_dir=STATIC_DIR):
+    """
+    Επιστρέφει το πεδίο 'image_variants' για τη λίστα εικόνων ενός ακινήτου,
+    κρατώντας όσα παράγωγα του `existing` φτιάχτηκαν από το ίδιο πρωτότυπο
+    (ίδιο source_stamp)· μια εικόνα που ανέβηκε ξανά με το ίδιο όνομα ξαναγίνεται.
+    """
+    existing = existing or {}
+    result = {}
+    for path in image_paths:
+        variants = existing.get(path)
+        if not variants or variants.get('source') != source_stamp(path, static_dir):
+            if variants:
+                # Τα παλιά πλάτη μπορεί να μην ξαναγίνουν (π.χ. μικρότερη νέα εικόνα)
+                remove_variants(path, static_dir)
+            variants = make_variants(path, static_dir)
+        if variants:
+            result[path] = variants
+    return result
+
+
+def _make_variants_task(args):
+    web_path, static_dir = args
+    try:
+        return web_path, make_variants(web_path, static_dir), None
+    except Exception as e:
+        return web_path, {}, str(e)
+
+
+def backfill_variants(image_paths, static_dir=STATIC_DIR, workers=None):
+    """
+    Φτιάχνει τα παράγωγα πολλών εικόνων παράλληλα σε process pool (η κωδικοποίηση
+    AVIF/WebP είναι CPU-bound). Επιστρέφει ({web_path: variants}, {web_path: σφάλμα}).
+    """
+    variants, errors = {}, {}
+    tasks = [(path, static_dir) for path in dict.fromkeys(image_paths)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for web_path, result, error in pool.map(_make_variants_task, tasks, chunksize=4):
+            if error:
+                errors[web_path] = error
+            elif result:
+                variants[web_path] = result
+    return variants, errors
+
+
+def srcset(variants, fmt):
+    """Το srcset ('url 320w, url 640w, ...') ενός format· '' αν δεν υπάρχουν παράγωγα."""
+    from flask import url_for
+    return ', '.join(f"{url_for('static', filename=path)} {width}w"
+                     for width, path in (variants or {}).get(fmt, []))
+
+
+def image_srcsets(prop):
+    """
+    Για τα templates: μία εγγραφή {'avif': srcset, 'webp': srcset} ανά εικόνα
+    του ακινήτου, με τη σειρά του prop['images'].
+    """
+    all_variants = prop.get('image_variants') or {}
+    return [
+        {fmt: srcset(all_variants.get(path), fmt) for fmt in VARIANT_FORMATS}
+        for path in prop.get('images') or []
+    ]
+
+
+def main_image_srcsets(prop):
+    all_variants = prop.get('image_variants') or {}
+    variants = all_variants.get(prop.get('main_image'))
+    return {fmt: srcset(variants, fmt) for fmt in VARIANT_FORMATS}
@@ -0,0 +1,13 @@
+# import_catalog.py
+# Εισάγει ΜΙΑ ΦΟΡΑ το properties.json και τα i18n/*.json στους πίνακες
+# properties/translations, για να δουλέψει το app με CATALOG_BACKEND=db.
+# Χρήση:  python import_catalog.py
+from app import app, db, PROPERTIES_PATH, I18N_DIR
+from storage import import_from_json, upgrade_schema
+
+print("Connecting to database...")
+with app.app_context():
+    db.create_all()
+    upgrade_schema(db)
+    count, languages, translation_count = import_from_json(db, PROPERTIES_PATH, I18N_DIR)
+    print(f"Imported {count} properties and {translation_count} translations ({', '.join(languages)}).")
@@ -1,6 +1,10 @@
 # init_db.py
 import os
 from app import app, db
+from conversations import upgrade_schema
+from jobs import upgrade_schema as upgrade_jobs_schema
+from models import Conversation, Job
+from storage import upgrade_schema as upgrade_catalog_schema
 
 # Παίρνουμε το DATABASE_URL από το περιβάλλον
 DATABASE_URL = os.environ.get('DATABASE_URL')
@@ -21,4 +25,8 @@ print("Connecting to database...")
 with app.app_context():
     print("Creating database tables...")
     db.create_all() # <-- Αυτό "χτίζει" τους πίνακες με βάση τα Models (π.χ. class Conversation)
+    # Παλιές βάσεις: timestamp ως κείμενο, χωρίς property_ids και indexes
+    upgrade_schema(db, Conversation)
+    upgrade_jobs_schema(db, Job)
+    upgrade_catalog_schema(db)
     print("Database tables created successfully.")
\ No newline at end of file
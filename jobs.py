@@ -0,0 +1,231 @@
+# jobs.py
+"""
+Τοπική, ανθεκτική (durable) ουρά εργασιών για τις βαριές admin ενέργειες.
+
+Οι εργασίες αποθηκεύονται ως γραμμές στη βάση (μοντέλο Job του app), άρα
+επιβιώνουν από restart και μοιράζονται σε όλους τους gunicorn workers.
+Κάθε worker τρέχει λίγα background threads που "διεκδικούν" εργασίες με
+ατομικό UPDATE (compare-and-set), ώστε κάθε εργασία να τρέχει μία φορά.
+Εργασίες που έμειναν "running" μετά από crash ξαναπαίρνονται όταν λήξει
+το lease τους, και οι αποτυχημένες ξαναδοκιμάζονται με καθυστέρηση.
+Εργασίες με το ίδιο `serial_key` (π.χ. ένα ακίνητο) τρέχουν μία-μία, με τη
+σειρά που μπήκαν: διεκδικείται μόνο η παλαιότερη εκκρεμής του κάθε κλειδιού.
+"""
+import json
+import os
+import threading
+import traceback
+import uuid
+from datetime import datetime, timedelta
+
+import sqlalchemy as sa
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+
+class JobFailed(Exception):
+    """Αποτυχία που δεν διορθώνεται με επανάληψη: η εργασία γίνεται αμέσως failed."""
+
+
+class JobQueue:
+
+    def __init__(self, app, db, model, workers=2, poll_interval=2.0,
+                 max_attempts=3, retry_delay=10.0, lease_seconds=600):
+        self.app = app
+        self.db = db
+        self.model = model
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.lease_seconds = lease_seconds
+        self.handlers = {}
+        self._wakeup = threading.Event()
+        self._threads = []
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def handler(self, kind):
+        """Decorator: καταχωρεί τη συνάρτηση που εκτελεί εργασίες τύπου `kind`."""
+        def register(func):
+            self.handlers[kind] = func
+            return func
+        return register
+
+    # --- Πλευρά του request ---
+
+    def enqueue(self, kind, payload, run_after=None, job_id=None, serial_key=None):
+        """
+        Αποθηκεύει νέα εργασία και ξυπνά τους workers. Επιστρέφει το id της.
+        Με `run_after` η εργασία τρέχει από εκείνη την ώρα και μετά· με σταθερό
+        `job_id` (π.χ. ένα ανά ημέρα) μια εργασία που υπάρχει ήδη δεν ξαναμπαίνει,
+        ακόμη κι αν την προγραμματίσουν ταυτόχρονα πολλοί workers. Εργασίες με
+        το ίδιο `serial_key` δεν τρέχουν ποτέ ταυτόχρονα ούτε εκτός σειράς.
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"No job handler registered for '{kind}'")
+        if job_id is not None and self.db.session.get(self.model, job_id) is not None:
+            return job_id
+        now = datetime.now()
+        job = self.model(
+            id=job_id or uuid.uuid4().hex,
+            kind=kind,
+            status=STATUS_QUEUED,
+            payload=json.dumps(payload, ensure_ascii=False),
+            attempts=0,
+            created_at=now,
+            updated_at=now,
+            run_after=run_after or now,
+            serial_key=serial_key
+        )
+        self.db.session.add(job)
+        try:
+            self.db.session.commit()
+        except IntegrityError:
+            if job_id is None:
+                raise
+            self.db.session.rollback()
+            return job_id
+        self.start()
+        self._wakeup.set()
+        return job.id
+
+    def pending(self, serial_key):
+        """Αν υπάρχει εργασία με αυτό το `serial_key` που περιμένει ή τρέχει."""
+        Job = self.model
+        return self.db.session.execute(
+            self.db.select(Job.id)
+            .where(Job.serial_key == serial_key, Job.status.in_((STATUS_QUEUED, STATUS_RUNNING)))
+            .limit(1)
+        ).first() is not None
+
+    def get(self, job_id):
+        job = self.db.session.get(self.model, job_id)
+        if job is None:
+            return None
+        return {
+            'id': job.id,
+            'kind': job.kind,
+            'status': job.status,
+            'progress': job.progress,
+            'attempts': job.attempts,
+            'max_attempts': self.max_attempts,
+            'error': job.error,
+            'result': json.loads(job.result) if job.result else None,
+            'created_at': job.created_at.isoformat() if job.created_at else None,
+            'updated_at': job.updated_at.isoformat() if job.updated_at else None
+        }
+
+    # --- Workers ---
+
+    def start(self):
+        """Ξεκινά τα worker threads μία φορά ανά process (και μετά από fork)."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._threads = []
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f'job-worker-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _run(self):
+        while True:
+            try:
+                with self.app.app_context():
+                    ran = self._run_next()
+            except Exception as e:
+                print(f"Job worker error: {e}")
+                ran = False
+            if not ran:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def _claim(self):
+        Job = self.model
+        session = self.db.session
+        now = datetime.now()
+        runnable = self.db.or_(
+            self.db.and_(Job.status == STATUS_QUEUED, Job.run_after <= now),
+            self.db.and_(Job.status == STATUS_RUNNING, Job.locked_until < now)
+        )
+        # Μία εκκρεμής (queued ή running) παλαιότερη εργασία με το ίδιο κλειδί
+        # κρατά τις επόμενες πίσω, ακόμη κι όταν περιμένει για retry
+        earlier = aliased(Job)
+        blocked = sa.exists().where(
+            earlier.serial_key == Job.serial_key,
+            earlier.status.in_((STATUS_QUEUED, STATUS_RUNNING)),
+            self.db.or_(
+                earlier.created_at < Job.created_at,
+                self.db.and_(earlier.created_at == Job.created_at, earlier.id < Job.id)
+            )
+        )
+        candidate = session.execute(
+            self.db.select(Job.id)
+            .where(runnable, self.db.or_(Job.serial_key.is_(None), ~blocked))
+            .order_by(Job.created_at).limit(1)
+        ).scalar()
+        if candidate is None:
+            return None
+        claimed = session.execute(
+            self.db.update(Job)
+            .where(Job.id == candidate, runnable)
+            .values(status=STATUS_RUNNING, attempts=Job.attempts + 1, updated_at=now,
+                    locked_until=now + timedelta(seconds=self.lease_seconds))
+        ).rowcount
+        session.commit()
+        if claimed != 1:
+            return None  # Την πήρε άλλος worker
+        return session.get(Job, candidate, populate_existing=True)
+
+    def _run_next(self):
+        job = self._claim()
+        if job is None:
+            return False
+
+        def report(progress):
+            job.progress = progress
+            job.updated_at = datetime.now()
+            self.db.session.commit()
+
+        try:
+            result = self.handlers[job.kind](json.loads(job.payload), report)
+        except Exception as e:
+            traceback.print_exc()
+            self.db.session.rollback()
+            job.error = str(e)
+            job.updated_at = datetime.now()
+            if job.attempts >= self.max_attempts or isinstance(e, JobFailed):
+                job.status = STATUS_FAILED
+            else:
+                job.status = STATUS_QUEUED
+                job.run_after = datetime.now() + timedelta(seconds=self.retry_delay * job.attempts)
+            self.db.session.commit()
+            return True
+
+        job.status = STATUS_DONE
+        job.error = None
+        job.result = json.dumps(result, ensure_ascii=False) if result is not None else None
+        job.updated_at = datetime.now()
+        self.db.session.commit()
+        return True
+
+
+def upgrade_schema(db, model):
+    """Προσθέτει τη στήλη serial_key (και το index της) σε παλιές βάσεις· ασφαλές να τρέξει ξανά."""
+    engine = db.engine
+    db.create_all()
+    columns = {column['name'] for column in sa.inspect(engine).get_columns(model.__tablename__)}
+    if 'serial_key' not in columns:
+        with engine.begin() as conn:
+            conn.execute(sa.text(f'ALTER TABLE {model.__tablename__} ADD COLUMN serial_key VARCHAR'))
+    for index in model.__table__.indexes:
+        index.create(engine, checkfirst=True)
@@ -0,0 +1,287 @@
+# llm.py
+"""
+Κοινό layer για τις κλήσεις στο LLM (chatbot και μεταφράσεις).
+
+- Ένα model handle ανά process (ξαναφτιάχνεται μετά από fork του gunicorn).
+- Προθεσμία σε κάθε κλήση (request_options={'timeout': ...} στο Gemini).
+- Όριο στις ταυτόχρονες κλήσεις (BoundedSemaphore): όταν το Gemini αργεί,
+  τα επιπλέον αιτήματα απορρίπτονται αμέσως αντί να κρατούν δεσμευμένους
+  τους workers, οπότε το υπόλοιπο site συνεχίζει να απαντά.
+- Circuit breaker: μετά από διαδοχικές αποτυχίες οι κλήσεις αποτυγχάνουν
+  αμέσως (LLMUnavailable) για reset_timeout δευτερόλεπτα και μετά περνά
+  μία δοκιμαστική κλήση (half-open).
+- FakeChatModel: τοπικό backend χωρίς δίκτυο, με ρυθμιζόμενη καθυστέρηση
+  και ποσοστό αποτυχιών, για δοκιμές φόρτου offline (LLM_BACKEND=fake).
+"""
+import json
+import os
+import random
+import threading
+import time
+
+from metrics import DEPENDENCY_DURATION, registry as metrics
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+
+class LLMUnavailable(Exception):
+    """Η κλήση δεν έγινε ή απέτυχε (ανοιχτό circuit, πολλές ταυτόχρονες, timeout, σφάλμα)."""
+
+
+class CircuitBreaker:
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = STATE_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self.times_opened = 0
+
+    def allow(self):
+        """True αν μπορεί να γίνει κλήση τώρα."""
+        with self._lock:
+            if self.state == STATE_CLOSED:
+                return True
+            if self.state == STATE_OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = STATE_HALF_OPEN
+                self._probe_in_flight = False
+            # Half-open: μία δοκιμαστική κλήση τη φορά
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = STATE_CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self.state == STATE_HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != STATE_OPEN:
+                    self.times_opened += 1
+                self.state = STATE_OPEN
+                self._opened_at = time.monotonic()
+
+    def record_cancelled(self):
+        """Η κλήση ακυρώθηκε (π.χ. έφυγε ο client): δεν δείχνει τίποτα για το upstream."""
+        with self._lock:
+            # Μια ακυρωμένη δοκιμαστική κλήση αφήνει τη θέση της στην επόμενη
+            self._probe_in_flight = False
+
+    def stats(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self._failures,
+                'times_opened': self.times_opened,
+            }
+
+
+class LLMClient:
+
+    def __init__(self, model_factory, max_concurrency=4, timeout=20.0,
+                 queue_timeout=0.5, breaker=None):
+        """
+        `model_factory`: χωρίς ορίσματα, επιστρέφει αντικείμενο με
+        generate_content(prompt, stream=..., request_options=...).
+        `queue_timeout`: πόσο περιμένει μια κλήση για ελεύθερη θέση.
+        """
+        self.model_factory = model_factory
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.queue_timeout = queue_timeout
+        self.breaker = breaker or CircuitBreaker()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._model = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._counters = {
+            'calls': 0, 'successes': 0, 'failures': 0, 'timeouts': 0, 'slow': 0,
+            'cancelled': 0, 'rejected_busy': 0, 'rejected_open': 0, 'in_flight': 0,
+        }
+
+    def _count(self, name, delta=1):
+        with self._lock:
+            self._counters[name] += delta
+
+    def model(self):
+        # Νέο handle ανά process: οι συνδέσεις του client δεν επιβιώνουν σε fork
+        with self._lock:
+            if self._model is None or self._pid != os.getpid():
+                self._model = self.model_factory()
+                self._pid = os.getpid()
+            return self._model
+
+    def _acquire(self, queue_timeout):
+        # Πρώτα η θέση και μετά το breaker, ώστε μια απόρριψη λόγω φόρτου
+        # να μη "σπαταλά" τη δοκιμαστική κλήση του half-open
+        wait = self.queue_timeout if queue_timeout is None else queue_timeout
+        if not self._slots.acquire(timeout=wait):
+            self._count('rejected_busy')
+            raise LLMUnavailable('too many concurrent calls')
+        if not self.breaker.allow():
+            self._slots.release()
+            self._count('rejected_open')
+            raise LLMUnavailable('circuit open')
+        self._count('calls')
+        self._count('in_flight')
+
+    def _release(self, error=None, cancelled=False):
+        self._count('in_flight', -1)
+        self._slots.release()
+        if cancelled:
+            self.breaker.record_cancelled()
+            self._count('cancelled')
+            return
+        if error is None:
+            self.breaker.record_success()
+            self._count('successes')
+            return
+        self.breaker.record_failure()
+        self._count('timeouts' if _is_timeout(error) else 'failures')
+
+    def generate(self, prompt, timeout=None, queue_timeout=None):
+        """Το κείμενο της απάντησης ή LLMUnavailable."""
+        timeout = timeout or self.timeout
+        self._acquire(queue_timeout)
+        try:
+            with metrics.span('gemini', 'generate'):
+                started = time.monotonic()
+                response = self.model().generate_content(prompt, request_options={'timeout': timeout})
+                text = response.text
+                # Ολοκληρωμένη απάντηση μετά την προθεσμία: μετρά ως αργή, αλλά δεν πετιέται
+                if time.monotonic() - started > timeout:
+                    self._count('slow')
+        except Exception as e:
+            self._release(e)
+            raise LLMUnavailable(str(e)) from e
+        self._release()
+        return text
+
+    def stream(self, prompt, timeout=None, queue_timeout=None):
+        """
+        Generator με τα κομμάτια του κειμένου. Η θέση και η προθεσμία κρατούν
+        για όλο το stream· ένα timeout στη μέση σταματά το stream με LLMUnavailable.
+        """
+        timeout = timeout or self.timeout
+        self._acquire(queue_timeout)
+        started = time.monotonic()
+        deadline = started + timeout
+        error = None
+        cancelled = False
+        outcome = 'ok'
+        try:
+            chunks = self.model().generate_content(prompt, stream=True, request_options={'timeout': timeout})
+            for chunk in chunks:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f'LLM stream exceeded {timeout}s')
+                text = chunk.text
+                if text:
+                    yield text
+        except GeneratorExit:
+            # Ο client έκλεισε τη σύνδεση: ούτε αποτυχία ούτε επιτυχία του upstream
+            outcome = 'cancelled'
+            cancelled = True
+            raise
+        except Exception as e:
+            error = e
+            outcome = 'error'
+            raise LLMUnavailable(str(e)) from e
+        finally:
+            metrics.observe(DEPENDENCY_DURATION, ('gemini', 'stream', outcome), time.monotonic() - started)
+            self._release(error, cancelled)
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+        counters['max_concurrency'] = self.max_concurrency
+        counters['breaker'] = self.breaker.stats()
+        return counters
+
+
+def _is_timeout(error):
+    return isinstance(error, TimeoutError) or 'deadline' in str(error).lower() or 'timeout' in str(error).lower()
+
+
+# ===============================================
+# ==              ΨΕΥΤΙΚΟ BACKEND              ==
+# ===============================================
+
+class _FakeChunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeChatModel:
+    """
+    Τοπικό μοντέλο με το ίδιο interface με το genai.GenerativeModel
+    (generate_content(prompt, stream=..., request_options=...)), για δοκιμές
+    χωρίς δίκτυο/API key. Απαντά με σταθερό κείμενο, σπασμένο σε λέξεις όταν
+    stream=True· στα prompts μετάφρασης επιστρέφει το JSON εισόδου ως έχει.
+    Με `latency`/`fail_rate` προσομοιώνει αργό ή ασταθές upstream και σέβεται
+    το timeout όπως το πραγματικό (TimeoutError).
+    """
+
+    def __init__(self, reply=None, delay=0.05, latency=0.0, fail_rate=0.0):
+        self.reply = reply or (
+            "Ευχαριστούμε για την ερώτησή σας! Για περισσότερες πληροφορίες "
+            "επικοινωνήστε μαζί μας στο +30 694 619 3307."
+        )
+        self.delay = delay
+        self.latency = latency
+        self.fail_rate = fail_rate
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            delay=float(os.environ.get('FAKE_LLM_DELAY', '0.05')),
+            latency=float(os.environ.get('FAKE_LLM_LATENCY', '0')),
+            fail_rate=float(os.environ.get('FAKE_LLM_FAIL_RATE', '0')),
+        )
+
+    def _wait(self, seconds, timeout):
+        if timeout is not None and seconds > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f'Deadline exceeded after {timeout}s')
+        if seconds:
+            time.sleep(seconds)
+
+    def _reply_for(self, prompt):
+        marker = 'Input JSON:'
+        if marker in prompt:
+            try:
+                decoder = json.JSONDecoder()
+                value, _ = decoder.raw_decode(prompt.split(marker, 1)[1].strip())
+                return json.dumps(value, ensure_ascii=False)
+            except ValueError:
+                pass
+        return self.reply
+
+    def _chunks(self, reply, timeout):
+        words = reply.split(' ')
+        for i, word in enumerate(words):
+            self._wait(self.delay, timeout)
+            yield _FakeChunk(word if i == 0 else ' ' + word)
+
+    def generate_content(self, prompt, stream=False, request_options=None):
+        timeout = (request_options or {}).get('timeout')
+        self._wait(self.latency, timeout)
+        if self.fail_rate and random.random() < self.fail_rate:
+            raise RuntimeError('Fake upstream error')
+        reply = self._reply_for(prompt)
+        if stream:
+            return self._chunks(reply, timeout)
+        self._wait(self.delay, timeout)
+        return _FakeChunk(reply)
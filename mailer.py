@@ -0,0 +1,238 @@
+# mailer.py
+"""
+Ανθεκτικό outbox για τα emails των φορμών (leads).
+
+Τα routes γράφουν πρώτα το μήνυμα στη βάση (πίνακας outbox_emails) και
+απαντούν αμέσως. Ένας background sender ανά process παίρνει τα μηνύματα που
+είναι έτοιμα για αποστολή σε batches, ανοίγει ΜΙΑ πιστοποιημένη σύνδεση SMTP
+(πρώτα τον κύριο server, μετά τον εφεδρικό) και στέλνει όλο το batch από
+αυτήν. Όσα αποτύχουν ξαναδοκιμάζονται με εκθετική καθυστέρηση.
+
+Για δοκιμές με τοπικό stand-in SMTP server, π.χ.
+    python -m aiosmtpd -n -l localhost:1025
+αρκεί MAIL_SERVER=localhost MAIL_PORT=1025 MAIL_SECURITY=plain MAIL_FALLBACK_SERVER=
+"""
+import os
+import random
+import smtplib
+import ssl
+import threading
+import uuid
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+
+from metrics import span
+
+STATUS_PENDING = 'pending'
+STATUS_SENDING = 'sending'
+STATUS_SENT = 'sent'
+STATUS_FAILED = 'failed'
+
+
+class SmtpRoute:
+    """Ένας SMTP server: security = 'starttls', 'ssl' ή 'plain'."""
+
+    def __init__(self, host, port, security='starttls', timeout=20):
+        self.host = host
+        self.port = int(port)
+        self.security = security
+        self.timeout = timeout
+
+    def __repr__(self):
+        return f"{self.host}:{self.port} ({self.security})"
+
+    def connect(self, username, password):
+        context = ssl.create_default_context()
+        if self.security == 'ssl':
+            smtp = smtplib.SMTP_SSL(self.host, self.port, context=context, timeout=self.timeout)
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.security == 'starttls':
+                smtp.starttls(context=context)
+            if password:
+                smtp.login(username, password)
+        except Exception:
+            smtp.close()
+            raise
+        return smtp
+
+
+class MailOutbox:
+
+    def __init__(self, app, db, model, routes, sender, receiver, password=None,
+                 batch_size=20, poll_interval=5.0, max_attempts=8,
+                 base_delay=30.0, max_delay=3600.0, lease_seconds=300):
+        self.app = app
+        self.db = db
+        self.model = model
+        self.routes = routes
+        self.sender = sender
+        self.receiver = receiver
+        self.password = password
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lease_seconds = lease_seconds
+        self._wakeup = threading.Event()
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def is_configured(self):
+        return bool(self.sender and self.receiver and self.routes)
+
+    def enqueue(self, subject, body):
+        """Αποθηκεύει το email στο outbox (commit) και ξυπνά τον sender."""
+        now = datetime.now()
+        email = self.model(
+            id=uuid.uuid4().hex,
+            subject=subject,
+            body=body,
+            recipient=self.receiver,
+            status=STATUS_PENDING,
+            attempts=0,
+            created_at=now,
+            next_attempt_at=now
+        )
+        self.db.session.add(email)
+        self.db.session.commit()
+        self.start()
+        self._wakeup.set()
+        return email.id
+
+    def start(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, name='mail-outbox', daemon=True).start()
+
+    def _run(self):
+        while True:
+            sent_any = False
+            if self.is_configured():
+                try:
+                    with self.app.app_context():
+                        sent_any = self.send_pending()
+                except Exception as e:
+                    print(f"Mail outbox error: {e}")
+            if not sent_any:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def _claim(self):
+        """Διεκδικεί ατομικά έως batch_size μηνύματα που είναι έτοιμα για αποστολή."""
+        Email = self.model
+        session = self.db.session
+        now = datetime.now()
+        due = self.db.or_(
+            self.db.and_(Email.status == STATUS_PENDING, Email.next_attempt_at <= now),
+            self.db.and_(Email.status == STATUS_SENDING, Email.locked_until < now)
+        )
+        ids = session.execute(
+            self.db.select(Email.id).where(due).order_by(Email.created_at).limit(self.batch_size)
+        ).scalars().all()
+        if not ids:
+            return []
+        token = uuid.uuid4().hex
+        session.execute(
+            self.db.update(Email)
+            .where(Email.id.in_(ids), due)
+            .values(status=STATUS_SENDING, claim_token=token,
+                    locked_until=now + timedelta(seconds=self.lease_seconds))
+        )
+        session.commit()
+        return session.execute(
+            self.db.select(Email).where(Email.claim_token == token).order_by(Email.created_at)
+        ).scalars().all()
+
+    def _connect(self):
+        errors = []
+        for index, route in enumerate(self.routes):
+            try:
+                with span('smtp', 'connect'):
+                    return index, route.connect(self.sender, self.password)
+            except Exception as e:
+                errors.append(f"{route}: {e}")
+        raise ConnectionError('; '.join(errors))
+
+    def _retry_later(self, email, error):
+        email.attempts += 1
+        email.last_error = str(error)[:1000]
+        email.claim_token = None
+        email.locked_until = None
+        if email.attempts >= self.max_attempts:
+            email.status = STATUS_FAILED
+            print(f"!!! Email {email.id} failed permanently after {email.attempts} attempts: {error}")
+            return
+        delay = min(self.base_delay * (2 ** (email.attempts - 1)), self.max_delay)
+        email.status = STATUS_PENDING
+        email.next_attempt_at = datetime.now() + timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+    def _message(self, email):
+        em = EmailMessage()
+        em['From'] = self.sender
+        em['To'] = email.recipient or self.receiver
+        em['Subject'] = email.subject
+        em.set_content(email.body)
+        return em
+
+    def send_pending(self):
+        """Στέλνει ένα batch από μία σύνδεση. Επιστρέφει True αν στάλθηκε κάτι."""
+        batch = self._claim()
+        if not batch:
+            return False
+        session = self.db.session
+
+        try:
+            route_index, smtp = self._connect()
+        except Exception as e:
+            print(f"Error connecting to SMTP servers: {e}")
+            for email in batch:
+                self._retry_later(email, e)
+            session.commit()
+            return False
+
+        sent = 0
+        try:
+            for i, email in enumerate(batch):
+                try:
+                    with span('smtp', 'send'):
+                        smtp.send_message(self._message(email))
+                except smtplib.SMTPServerDisconnected as e:
+                    # Η σύνδεση έπεσε: τα υπόλοιπα του batch ξαναμπαίνουν στην ουρά
+                    for remaining in batch[i:]:
+                        self._retry_later(remaining, e)
+                    session.commit()
+                    break
+                except Exception as e:
+                    print(f"Error sending email {email.id} via {self.routes[route_index]}: {e}")
+                    self._retry_later(email, e)
+                else:
+                    email.status = STATUS_SENT
+                    email.attempts += 1
+                    email.sent_at = datetime.now()
+                    email.claim_token = None
+                    email.locked_until = None
+                    sent += 1
+                session.commit()
+        finally:
+            try:
+                smtp.quit()
+            except Exception:
+                smtp.close()
+
+        if sent:
+            print(f"Sent {sent} email(s) via {self.routes[route_index]}.")
+        return sent > 0
+
+    def stats(self):
+        Email = self.model
+        rows = self.db.session.execute(
+            self.db.select(Email.status, self.db.func.count()).group_by(Email.status)
+        )
+        return {status: count for status, count in rows}
@@ -0,0 +1,271 @@
+# metrics.py
+"""
+Μετρήσεις σε μορφή Prometheus (/metrics) χωρίς εξωτερικές εξαρτήσεις.
+
+- http_request_duration_seconds: histogram ανά endpoint, method και status.
+- dependency_duration_seconds: histogram για τα spans γύρω από τις
+  εξωτερικές εξαρτήσεις (gemini, smtp, db commit, json αρχεία), ανά
+  operation και outcome (ok/error).
+
+Κάθε worker μετρά στη μνήμη (ένα bisect και μία πρόσθεση κάτω από lock) και
+κάθε `flush_interval` δευτερόλεπτα γράφει atomic τα σύνολά του σε ένα αρχείο
+στο `directory` (κοινό για τους gunicorn workers του ίδιου μηχανήματος). Το
+/metrics αθροίζει όλα τα αρχεία, οπότε όποιος worker κι αν απαντήσει δίνει
+τα ίδια νούμερα. Τα αρχεία workers που τερμάτισαν συγχωνεύονται στο
+archive.json, ώστε οι counters να μη μειώνονται ποτέ και τα αρχεία να μη
+συσσωρεύονται.
+"""
+import bisect
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: χωρίς κλείδωμα μεταξύ processes
+    fcntl = None
+
+HTTP_DURATION = 'http_request_duration_seconds'
+DEPENDENCY_DURATION = 'dependency_duration_seconds'
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+ARCHIVE_FILE = 'archive.json'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_le(bound):
+    return '+Inf' if bound == math.inf else repr(float(bound))
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def _merge(target, series):
+    """Προσθέτει στο `target` ({name: {labels: [counts, sum]}}) τα series ενός αρχείου."""
+    for name, entries in series.items():
+        merged = target.setdefault(name, {})
+        for labels, counts, total in entries:
+            labels = tuple(labels)
+            current = merged.get(labels)
+            if current is None:
+                merged[labels] = [list(counts), total]
+            elif len(current[0]) == len(counts):
+                # Αρχεία με άλλα buckets (παλιό deploy) αγνοούνται
+                current[0] = [a + b for a, b in zip(current[0], counts)]
+                current[1] += total
+
+
+def _serialize(series):
+    return {name: [[list(labels), list(counts), total] for labels, (counts, total) in entries.items()]
+            for name, entries in series.items()}
+
+
+class Metrics:
+
+    def __init__(self, directory=None, flush_interval=5.0):
+        self._histograms = {}  # name -> (documentation, labelnames, buckets)
+        self._series = {}      # name -> {labels: [counts ανά bucket (+Inf στο τέλος), sum]}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._file_token = uuid.uuid4().hex[:8]
+        self._next_flush = 0.0
+        self.configure(directory, flush_interval)
+
+    def configure(self, directory=None, flush_interval=5.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def histogram(self, name, documentation, labelnames, buckets=DEFAULT_BUCKETS):
+        self._histograms[name] = (documentation, tuple(labelnames), tuple(buckets) + (math.inf,))
+        self._series.setdefault(name, {})
+
+    def _check_pid(self):
+        # Μετά από fork (gunicorn --preload) ο worker ξεκινά από το μηδέν·
+        # ό,τι μέτρησε ο master είναι ήδη στο δικό του αρχείο
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._series = {name: {} for name in self._histograms}
+                    self._pid = os.getpid()
+                    self._file_token = uuid.uuid4().hex[:8]
+                    self._next_flush = 0.0
+
+    def observe(self, name, labels, seconds):
+        """Καταγράφει μία τιμή στο histogram `name` (labels με τη σειρά των labelnames)."""
+        self._check_pid()
+        buckets = self._histograms[name][2]
+        index = bisect.bisect_left(buckets, seconds)
+        with self._lock:
+            entry = self._series[name].get(labels)
+            if entry is None:
+                entry = self._series[name][labels] = [[0] * len(buckets), 0.0]
+            entry[0][index] += 1
+            entry[1] += seconds
+        if self.directory and time.monotonic() >= self._next_flush:
+            self.flush()
+
+    @contextmanager
+    def span(self, dependency, operation):
+        """Χρονομετρά το block ως dependency_duration_seconds (outcome=error αν πετάξει)."""
+        started = time.perf_counter()
+        outcome = 'error'
+        try:
+            yield
+            outcome = 'ok'
+        finally:
+            self.observe(DEPENDENCY_DURATION, (dependency, operation, outcome), time.perf_counter() - started)
+
+    # --- Κοινός φάκελος μεταξύ workers ---
+
+    def _own_path(self):
+        return os.path.join(self.directory, f'{os.getpid()}-{self._file_token}.json')
+
+    @contextmanager
+    def _directory_lock(self, exclusive):
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.directory, '.lock'), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write(self, path, series):
+        fd, tmp_path = tempfile.mkstemp(prefix='.tmp-', suffix='.json', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(series, f, separators=(',', ':'))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _read(self, path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def flush(self):
+        """Γράφει τα σύνολα αυτού του worker στο αρχείο του."""
+        self._check_pid()
+        with self._lock:
+            self._next_flush = time.monotonic() + self.flush_interval
+            series = _serialize(self._series)
+        try:
+            self._write(self._own_path(), series)
+        except OSError as e:
+            print(f"Metrics: could not write {self._own_path()}: {e}")
+
+    def _worker_files(self):
+        for name in os.listdir(self.directory):
+            if name.endswith('.json') and name != ARCHIVE_FILE and not name.startswith('.'):
+                try:
+                    pid = int(name.split('-', 1)[0])
+                except ValueError:
+                    continue
+                yield pid, os.path.join(self.directory, name)
+
+    def _compact(self):
+        """Συγχωνεύει στο archive.json τα αρχεία των workers που δεν τρέχουν πια."""
+        with self._directory_lock(exclusive=True):
+            dead = [path for pid, path in self._worker_files() if not _pid_alive(pid)]
+            if not dead:
+                return
+            archive_path = os.path.join(self.directory, ARCHIVE_FILE)
+            merged = {}
+            for path in [archive_path] + dead:
+                _merge(merged, self._read(path))
+            self._write(archive_path, _serialize(merged))
+            for path in dead:
+                os.remove(path)
+
+    def collect(self):
+        """{name: {labels: [counts, sum]}}: όλων των workers αν υπάρχει φάκελος, αλλιώς αυτού."""
+        if not self.directory:
+            self._check_pid()
+            with self._lock:
+                return {name: {labels: [list(counts), total] for labels, (counts, total) in entries.items()}
+                        for name, entries in self._series.items()}
+        self.flush()
+        try:
+            self._compact()
+        except OSError as e:
+            print(f"Metrics: could not compact {self.directory}: {e}")
+        merged = {}
+        with self._directory_lock(exclusive=False):
+            _merge(merged, self._read(os.path.join(self.directory, ARCHIVE_FILE)))
+            for _, path in self._worker_files():
+                _merge(merged, self._read(path))
+        return merged
+
+    def render(self):
+        """Το κείμενο για το /metrics (Prometheus text format 0.0.4)."""
+        merged = self.collect()
+        lines = []
+        for name, (documentation, labelnames, buckets) in self._histograms.items():
+            lines.append(f'# HELP {name} {documentation}')
+            lines.append(f'# TYPE {name} histogram')
+            for labels, (counts, total) in sorted(merged.get(name, {}).items()):
+                base = ','.join(f'{label}="{_escape(value)}"' for label, value in zip(labelnames, labels))
+                prefix = base + ',' if base else ''
+                cumulative = 0
+                for bound, count in zip(buckets, counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{prefix}le="{_format_le(bound)}"}} {cumulative}')
+                lines.append(f'{name}_sum{{{base}}} {total!r}')
+                lines.append(f'{name}_count{{{base}}} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+
+def instrument_commits(metrics):
+    """Χρονομετρά κάθε commit των sessions του SQLAlchemy (μαζί με το flush του)."""
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+
+    @event.listens_for(Session, 'before_commit')
+    def _commit_started(session):
+        session.info['metrics_commit_started'] = time.perf_counter()
+
+    @event.listens_for(Session, 'after_commit')
+    def _commit_finished(session):
+        started = session.info.pop('metrics_commit_started', None)
+        if started is not None:
+            metrics.observe(DEPENDENCY_DURATION, ('db', 'commit', 'ok'), time.perf_counter() - started)
+
+    @event.listens_for(Session, 'after_rollback')
+    def _commit_failed(session):
+        started = session.info.pop('metrics_commit_started', None)
+        if started is not None:
+            metrics.observe(DEPENDENCY_DURATION, ('db', 'commit', 'error'), time.perf_counter() - started)
+
+
+# Ένα registry ανά process, κοινό για όλα τα modules (βλ. app.py για τη ρύθμιση)
+registry = Metrics()
+registry.histogram(HTTP_DURATION, 'Latency of HTTP requests until the response headers.',
+                   ('endpoint', 'method', 'status'))
+registry.histogram(DEPENDENCY_DURATION, 'Latency of calls to external dependencies.',
+                   ('dependency', 'operation', 'outcome'))
+span = registry.span
@@ -0,0 +1,137 @@
+# models.py
+"""Τα μοντέλα της βάσης. Το `db` συνδέεται με το app μέσω db.init_app(app)."""
+from flask_sqlalchemy import SQLAlchemy
+
+db = SQLAlchemy()
+
+
+# --- Μοντέλο Βάσης ---
+class Conversation(db.Model):
+    __tablename__ = 'conversations'
+    id = db.Column(db.Integer, primary_key=True)
+    timestamp = db.Column(db.DateTime, nullable=False)
+    user_question = db.Column(db.String, nullable=False)
+    bot_answer = db.Column(db.String, nullable=False)
+    # Το cookie της συνεδρίας του chatbot (βλ. app.py)
+    session_id = db.Column(db.String(32), nullable=True, index=True)
+    # Τα ακίνητα που ανασύρθηκαν για την ερώτηση (για τα "πιο ζητημένα")
+    property_ids = db.Column(db.JSON(none_as_null=True), nullable=True)
+
+    __table_args__ = (
+        # Keyset σελιδοποίηση και φίλτρα ημερομηνιών (βλ. conversations.py)
+        db.Index('ix_conversations_timestamp_id', 'timestamp', 'id'),
+    )
+
+class ConversationDay(db.Model):
+    """Σύνολα μιας ημέρας συνομιλιών που έχουν ήδη σβηστεί (retention)."""
+    __tablename__ = 'conversation_days'
+    day = db.Column(db.Date, primary_key=True)
+    questions = db.Column(db.Integer, nullable=False, default=0)
+    sessions = db.Column(db.Integer, nullable=False, default=0)
+
+class ConversationDayProperty(db.Model):
+    """Πόσες ερωτήσεις μιας (σβησμένης) ημέρας αφορούσαν κάθε ακίνητο."""
+    __tablename__ = 'conversation_day_properties'
+    day = db.Column(db.Date, primary_key=True)
+    property_id = db.Column(db.String, primary_key=True)
+    questions = db.Column(db.Integer, nullable=False, default=0)
+
+class Job(db.Model):
+    """Εργασία της ουράς (βλ. jobs.py), π.χ. αποθήκευση ακινήτου από το admin."""
+    __tablename__ = 'jobs'
+    id = db.Column(db.String(32), primary_key=True)
+    kind = db.Column(db.String, nullable=False)
+    status = db.Column(db.String, nullable=False, index=True)
+    payload = db.Column(db.Text, nullable=False)
+    result = db.Column(db.Text, nullable=True)
+    progress = db.Column(db.String, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
+    run_after = db.Column(db.DateTime, nullable=False, index=True)
+    locked_until = db.Column(db.DateTime, nullable=True)
+    # Εργασίες με το ίδιο κλειδί (π.χ. 'property:<id>') τρέχουν μία-μία, με σειρά
+    serial_key = db.Column(db.String, nullable=True, index=True)
+
+# Τα πεδία του properties.json με τη σειρά που εμφανίζονται στο αρχείο
+PROPERTY_FIELDS = (
+    'id', 'title_key', 'description_key', 'location', 'location_slug', 'status',
+    'type', 'price', 'area', 'bedrooms', 'bathrooms', 'lat', 'lon',
+    'features_keys', 'images', 'main_image', 'project_id'
+)
+
+class Property(db.Model):
+    """Ένα ακίνητο του καταλόγου (μία γραμμή αντί για ολόκληρο το properties.json)."""
+    __tablename__ = 'properties'
+    id = db.Column(db.String, primary_key=True)
+    # Η σειρά του ακινήτου στο properties.json (φυσική σειρά του καταλόγου).
+    # Μοναδική: δύο ταυτόχρονες εισαγωγές με την ίδια θέση -> η μία ξαναδοκιμάζει
+    position = db.Column(db.Integer, nullable=False, index=True, unique=True)
+    title_key = db.Column(db.String, nullable=False)
+    description_key = db.Column(db.String, nullable=False)
+    location = db.Column(db.String, nullable=True)
+    location_slug = db.Column(db.String, nullable=True, index=True)
+    status = db.Column(db.String, nullable=True)
+    type = db.Column(db.String, nullable=True, index=True)
+    price = db.Column(db.Integer, nullable=True, index=True)
+    area = db.Column(db.Integer, nullable=True)
+    bedrooms = db.Column(db.Integer, nullable=True)
+    bathrooms = db.Column(db.Integer, nullable=True)
+    lat = db.Column(db.Float, nullable=True)
+    lon = db.Column(db.Float, nullable=True)
+    features_keys = db.Column(db.JSON, nullable=True)
+    images = db.Column(db.JSON, nullable=True)
+    main_image = db.Column(db.String, nullable=True)
+    project_id = db.Column(db.String, nullable=True, index=True)
+    # Όποια επιπλέον πεδία υπάρχουν στο JSON, ώστε το export να μη χάνει τίποτα
+    extra = db.Column(db.JSON, nullable=True)
+    updated_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_properties_type_location_slug', 'type', 'location_slug'),
+    )
+
+    def to_dict(self):
+        prop = {}
+        for field in PROPERTY_FIELDS:
+            value = getattr(self, field)
+            if field == 'project_id' and value is None:
+                continue
+            prop[field] = value
+        prop.update(self.extra or {})
+        return prop
+
+    def update_from_dict(self, prop):
+        for field in PROPERTY_FIELDS:
+            setattr(self, field, prop.get(field))
+        self.extra = {k: v for k, v in prop.items() if k not in PROPERTY_FIELDS} or None
+
+class Translation(db.Model):
+    """Μία μετάφραση (γλώσσα, κλειδί) από τα αρχεία static/js/data/i18n/*.json."""
+    __tablename__ = 'translations'
+    # Το αυτόματο id κρατά τη σειρά των κλειδιών στο export
+    id = db.Column(db.Integer, primary_key=True)
+    lang = db.Column(db.String(8), nullable=False, index=True)
+    key = db.Column(db.String, nullable=False, index=True)
+    value = db.Column(db.Text, nullable=True)
+
+    __table_args__ = (
+        db.UniqueConstraint('lang', 'key', name='uq_translations_lang_key'),
+    )
+
+class OutboxEmail(db.Model):
+    """Email φόρμας που περιμένει αποστολή (βλ. mailer.py)."""
+    __tablename__ = 'outbox_emails'
+    id = db.Column(db.String(32), primary_key=True)
+    subject = db.Column(db.String, nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    recipient = db.Column(db.String, nullable=True)
+    status = db.Column(db.String, nullable=False, index=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, index=True)
+    sent_at = db.Column(db.DateTime, nullable=True)
+    claim_token = db.Column(db.String(32), nullable=True, index=True)
+    locked_until = db.Column(db.DateTime, nullable=True)
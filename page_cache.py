@@ -0,0 +1,165 @@
+# page_cache.py
+"""
+Cache ολόκληρων σελίδων HTML για τα δημόσια routes.
+
+Δύο επίπεδα:
+- μνήμη ανά worker: LRU με όριο σε bytes (όχι σε πλήθος σελίδων),
+- δίσκος (προαιρετικά): κοινός σε όλους τους gunicorn workers, ώστε μια
+  δημοφιλής σελίδα να αποδίδεται από το Jinja μία φορά και όχι μία ανά worker.
+
+Το κλειδί περιέχει ό,τι επηρεάζει το HTML (route, κανονικοποιημένα args,
+γλώσσα, εκδόσεις καταλόγου/μεταφράσεων/templates), άρα μια αλλαγή δεν
+σερβίρει ποτέ παλιά σελίδα. Κάθε εγγραφή έχει και ένα tag (π.χ.
+"property:<id>") για στοχευμένη εκκαθάριση όταν το admin αλλάξει ένα ακίνητο.
+"""
+import hashlib
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+
+
+def source_version(*roots):
+    """Hash των (path, mtime, size) των αρχείων κάτω από τα roots (templates, js, css)."""
+    digest = hashlib.sha1()
+    for root in roots:
+        for folder, dirs, files in os.walk(root):
+            # Τα δεδομένα (properties/i18n) έχουν δικές τους εκδόσεις στο κλειδί
+            dirs[:] = sorted(d for d in dirs if d != 'data')
+            for name in sorted(files):
+                if name.endswith(('.gz', '.br', '.bundle.css')):
+                    continue
+                path = os.path.join(folder, name)
+                st = os.stat(path)
+                digest.update(f"{path}:{st.st_mtime_ns}:{st.st_size};".encode('utf-8'))
+    return digest.hexdigest()[:12]
+
+
+def _hash(value):
+    return hashlib.sha1(repr(value).encode('utf-8')).hexdigest()
+
+
+class PageCache:
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, disk_dir=None, disk_ttl=24 * 3600):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_ttl = disk_ttl
+        self._data = OrderedDict()  # key hash -> (tag, body)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._next_sweep = 0.0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _disk_path(self, tag, key_hash):
+        tag_dir = hashlib.sha1(tag.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.disk_dir, tag_dir, f'{key_hash}.html')
+
+    def _remember(self, key_hash, tag, body):
+        with self._lock:
+            old = self._data.pop(key_hash, None)
+            if old is not None:
+                self._bytes -= len(old[1])
+            if len(body) > self.max_bytes:
+                return
+            self._data[key_hash] = (tag, body)
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._data.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def get(self, tag, key):
+        """Το HTML (bytes) της σελίδας ή None."""
+        key_hash = _hash(key)
+        with self._lock:
+            entry = self._data.get(key_hash)
+            if entry is not None:
+                self._data.move_to_end(key_hash)
+                self.memory_hits += 1
+                return entry[1]
+
+        if self.disk_dir:
+            path = self._disk_path(tag, key_hash)
+            try:
+                if time.time() - os.path.getmtime(path) < self.disk_ttl:
+                    with open(path, 'rb') as f:
+                        body = f.read()
+                    self._remember(key_hash, tag, body)
+                    with self._lock:
+                        self.disk_hits += 1
+                    return body
+            except OSError:
+                pass
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, tag, key, body):
+        key_hash = _hash(key)
+        self._remember(key_hash, tag, body)
+        if not self.disk_dir:
+            return
+        path = self._disk_path(tag, key_hash)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+            with open(tmp_path, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Page cache: could not write {path}: {e}")
+        self._sweep()
+
+    def invalidate(self, tag):
+        """Πετά όλες τις σελίδες του tag, στη μνήμη αυτού του worker και στον δίσκο."""
+        with self._lock:
+            for key_hash in [k for k, (entry_tag, _) in self._data.items() if entry_tag == tag]:
+                self._bytes -= len(self._data.pop(key_hash)[1])
+        if self.disk_dir:
+            shutil.rmtree(os.path.dirname(self._disk_path(tag, '')), ignore_errors=True)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+        if self.disk_dir:
+            shutil.rmtree(self.disk_dir, ignore_errors=True)
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def _sweep(self):
+        """Σβήνει (το πολύ μία φορά ανά λεπτό) τα αρχεία του δίσκου που έληξαν."""
+        now = time.time()
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + 60
+        for folder, dirs, files in os.walk(self.disk_dir):
+            for name in files:
+                path = os.path.join(folder, name)
+                try:
+                    if now - os.path.getmtime(path) >= self.disk_ttl:
+                        os.remove(path)
+                except OSError:
+                    pass
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                'entries': len(self._data),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                'disk': bool(self.disk_dir),
+            }
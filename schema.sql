@@ -3,8 +3,115 @@ DROP TABLE IF EXISTS conversations;
 
 CREATE TABLE conversations (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
-    timestamp TEXT NOT NULL,
+    timestamp DATETIME NOT NULL,
     user_question TEXT NOT NULL,
     bot_answer TEXT NOT NULL,
-    session_id TEXT -- Για μελλοντική χρήση
-);
\ No newline at end of file
+    session_id TEXT, -- Το cookie της συνεδρίας του chatbot
+    property_ids JSON -- Τα ακίνητα που ανασύρθηκαν για την ερώτηση
+);
+CREATE INDEX ix_conversations_session_id ON conversations (session_id);
+CREATE INDEX ix_conversations_timestamp_id ON conversations (timestamp, id);
+
+DROP TABLE IF EXISTS conversation_days;
+
+CREATE TABLE conversation_days (
+    day DATE PRIMARY KEY,
+    questions INTEGER NOT NULL DEFAULT 0,
+    sessions INTEGER NOT NULL DEFAULT 0
+);
+
+DROP TABLE IF EXISTS conversation_day_properties;
+
+CREATE TABLE conversation_day_properties (
+    day DATE NOT NULL,
+    property_id TEXT NOT NULL,
+    questions INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, property_id)
+);
+
+DROP TABLE IF EXISTS jobs;
+
+CREATE TABLE jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL, -- queued / running / done / failed
+    payload TEXT NOT NULL,
+    result TEXT,
+    progress TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL,
+    run_after DATETIME NOT NULL,
+    locked_until DATETIME,
+    serial_key TEXT -- Εργασίες με το ίδιο κλειδί τρέχουν μία-μία (βλ. jobs.py)
+);
+CREATE INDEX ix_jobs_status ON jobs (status);
+CREATE INDEX ix_jobs_run_after ON jobs (run_after);
+CREATE INDEX ix_jobs_serial_key ON jobs (serial_key);
+
+
+DROP TABLE IF EXISTS properties;
+
+CREATE TABLE properties (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL, -- Η σειρά στο properties.json
+    title_key TEXT NOT NULL,
+    description_key TEXT NOT NULL,
+    location TEXT,
+    location_slug TEXT,
+    status TEXT,
+    type TEXT,
+    price INTEGER,
+    area INTEGER,
+    bedrooms INTEGER,
+    bathrooms INTEGER,
+    lat REAL,
+    lon REAL,
+    features_keys JSON,
+    images JSON,
+    main_image TEXT,
+    project_id TEXT,
+    extra JSON,
+    updated_at DATETIME
+);
+CREATE UNIQUE INDEX ix_properties_position ON properties (position);
+CREATE INDEX ix_properties_type ON properties (type);
+CREATE INDEX ix_properties_location_slug ON properties (location_slug);
+CREATE INDEX ix_properties_price ON properties (price);
+CREATE INDEX ix_properties_project_id ON properties (project_id);
+CREATE INDEX ix_properties_type_location_slug ON properties (type, location_slug);
+
+
+DROP TABLE IF EXISTS translations;
+
+CREATE TABLE translations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    lang TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT,
+    CONSTRAINT uq_translations_lang_key UNIQUE (lang, key)
+);
+CREATE INDEX ix_translations_lang ON translations (lang);
+CREATE INDEX ix_translations_key ON translations (key);
+
+
+DROP TABLE IF EXISTS outbox_emails;
+
+CREATE TABLE outbox_emails (
+    id TEXT PRIMARY KEY,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    recipient TEXT,
+    status TEXT NOT NULL, -- pending / sending / sent / failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at DATETIME NOT NULL,
+    next_attempt_at DATETIME NOT NULL,
+    sent_at DATETIME,
+    claim_token TEXT,
+    locked_until DATETIME
+);
+CREATE INDEX ix_outbox_emails_status ON outbox_emails (status);
+CREATE INDEX ix_outbox_emails_next_attempt_at ON outbox_emails (next_attempt_at);
+CREATE INDEX ix_outbox_emails_claim_token ON outbox_emails (claim_token);
@@ -0,0 +1,250 @@
+# search.py
+"""
+Αναζήτηση ελεύθερου κειμένου στα ακίνητα, σε όλες τις γλώσσες μαζί.
+
+Ευρετηριάζονται οι τίτλοι, οι περιγραφές και τα χαρακτηριστικά από όλα τα
+i18n/*.json (μέσω title_key/description_key/features_keys), η τοποθεσία και
+ο τύπος. Κάθε λέξη περνά από
+το fold(): πεζά, χωρίς τόνους/διαλυτικά και μεταγραμμένη σε λατινικά
+(ελληνικά και κυριλλικά), ώστε τα "vrasna", "Βρασνά" και "ΒΡΑΣΝΑ" να
+δίνουν το ίδιο token. Τα δίγραφα (ου, αυ/ευ, μπ, ντ) μεταγράφονται όπως
+προφέρονται, άρα και τα "Σταυρός"/"stavros", "Μπάνια"/"bania" ταιριάζουν. Η τελευταία λέξη του ερωτήματος ταιριάζει και ως
+πρόθεμα (αναζήτηση καθώς πληκτρολογεί ο χρήστης).
+
+Το ευρετήριο είναι ανεστραμμένο (token -> ακίνητο -> βάρος) και ανανεώνεται
+σταδιακά: το sync() ξαναευρετηριάζει μόνο τα ακίνητα των οποίων άλλαξε το
+κείμενο (νέα τιμή στο admin, νέα μετάφραση) και αφαιρεί όσα διαγράφηκαν.
+"""
+import bisect
+import functools
+import hashlib
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter
+
+# Βάρος κάθε πεδίου στη βαθμολογία
+FIELD_WEIGHTS = {'title': 3.0, 'location': 2.0, 'type': 1.5, 'features': 1.5, 'description': 1.0}
+MAX_PREFIX_EXPANSIONS = 50
+MIN_TOKEN_LENGTH = 2
+# Πιο σύντομη τελευταία λέξη ταιριάζει μόνο ακριβώς (όχι ως πρόθεμα)
+MIN_PREFIX_LENGTH = 3
+# Στο OR (ερωτήσεις) οι λέξεις με περισσότερα γράμματα χάνουν τα 2 τελευταία
+STEM_MIN_LENGTH = 5
+
+_GREEK = {
+    'α': 'a', 'β': 'v', 'γ': 'g', 'δ': 'd', 'ε': 'e', 'ζ': 'z', 'η': 'i', 'θ': 'th',
+    'ι': 'i', 'κ': 'k', 'λ': 'l', 'μ': 'm', 'ν': 'n', 'ξ': 'x', 'ο': 'o', 'π': 'p',
+    'ρ': 'r', 'σ': 's', 'ς': 's', 'τ': 't', 'υ': 'i', 'φ': 'f', 'χ': 'ch', 'ψ': 'ps',
+    'ω': 'o',
+}
+_CYRILLIC = {
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd', 'ђ': 'dj', 'е': 'e', 'ё': 'e',
+    'ж': 'zh', 'з': 'z', 'и': 'i', 'й': 'i', 'ј': 'j', 'к': 'k', 'л': 'l', 'љ': 'lj',
+    'м': 'm', 'н': 'n', 'њ': 'nj', 'о': 'o', 'п': 'p', 'р': 'r', 'с': 's', 'т': 't',
+    'ћ': 'c', 'у': 'u', 'ф': 'f', 'х': 'h', 'ц': 'ts', 'ч': 'ch', 'џ': 'dz', 'ш': 'sh',
+    'щ': 'sht', 'ъ': '', 'ы': 'i', 'ь': '', 'э': 'e', 'ю': 'iu', 'я': 'ia',
+}
+_TRANSLITERATION = str.maketrans({**_GREEK, **_CYRILLIC, 'ı': 'i'})
+# Τα ου/αυ/ευ πριν από τον πίνακα των γραμμάτων (ου -> u, αυ -> av ή af).
+# Στο NFD: το "άυ" (τόνος στο α) και το "αϋ" δεν είναι δίφθογγοι
+_DIPHTHONG = re.compile('([αεο])υ(?!\u0308)[\u0300-\u036f]*')
+# Μετά από αυτά τα γράμματα (και στο τέλος της λέξης) το αυ/ευ προφέρεται af/ef
+_VOICELESS = frozenset('θκξπστφχψ')
+# Δίγραφα της ελληνικής και παραλλαγές του greeklish που προφέρονται ίδια
+# (Kerdylia/Kerdilia, Chalkidiki/Halkidiki, Ksenia/Xenia, Loutra/Lutra,
+# Mpania/Bania, Ntomata/Domata)
+_SPELLING_VARIANTS = (('ou', 'u'), ('ei', 'i'), ('oi', 'i'), ('y', 'i'), ('ch', 'h'), ('ks', 'x'),
+                      ('ph', 'f'), ('mp', 'b'), ('nt', 'd'))
+_WORD = re.compile(r'\w+')
+_COMBINING = re.compile(r'[\u0300-\u036f]')
+
+
+def _diphthong(match):
+    vowel = match.group(1)
+    if vowel == 'ο':
+        return 'u'
+    following = match.string[match.end():match.end() + 1]
+    voiceless = not following.isalpha() or following in _VOICELESS
+    return vowel + ('f' if voiceless else 'v')
+
+
+def fold(text):
+    """Κανονικοποιημένο κείμενο: πεζά, χωρίς τόνους, σε λατινικούς χαρακτήρες."""
+    decomposed = _DIPHTHONG.sub(_diphthong, unicodedata.normalize('NFD', text.casefold()))
+    stripped = _COMBINING.sub('', decomposed)
+    folded = stripped.translate(_TRANSLITERATION)
+    for variant, canonical in _SPELLING_VARIANTS:
+        folded = folded.replace(variant, canonical)
+    return folded
+
+
+@functools.lru_cache(maxsize=65536)
+def _fold_word(word):
+    return fold(word)
+
+
+def tokenize(text):
+    # Ανά λέξη με cache: το λεξιλόγιο των περιγραφών επαναλαμβάνεται πολύ
+    tokens = (_fold_word(word) for word in _WORD.findall(text))
+    return [token for token in tokens if len(token) >= MIN_TOKEN_LENGTH]
+
+
+def property_fields(prop, translations_by_lang):
+    """Τα κείμενα του ακινήτου ανά πεδίο, από όλες τις γλώσσες."""
+    fields = {name: [] for name in FIELD_WEIGHTS}
+    for translations in translations_by_lang.values():
+        fields['title'].append(translations.get(prop.get('title_key')) or '')
+        fields['description'].append(translations.get(prop.get('description_key')) or '')
+        fields['type'].append(translations.get(f"type_{prop.get('type')}") or '')
+        fields['features'].extend(translations.get(key) or '' for key in prop.get('features_keys') or ())
+    fields['location'].append(prop.get('location') or '')
+    fields['location'].append((prop.get('location_slug') or '').replace('-', ' '))
+    fields['type'].append((prop.get('type') or '').replace('_', ' '))
+    fields['title'].append(prop.get('id', '').replace('-', ' '))
+    return fields
+
+
+class SearchIndex:
+
+    def __init__(self):
+        self._postings = {}      # token -> {property_id: βάρος}
+        self._doc_tokens = {}    # property_id -> tokens του (για την αφαίρεση)
+        self._doc_digests = {}   # property_id -> hash του κειμένου του
+        self._sorted_tokens = []
+        self._stamp = None
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._doc_tokens)
+
+    def _remove(self, property_id):
+        for token in self._doc_tokens.pop(property_id, ()):
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(property_id, None)
+                if not postings:
+                    del self._postings[token]
+        self._doc_digests.pop(property_id, None)
+
+    def _add(self, property_id, fields):
+        weights = {}
+        for field, texts in fields.items():
+            weight = FIELD_WEIGHTS[field]
+            for token, count in Counter(tokenize('\n'.join(texts))).items():
+                weights[token] = weights.get(token, 0.0) + weight * count
+        for token, weight in weights.items():
+            # Λογαριθμικό tf: 20 αναφορές σε μια περιγραφή δεν αξίζουν 20 φορές μία
+            self._postings.setdefault(token, {})[property_id] = 1.0 + math.log(weight)
+        self._doc_tokens[property_id] = tuple(weights)
+
+    def update(self, prop, translations_by_lang):
+        """(Ξανα)ευρετηριάζει ένα ακίνητο αν άλλαξε το κείμενό του. True αν άλλαξε."""
+        fields = property_fields(prop, translations_by_lang)
+        digest = hashlib.sha1(repr(sorted(fields.items())).encode('utf-8')).hexdigest()
+        with self._lock:
+            if self._doc_digests.get(prop['id']) == digest:
+                return False
+            self._remove(prop['id'])
+            self._add(prop['id'], fields)
+            self._doc_digests[prop['id']] = digest
+            self._sorted_tokens = None
+            return True
+
+    def remove(self, property_id):
+        with self._lock:
+            self._remove(property_id)
+            self._sorted_tokens = None
+
+    def sync(self, catalog, translation_store):
+        """
+        Φέρνει το ευρετήριο στην τρέχουσα έκδοση καταλόγου/μεταφράσεων.
+        Αν δεν άλλαξε καμία έκδοση κοστίζει μία σύγκριση.
+        """
+        stamp = (catalog.version, tuple(translation_store.version(lang) for lang in translation_store.languages))
+        if stamp == self._stamp:
+            return 0
+        with self._lock:
+            if stamp == self._stamp:
+                return 0
+            translations_by_lang = {lang: translation_store.get(lang) for lang in translation_store.languages}
+            changed = sum(self.update(prop, translations_by_lang) for prop in catalog)
+            for property_id in set(self._doc_tokens) - set(catalog.by_id):
+                self.remove(property_id)
+                changed += 1
+            self._stamp = stamp
+            return changed
+
+    def _expand(self, token):
+        """Τα tokens του ευρετηρίου που αρχίζουν από `token` (για την τελευταία λέξη)."""
+        if len(token) < MIN_PREFIX_LENGTH:
+            return [token]
+        if self._sorted_tokens is None:
+            self._sorted_tokens = sorted(self._postings)
+        start = bisect.bisect_left(self._sorted_tokens, token)
+        matches = []
+        for candidate in self._sorted_tokens[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not candidate.startswith(token):
+                break
+            matches.append(candidate)
+        return matches
+
+    def _term_scores(self, term, candidates, total, within=None):
+        """Βαθμολογία ανά ακίνητο για μία λέξη (την καλύτερη από τα candidates)."""
+        term_scores = {}
+        for token in candidates:
+            postings = self._postings.get(token)
+            if not postings:
+                continue
+            # Ακριβές ταίριασμα μετρά περισσότερο από ένα πρόθεμα
+            factor = math.log(1 + total / len(postings)) * (1.0 if token == term else 0.7)
+            if within is not None:
+                postings = {pid: tf for pid, tf in postings.items() if pid in within}
+            if not term_scores:
+                term_scores = {pid: tf * factor for pid, tf in postings.items()}
+                continue
+            for pid, tf in postings.items():
+                score = tf * factor
+                if score > term_scores.get(pid, 0.0):
+                    term_scores[pid] = score
+        return term_scores
+
+    def search(self, query, limit=10, match_all=True):
+        """
+        [(property_id, score)] με φθίνουσα βαθμολογία· η βαθμολογία είναι
+        tf * idf ανά λέξη. Με match_all κάθε λέξη του ερωτήματος πρέπει να
+        ταιριάζει (AND)· αλλιώς αρκεί μία (OR), κάθε λέξη ταιριάζει και με
+        κομμένη κατάληξη ("θάλασσας" -> "θάλασσα") και μετρά όσο σπανιότερη είναι.
+        Το δεύτερο είναι για ερωτήσεις σε φυσική γλώσσα (βλ. chatbot).
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+        with self._lock:
+            total = len(self._doc_tokens) or 1
+            if match_all:
+                # Πρώτα οι πιο σπάνιες λέξεις, ώστε η τομή να μικραίνει γρήγορα
+                exact_terms = sorted(terms[:-1], key=lambda term: len(self._postings.get(term, ())))
+                scores = None
+                for term, candidates in [(term, [term]) for term in exact_terms] + [(terms[-1], self._expand(terms[-1]))]:
+                    term_scores = self._term_scores(term, candidates, total, within=scores)
+                    if scores is None:
+                        scores = term_scores
+                    else:
+                        scores = {pid: scores[pid] + score for pid, score in term_scores.items()}
+                    if not scores:
+                        return []
+            else:
+                scores = {}
+                for term in dict.fromkeys(terms):
+                    stem = term[:-2] if len(term) > STEM_MIN_LENGTH else term
+                    for pid, score in self._term_scores(term, self._expand(stem), total).items():
+                        scores[pid] = scores.get(pid, 0.0) + score
+        ranked = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [(property_id, round(score, 4)) for property_id, score in ranked]
+
+    def stats(self):
+        with self._lock:
+            return {'documents': len(self._doc_tokens), 'tokens': len(self._postings)}
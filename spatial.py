@@ -0,0 +1,135 @@
+# spatial.py
+"""
+Χωρικό ευρετήριο για τον χάρτη των ακινήτων.
+
+Τα σημεία μπαίνουν σε κελιά ενός πλέγματος Web Mercator ανά zoom (όπως τα
+tiles του Leaflet/OSM, με CELLS_PER_TILE κελιά ανά tile και άξονα), οπότε
+ένα viewport καλύπτει πάντα λίγες δεκάδες κελιά, ανεξάρτητα από το πόσα
+ακίνητα έχει ο κατάλογος. Σε κάθε zoom μέχρι το CLUSTER_MAX_ZOOM τα σημεία
+του ίδιου κελιού επιστρέφονται ως ένα cluster (πλήθος, κέντρο, bounds)·
+πιο κοντά επιστρέφονται πάντα μεμονωμένα markers.
+
+Το ευρετήριο χτίζεται ανά έκδοση καταλόγου (PropertyCatalog)· κάθε επίπεδο
+zoom, μαζί με τα clusters του, υπολογίζεται μία φορά, την πρώτη που ζητηθεί.
+"""
+import math
+
+MIN_ZOOM = 0
+MAX_ZOOM = 19
+CLUSTER_MAX_ZOOM = 15
+# 4 κελιά ανά tile των 256px -> κελιά των 64px στην οθόνη
+CELLS_PER_TILE = 4
+_MAX_LAT = 85.05112878
+
+
+def _mercator(lat, lon):
+    """Κανονικοποιημένες συντεταγμένες Web Mercator στο [0, 1)."""
+    lat = max(-_MAX_LAT, min(_MAX_LAT, lat))
+    x = (lon + 180.0) / 360.0
+    sin_lat = math.sin(math.radians(lat))
+    y = 0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    return min(max(x, 0.0), 1.0 - 1e-12), min(max(y, 0.0), 1.0 - 1e-12)
+
+
+def _lon_spans(west, east):
+    """Τα διαστήματα μήκους του bbox: δύο, ένα σε κάθε πλευρά, αν περνά τον αντιμεσημβρινό (west > east)."""
+    if east - west >= 360:
+        return ((-180.0, 180.0),)
+    if west > east:
+        return ((west, 180.0), (-180.0, east))
+    return ((west, east),)
+
+
+def parse_bbox(value):
+    """'west,south,east,north' (όπως το L.LatLngBounds.toBBoxString()) -> tuple."""
+    try:
+        west, south, east, north = (float(part) for part in value.split(','))
+    except (AttributeError, ValueError):
+        raise ValueError('bbox must be "west,south,east,north"') from None
+    if not all(math.isfinite(v) for v in (west, south, east, north)) or south > north:
+        raise ValueError('bbox must be "west,south,east,north"')
+    return west, south, east, north
+
+
+class SpatialIndex:
+
+    def __init__(self, markers):
+        """`markers`: dicts με τουλάχιστον lat/lon (π.χ. το map_data του καταλόγου)."""
+        self.markers = list(markers)
+        self._points = [_mercator(m['lat'], m['lon']) for m in self.markers]
+        self._levels = {}
+        if self.markers:
+            lats = [m['lat'] for m in self.markers]
+            lons = [m['lon'] for m in self.markers]
+            self.bounds = [min(lons), min(lats), max(lons), max(lats)]
+        else:
+            self.bounds = None
+
+    def _cluster(self, members):
+        lats = [self.markers[i]['lat'] for i in members]
+        lons = [self.markers[i]['lon'] for i in members]
+        return {
+            'lat': round(sum(lats) / len(lats), 6),
+            'lon': round(sum(lons) / len(lons), 6),
+            'count': len(members),
+            'bounds': [min(lons), min(lats), max(lons), max(lats)],
+        }
+
+    def _level(self, zoom):
+        """Κελί -> (δείκτες των σημείων του, cluster ή None), για το συγκεκριμένο zoom."""
+        cells = self._levels.get(zoom)
+        if cells is None:
+            scale = (1 << zoom) * CELLS_PER_TILE
+            members_by_cell = {}
+            for i, (x, y) in enumerate(self._points):
+                members_by_cell.setdefault((int(x * scale), int(y * scale)), []).append(i)
+            cells = {
+                cell: (members, self._cluster(members) if len(members) > 1 and zoom <= CLUSTER_MAX_ZOOM else None)
+                for cell, members in members_by_cell.items()
+            }
+            # Δύο threads μπορεί να το χτίσουν ταυτόχρονα· το αποτέλεσμα είναι ίδιο
+            self._levels[zoom] = cells
+        return cells
+
+    def _cells_in(self, zoom, bbox):
+        west, south, east, north = bbox
+        cells = self._level(zoom)
+        scale = (1 << zoom) * CELLS_PER_TILE
+        # Τα διαστήματα δεν επικαλύπτονται, άρα ούτε οι στήλες των κελιών τους
+        for span_west, span_east in _lon_spans(west, east):
+            x0, y0 = _mercator(north, span_west)
+            x1, y1 = _mercator(south, span_east)
+            cx0, cy0 = int(x0 * scale), int(y0 * scale)
+            cx1, cy1 = int(x1 * scale), int(y1 * scale)
+
+            if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(cells):
+                # Μεγάλο bbox για το zoom: φθηνότερο να δούμε μόνο τα μη κενά κελιά
+                for (cx, cy), entry in cells.items():
+                    if cx0 <= cx <= cx1 and cy0 <= cy <= cy1:
+                        yield entry
+                continue
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    entry = cells.get((cx, cy))
+                    if entry:
+                        yield entry
+
+    def query(self, bbox, zoom):
+        """
+        (clusters, markers) για το viewport. Τα κελιά μερικώς έξω από το bbox
+        μετρούν ολόκληρα, ώστε ένα cluster να μην αλλάζει καθώς μετακινείται ο χάρτης.
+        """
+        zoom = max(MIN_ZOOM, min(MAX_ZOOM, int(zoom)))
+        west, south, east, north = bbox
+        spans = _lon_spans(west, east)
+        clusters = []
+        markers = []
+        for members, cluster in self._cells_in(zoom, bbox):
+            if cluster is not None:
+                clusters.append(cluster)
+                continue
+            for i in members:
+                m = self.markers[i]
+                if south <= m['lat'] <= north and any(w <= m['lon'] <= e for w, e in spans):
+                    markers.append(m)
+        return clusters, markers
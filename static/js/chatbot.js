@@ -34,16 +34,21 @@ chatForm.addEventListener('submit', async (e) => {
     addMessage('...', 'bot', true); // "Thinking" indicator
 
     try {
-        const response = await fetch('/ask-chatbot', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ message: message })
-        });
+        // Πρώτα δοκιμάζουμε το streaming endpoint (SSE), ώστε η απάντηση
+        // να εμφανίζεται όσο γράφεται. Αν δεν υποστηρίζεται, πέφτουμε στο JSON.
+        const streamed = await askStreaming(message);
+        if (!streamed) {
+            const response = await fetch('/ask-chatbot', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ message: message })
+            });
 
-        if (!response.ok) throw new Error('Network response was not ok');
+            if (!response.ok) throw new Error('Network response was not ok');
 
-        const data = await response.json();
-        updateLastBotMessage(data.reply);
+            const data = await response.json();
+            updateLastBotMessage(data.reply);
+        }
 
     } catch (error) {
         console.error('Chatbot error:', error);
@@ -51,6 +56,52 @@ chatForm.addEventListener('submit', async (e) => {
     }
 });
 
+async function askStreaming(message) {
+    if (!window.ReadableStream || !window.TextDecoder) return false;
+
+    const response = await fetch('/ask-chatbot/stream', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json', 'Accept': 'text/event-stream' },
+        body: JSON.stringify({ message: message })
+    });
+    if (!response.ok || !response.body) return false;
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let text = '';
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // Κάθε SSE event τελειώνει με κενή γραμμή
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const rawEvent = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let eventName = 'message';
+            let data = '';
+            rawEvent.split('\n').forEach(line => {
+                if (line.startsWith('event: ')) eventName = line.slice(7);
+                else if (line.startsWith('data: ')) data += line.slice(6);
+            });
+            if (!data) continue;
+
+            const payload = JSON.parse(data);
+            if (eventName === 'delta') {
+                text += payload.delta;
+                updateStreamingBotMessage(text);
+            } else if (eventName === 'done') {
+                updateLastBotMessage(payload.reply);
+            }
+        }
+    }
+    return true;
+}
+
 function addMessage(text, type, isThinking = false) {
     const messageDiv = document.createElement('div');
     messageDiv.classList.add('chat-message', type);
@@ -60,6 +111,15 @@ function addMessage(text, type, isThinking = false) {
     chatBody.scrollTop = chatBody.scrollHeight; // Auto-scroll to bottom
 }
 
+function updateStreamingBotMessage(text) {
+    // Ενημερώνουμε το "..." μήνυμα χωρίς να βγάλουμε την ένδειξη thinking
+    const thinkingMessage = chatBody.querySelector('.thinking');
+    if (thinkingMessage) {
+        thinkingMessage.innerHTML = text;
+        chatBody.scrollTop = chatBody.scrollHeight;
+    }
+}
+
 function updateLastBotMessage(text) {
     const thinkingMessage = chatBody.querySelector('.thinking');
     if (thinkingMessage) {
@@ -137,52 +137,120 @@ function initHeroSlider() {
 }
 
 
+// Βάζει στο <img> (WebP) και στο <source> (AVIF) του <picture> τα srcset της εικόνας `index`
+function applySrcset(imageEl, srcsets, index, sizes) {
+    const entry = (srcsets && srcsets[index]) || {};
+    const picture = imageEl.closest('picture');
+    const avifSource = picture ? picture.querySelector('source[type="image/avif"]') : null;
+
+    if (entry.webp) {
+        imageEl.srcset = entry.webp;
+        imageEl.sizes = sizes;
+    } else {
+        imageEl.removeAttribute('srcset');
+    }
+    if (avifSource) {
+        if (entry.avif) {
+            avifSource.srcset = entry.avif;
+        } else {
+            avifSource.removeAttribute('srcset');
+        }
+    }
+}
+
+function parseSrcsets(element) {
+    try {
+        return JSON.parse(element.dataset.srcsets || '[]');
+    } catch (e) {
+        return [];
+    }
+}
+
 function initListingsCarousels() {
-    const allCards = document.querySelectorAll('.property-card');
-    if (allCards.length === 0) return;
+    document.querySelectorAll('.property-card').forEach(initCardCarousel);
+}
 
-    allCards.forEach(card => {
-        const imageContainer = card.querySelector('.property-card-image');
-        const imageEl = card.querySelector('.property-card-main-image');
-        const prevBtn = card.querySelector('.prev-button');
-        const nextBtn = card.querySelector('.next-button');
+function initCardCarousel(card) {
+    const imageContainer = card.querySelector('.property-card-image');
+    const imageEl = card.querySelector('.property-card-main-image');
+    const prevBtn = card.querySelector('.prev-button');
+    const nextBtn = card.querySelector('.next-button');
 
-        if (!imageContainer || !imageEl || !prevBtn) return;
+    if (!imageContainer || !imageEl || !prevBtn) return;
 
-        try {
-            const imagePaths = JSON.parse(imageContainer.dataset.images);
-            if (imagePaths.length <= 1) return;
-
-            let currentIndex = 0;
-            const getStaticUrl = (path) => `/static/${path}`;
-
-            const updateImage = () => {
-                // --- ΑΛΛΑΓΗ ΓΙΑ LAZY LOADING ---
-                // Αν η εικόνα έχει data-src, χρησιμοποίησέ το την πρώτη φορά
-                if (imageEl.dataset.src) {
-                    imageEl.src = imageEl.dataset.src;
-                    delete imageEl.dataset.src;
-                }
-                // ---------------------------------
-                imageEl.src = getStaticUrl(imagePaths[currentIndex]);
-            };
-
-            prevBtn.addEventListener('click', (e) => {
-                e.preventDefault(); 
-                e.stopPropagation();
-                currentIndex = (currentIndex - 1 + imagePaths.length) % imagePaths.length;
-                updateImage();
-            });
+    try {
+        const imagePaths = JSON.parse(imageContainer.dataset.images);
+        if (imagePaths.length <= 1) return;
+        const srcsets = parseSrcsets(imageContainer);
 
-            nextBtn.addEventListener('click', (e) => {
-                e.preventDefault();
-                e.stopPropagation();
-                currentIndex = (currentIndex + 1) % imagePaths.length;
-                updateImage();
-            });
+        let currentIndex = 0;
+        const getStaticUrl = (path) => `/static/${path}`;
+
+        const updateImage = () => {
+            // --- ΑΛΛΑΓΗ ΓΙΑ LAZY LOADING ---
+            // Αν η εικόνα έχει data-src, χρησιμοποίησέ το την πρώτη φορά
+            if (imageEl.dataset.src) {
+                imageEl.src = imageEl.dataset.src;
+                delete imageEl.dataset.src;
+            }
+            // ---------------------------------
+            applySrcset(imageEl, srcsets, currentIndex, '(max-width: 768px) 100vw, 400px');
+            imageEl.src = getStaticUrl(imagePaths[currentIndex]);
+        };
+
+        prevBtn.addEventListener('click', (e) => {
+            e.preventDefault(); 
+            e.stopPropagation();
+            currentIndex = (currentIndex - 1 + imagePaths.length) % imagePaths.length;
+            updateImage();
+        });
 
-        } catch(e) {
-            console.error("Failed to init card carousel for card:", card, e);
+        nextBtn.addEventListener('click', (e) => {
+            e.preventDefault();
+            e.stopPropagation();
+            currentIndex = (currentIndex + 1) % imagePaths.length;
+            updateImage();
+        });
+
+    } catch(e) {
+        console.error("Failed to init card carousel for card:", card, e);
+    }
+}
+
+// "Περισσότερα ακίνητα": φέρνει την επόμενη σελίδα (?partial=1) και προσθέτει τις κάρτες.
+// Χωρίς JS το κουμπί είναι απλό link προς την επόμενη σελίδα.
+function initLoadMore() {
+    const grid = document.getElementById('listings-grid');
+    if (!grid) return;
+
+    grid.parentElement.addEventListener('click', async (e) => {
+        const link = e.target.closest('[data-load-more]');
+        if (!link) return;
+        e.preventDefault();
+        if (link.getAttribute('aria-disabled') === 'true') return;
+        link.setAttribute('aria-disabled', 'true');
+
+        try {
+            const url = new URL(link.href, window.location.origin);
+            url.searchParams.set('partial', '1');
+            const response = await fetch(url);
+            if (!response.ok) throw new Error(`HTTP ${response.status}`);
+            const fragment = document.createRange().createContextualFragment(await response.text());
+
+            fragment.querySelectorAll('.property-card').forEach(card => {
+                grid.appendChild(card);
+                initCardCarousel(card);
+            });
+            const nextMore = fragment.querySelector('.listings-more');
+            const currentMore = link.closest('.listings-more');
+            if (nextMore) {
+                currentMore.replaceWith(nextMore);
+            } else {
+                currentMore.remove();
+            }
+        } catch (err) {
+            console.error("Failed to load more properties:", err);
+            window.location.href = link.href;
         }
     });
 }
@@ -265,6 +333,7 @@ function initPropertyCarousel() {
     try {
         const imagePaths = JSON.parse(carouselContainer.dataset.images);
         if (imagePaths.length === 0) return;
+        const srcsets = parseSrcsets(carouselContainer);
 
         const mainImage = carouselContainer.querySelector('.carousel-main-image');
         const prevButton = carouselContainer.querySelector('.prev-button');
@@ -281,6 +350,7 @@ function initPropertyCarousel() {
             }
 
             setTimeout(() => {
+                applySrcset(mainImage, srcsets, currentIndex, '(max-width: 992px) 100vw, 66vw');
                 mainImage.src = getStaticUrl(imagePaths[currentIndex]);
                 mainImage.style.opacity = '1';
                 mainImage.classList.add('loaded');
@@ -299,6 +369,8 @@ function initPropertyCarousel() {
         imagePaths.forEach((path, index) => {
             const thumb = document.createElement('img');
             thumb.src = getStaticUrl(path);
+            // Οι μικρογραφίες φορτώνουν το μικρότερο παράγωγο αντί για το πρωτότυπο
+            applySrcset(thumb, srcsets, index, '120px');
             thumb.classList.add('thumbnail-image');
             thumb.alt = `Thumbnail ${index + 1}`;
             thumb.loading = 'lazy'; 
@@ -320,7 +392,7 @@ function initPropertyCarousel() {
 function initListingsMap() {
     const mapElement = document.getElementById('listings-map');
     
-       if (!mapElement || typeof L === 'undefined' || typeof mapProperties === 'undefined' || mapProperties.length === 0) {
+       if (!mapElement || typeof L === 'undefined' || typeof mapBounds === 'undefined' || !mapBounds) {
         if (mapElement) {
              mapElement.closest('.listings-map-section').style.display = 'none';
         }
@@ -328,44 +400,14 @@ function initListingsMap() {
     }
 
     const officeCoords = [40.708090, 23.699340];
-    const map = L.map('listings-map').setView(officeCoords, 13);
+    const map = L.map('listings-map');
 
     L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
         attribution: '© OpenStreetMap contributors'
     }).addTo(map);
 
-    const markers = [];
     const translations = getCurrentTranslations();
 
-    if (mapProperties.length > 0) {
-        mapProperties.forEach(prop => {
-            if (prop.lat && prop.lon) {
-                const priceText = prop.price > 0 ? `€${(prop.price / 1000).toFixed(0)}K` : '...';
-                const pricePinIcon = L.divIcon({ className: 'price-pin', html: priceText });
-                const marker = L.marker([prop.lat, prop.lon], { icon: pricePinIcon });
-
-                const popupContent = `
-                    <div style="width:200px; font-family: 'Plus Jakarta Sans', sans-serif;">
-                        <a href="/property/${prop.id}" style="text-decoration:none; color:inherit;">
-                            <img src="/static/${prop.main_image}" alt="" style="width:100%; height:120px; object-fit:cover; border-radius:8px;">
-                            <h5 style="margin:8px 0 5px; font-size:14px; font-weight:600;" data-lang-key="${prop.title_key}">${translations[prop.title_key] || prop.title_key}</h5>
-                        </a>
-                        <p style="margin:0; font-size:16px; font-weight:700; color:#e12828;">
-                            ${prop.price > 0 ? '€' + prop.price.toLocaleString('de-DE') : `<span data-lang-key="price_on_request">${translations['price_on_request']}</span>`}
-                        </p>
-                        <div class="popup-stats" style="display:flex; gap:10px; margin-top:8px; font-size:12px; color:#555;">
-                            <span><i class="bi bi-aspect-ratio"></i> ${prop.area} m²</span>
-                            <span><i class="bi bi-door-open"></i> ${prop.bedrooms}</span>
-                            <span><i class="bi bi-badge-wc"></i> ${prop.bathrooms}</span>
-                        </div>
-                    </div>
-                `;
-                marker.bindPopup(popupContent);
-                markers.push(marker);
-            } 
-        });
-    }
-
     const officeIcon = L.divIcon({ className: 'office-pin', html: '<i class="bi bi-building"></i>'});
     const officeMarker = L.marker(officeCoords, { icon: officeIcon }).addTo(map);
     const officePopupContent = `
@@ -375,12 +417,68 @@ function initListingsMap() {
         </div>
     `;
     officeMarker.bindPopup(officePopupContent);
-    markers.push(officeMarker);
 
-    if (markers.length > 0) {
-        const featureGroup = L.featureGroup(markers).addTo(map);
-        map.fitBounds(featureGroup.getBounds().pad(0.2));
-    }
+    // Τα markers έρχονται από το /api/map μόνο για το ορατό τμήμα του χάρτη
+    const propertyLayer = L.layerGroup().addTo(map);
+    let pendingRequest = null;
+
+    const propertyMarker = (prop) => {
+        const priceText = prop.price > 0 ? `€${(prop.price / 1000).toFixed(0)}K` : '...';
+        const pricePinIcon = L.divIcon({ className: 'price-pin', html: priceText });
+        const marker = L.marker([prop.lat, prop.lon], { icon: pricePinIcon });
+
+        const popupContent = `
+            <div style="width:200px; font-family: 'Plus Jakarta Sans', sans-serif;">
+                <a href="/property/${prop.id}" style="text-decoration:none; color:inherit;">
+                    <img src="/static/${prop.main_image}" alt="" style="width:100%; height:120px; object-fit:cover; border-radius:8px;">
+                    <h5 style="margin:8px 0 5px; font-size:14px; font-weight:600;" data-lang-key="${prop.title_key}">${prop.title || prop.title_key}</h5>
+                </a>
+                <p style="margin:0; font-size:16px; font-weight:700; color:#e12828;">
+                    ${prop.price > 0 ? '€' + prop.price.toLocaleString('de-DE') : `<span data-lang-key="price_on_request">${translations['price_on_request']}</span>`}
+                </p>
+                <div class="popup-stats" style="display:flex; gap:10px; margin-top:8px; font-size:12px; color:#555;">
+                    <span><i class="bi bi-aspect-ratio"></i> ${prop.area} m²</span>
+                    <span><i class="bi bi-door-open"></i> ${prop.bedrooms}</span>
+                    <span><i class="bi bi-badge-wc"></i> ${prop.bathrooms}</span>
+                </div>
+            </div>
+        `;
+        marker.bindPopup(popupContent);
+        return marker;
+    };
+
+    const clusterMarker = (cluster) => {
+        const clusterIcon = L.divIcon({ className: 'cluster-pin', html: `${cluster.count}`, iconSize: [40, 40] });
+        const marker = L.marker([cluster.lat, cluster.lon], { icon: clusterIcon });
+        marker.on('click', () => {
+            const [west, south, east, north] = cluster.bounds;
+            map.fitBounds([[south, west], [north, east]], { padding: [40, 40] });
+        });
+        return marker;
+    };
+
+    const loadMarkers = async () => {
+        // Ένα pan που ξεκινά πριν τελειώσει το προηγούμενο ακυρώνει το παλιό αίτημα
+        if (pendingRequest) pendingRequest.abort();
+        pendingRequest = new AbortController();
+        const params = new URLSearchParams({ bbox: map.getBounds().toBBoxString(), zoom: map.getZoom() });
+
+        try {
+            const response = await fetch(`/api/map?${params}`, { signal: pendingRequest.signal });
+            if (!response.ok) throw new Error(`HTTP ${response.status}`);
+            const data = await response.json();
+
+            propertyLayer.clearLayers();
+            data.clusters.forEach(cluster => clusterMarker(cluster).addTo(propertyLayer));
+            data.markers.forEach(prop => propertyMarker(prop).addTo(propertyLayer));
+        } catch (err) {
+            if (err.name !== 'AbortError') console.error("Failed to load map markers:", err);
+        }
+    };
+
+    map.on('moveend', loadMarkers);
+    const [west, south, east, north] = mapBounds;
+    map.fitBounds(L.latLngBounds([[south, west], [north, east]]).extend(officeCoords).pad(0.2));
 }
 function initLightbox() {
     const carouselContainer = document.querySelector('.carousel-container');
@@ -468,6 +566,7 @@ document.addEventListener('DOMContentLoaded', async () => {
     initHeroSlider();
     initFaqAccordion();
     initListingsCarousels(); // Τρέχει σε όλες τις σελίδες που έχουν property-card
+    initLoadMore();
 
     // Ειδικές συναρτήσεις ανά σελίδα
     if (document.querySelector('.property-single-section')) {
@@ -9,15 +9,52 @@ const flagMap = {
     sr: 'rs',
     bg: 'bg',
     de: 'de',
-    ro: 'ro'
+    ro: 'ro',
+    ru: 'ru',
+    tu: 'tu'
 };
 
+// Οι μεταφράσεις που έστειλε ο server μαζί με τη σελίδα (μόνο τα κλειδιά της)
+function readInlineTranslations() {
+    const sliceElement = document.getElementById('i18n-slice');
+    try {
+        return sliceElement ? JSON.parse(sliceElement.textContent) : {};
+    } catch (e) {
+        console.error('Invalid i18n slice', e);
+        return {};
+    }
+}
+
+// Όλα τα κλειδιά που χρειάζεται η σελίδα: όσα είναι στο DOM + όσα ήρθαν στο slice (JS, χάρτης)
+function collectPageKeys() {
+    const keys = new Set(Object.keys(translations));
+    document.querySelectorAll('[data-lang-key]').forEach(elem => keys.add(elem.getAttribute('data-lang-key')));
+    document.querySelectorAll('[data-lang-placeholder]').forEach(elem => keys.add(elem.getAttribute('data-lang-placeholder')));
+    return [...keys];
+}
+
+async function fetchTranslations(lang, keys) {
+    const query = keys.map(encodeURIComponent).join(',');
+    // Πολλά κλειδιά δεν χωρούν με ασφάλεια σε URL: τότε POST
+    const response = query.length < 1500
+        ? await fetch(`/api/i18n/${lang}?keys=${query}`)
+        : await fetch(`/api/i18n/${lang}`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ keys })
+        });
+    if (!response.ok) throw new Error(`Translations not found: ${lang}`);
+    return response.json();
+}
+
+function rememberLanguage(lang) {
+    document.cookie = `lang=${lang}; path=/; max-age=31536000; samesite=lax`;
+    localStorage.setItem('preferredLanguage', lang);
+}
+
 async function setLanguage(lang) {
     try {
-        // ΔΙΟΡΘΩΣΗ: Απόλυτη διαδρομή για το fetch
-        const response = await fetch(`/static/js/data/i18n/${lang}.json`); 
-        if (!response.ok) throw new Error(`Language file not found: ${lang}.json`);
-        translations = await response.json();
+        translations = await fetchTranslations(lang, collectPageKeys());
 
         document.querySelectorAll('[data-lang-key]').forEach(elem => {
             const key = elem.getAttribute('data-lang-key');
@@ -27,6 +64,10 @@ async function setLanguage(lang) {
                 if (elem.dataset.propertyId) {
                     text = text.replace('%id%', elem.dataset.propertyId);
                 }
+                // Αν ο server έδωσε μετρητή (facets), τον δείχνουμε δίπλα
+                if (elem.dataset.count !== undefined) {
+                    text = `${text} (${elem.dataset.count})`;
+                }
                 elem.textContent = text;
             }
         });
@@ -37,7 +78,7 @@ async function setLanguage(lang) {
         });
 
         document.documentElement.lang = lang;
-        localStorage.setItem('preferredLanguage', lang);
+        rememberLanguage(lang);
         updateLanguageSwitcher(lang);
 
     } catch (error) {
@@ -78,8 +119,18 @@ export async function initLanguageSwitcher() {
         }
     });
 
-    const preferredLanguage = localStorage.getItem('preferredLanguage') || 'el';
-    await setLanguage(preferredLanguage);
+    // Η σελίδα έρχεται ήδη μεταφρασμένη από τον server
+    translations = readInlineTranslations();
+    const pageLanguage = document.documentElement.lang || 'el';
+
+    // Παλιοί επισκέπτες: η γλώσσα τους ήταν μόνο στο localStorage, όχι σε cookie
+    const preferredLanguage = localStorage.getItem('preferredLanguage');
+    const hasCookie = document.cookie.split('; ').some(cookie => cookie.startsWith('lang='));
+    if (preferredLanguage && !hasCookie && preferredLanguage !== pageLanguage) {
+        await setLanguage(preferredLanguage);
+    } else {
+        updateLanguageSwitcher(pageLanguage);
+    }
 }
 
 export function getCurrentTranslations() {
@@ -0,0 +1,252 @@
+# storage.py
+"""
+Αποθήκευση των ακινήτων και των μεταφράσεων για τις admin εγγραφές.
+
+Δύο υλοποιήσεις με το ίδιο interface (CATALOG_BACKEND):
+- JsonCatalogBackend ("json"): read-modify-write των αρχείων, όπως πάντα,
+  κάτω από ένα κλείδωμα (threads και workers), ώστε δύο ταυτόχρονες
+  αποθηκεύσεις να μη σβήνουν η μία την αλλαγή της άλλης.
+- DatabaseCatalogBackend ("db"): μία γραμμή ανά ακίνητο/μετάφραση με
+  ενημερώσεις σε transactions. Μετά από κάθε commit γίνεται export στα ίδια
+  JSON αρχεία, που συνεχίζει να διαβάζει το front end και το CatalogStore.
+  Κάθε αποθήκευση γράφει ολόκληρο το ακίνητο (ο τελευταίος κερδίζει)· τη
+  σειρά των αλλαγών ενός ακινήτου την εξασφαλίζει η ουρά (serial_key, βλ.
+  jobs.py). Το SELECT ... FOR UPDATE κλειδώνει γραμμές μόνο στην PostgreSQL·
+  στην SQLite δεν κάνει τίποτα, οπότε η θέση ενός νέου ακινήτου προστατεύεται
+  από το unique index του position και μια νέα μετάφραση από το unique
+  (lang, key): σε σύγκρουση η εισαγωγή ξαναδοκιμάζεται.
+"""
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+from sqlalchemy import inspect
+from sqlalchemy.exc import IntegrityError
+
+from catalog import write_json_atomic
+from metrics import span
+from models import Property, Translation
+
+# Προσπάθειες εισαγωγής όταν ταυτόχρονη εισαγωγή πάρει την ίδια θέση (ή το ίδιο κλειδί μετάφρασης)
+SAVE_ATTEMPTS = 5
+
+try:
+    import fcntl
+except ImportError:  # Windows: αρκεί το κλείδωμα μέσα στο process
+    fcntl = None
+
+
+def i18n_path(i18n_dir, lang):
+    return os.path.join(i18n_dir, f'{lang}.json')
+
+
+@contextmanager
+def _exclusive(thread_lock, lock_path):
+    """Κλείδωμα μεταξύ threads (thread_lock) και μεταξύ workers (flock στο lock_path)."""
+    with thread_lock:
+        if fcntl is None:
+            yield
+            return
+        with open(lock_path, 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def read_json(path):
+    with span('json', 'read'), open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class JsonCatalogBackend:
+    """Τα JSON αρχεία είναι η πηγή της αλήθειας."""
+
+    def __init__(self, properties_path, i18n_dir):
+        self.properties_path = properties_path
+        self.i18n_dir = i18n_dir
+        self._write_lock = threading.Lock()
+
+    def _exclusive(self):
+        # Όλο το read-modify-write μέσα στο lock: η ανάγνωση βλέπει την τελευταία εγγραφή
+        return _exclusive(self._write_lock, self.properties_path + '.lock')
+
+    def get_property(self, property_id):
+        return next((p for p in read_json(self.properties_path) if p.get('id') == property_id), None)
+
+    def save_property(self, prop):
+        """Upsert: αντικαθιστά το ακίνητο με το ίδιο id ή το προσθέτει στο τέλος."""
+        with self._exclusive():
+            properties_list = read_json(self.properties_path)
+            for i, existing in enumerate(properties_list):
+                if existing.get('id') == prop['id']:
+                    properties_list[i] = prop
+                    break
+            else:
+                properties_list.append(prop)
+            write_json_atomic(self.properties_path, properties_list)
+
+    def get_translations(self, lang):
+        return read_json(i18n_path(self.i18n_dir, lang))
+
+    def set_translations(self, lang, values):
+        path = i18n_path(self.i18n_dir, lang)
+        with self._exclusive():
+            translations = read_json(path)
+            translations.update(values)
+            write_json_atomic(path, translations)
+
+
+class DatabaseCatalogBackend:
+    """Η βάση είναι η πηγή της αλήθειας· τα JSON αρχεία είναι export της."""
+
+    def __init__(self, db, properties_path, i18n_dir):
+        self.db = db
+        self.properties_path = properties_path
+        self.i18n_dir = i18n_dir
+        self._export_lock = threading.Lock()
+
+    def get_property(self, property_id):
+        row = self.db.session.get(Property, property_id)
+        return row.to_dict() if row else None
+
+    def save_property(self, prop):
+        session = self.db.session
+        for attempt in range(SAVE_ATTEMPTS):
+            try:
+                row = session.get(Property, prop['id'], with_for_update=True)
+                if row is None:
+                    last = session.query(self.db.func.max(Property.position)).scalar()
+                    row = Property(position=(last or 0) + 1)
+                    session.add(row)
+                row.update_from_dict(prop)
+                row.updated_at = datetime.now()
+                session.commit()
+                break
+            except IntegrityError:
+                # Άλλη εισαγωγή πήρε την ίδια θέση (ή το ίδιο id): ξανά, με νέα ανάγνωση
+                session.rollback()
+                if attempt == SAVE_ATTEMPTS - 1:
+                    raise
+            except Exception:
+                session.rollback()
+                raise
+        self.export_properties()
+
+    def get_translations(self, lang):
+        rows = self.db.session.execute(
+            self.db.select(Translation.key, Translation.value)
+            .where(Translation.lang == lang).order_by(Translation.id)
+        )
+        return {key: value for key, value in rows}
+
+    def set_translations(self, lang, values):
+        session = self.db.session
+        for attempt in range(SAVE_ATTEMPTS):
+            try:
+                existing = {
+                    row.key: row for row in session.execute(
+                        self.db.select(Translation)
+                        .where(Translation.lang == lang, Translation.key.in_(list(values)))
+                        .with_for_update()
+                    ).scalars()
+                }
+                for key, value in values.items():
+                    if key in existing:
+                        existing[key].value = value
+                    else:
+                        session.add(Translation(lang=lang, key=key, value=value))
+                session.commit()
+                break
+            except IntegrityError:
+                # Άλλος worker πρόσθεσε το ίδιο (lang, key): ξανά, ως ενημέρωση της γραμμής του
+                session.rollback()
+                if attempt == SAVE_ATTEMPTS - 1:
+                    raise
+            except Exception:
+                session.rollback()
+                raise
+        self.export_translations(lang)
+
+    # --- Export για το front end ---
+
+    @contextmanager
+    def _exclusive(self):
+        """
+        Σειριοποιεί τα exports μεταξύ threads και workers. Κάθε export διαβάζει
+        τη βάση ΜΕΣΑ στο lock, οπότε το τελευταίο αρχείο περιέχει όλα τα commits.
+        """
+        with _exclusive(self._export_lock, self.properties_path + '.lock'):
+            yield
+
+    def export_properties(self):
+        with self._exclusive():
+            rows = self.db.session.execute(
+                self.db.select(Property).order_by(Property.position)
+            ).scalars()
+            write_json_atomic(self.properties_path, [row.to_dict() for row in rows])
+
+    def export_translations(self, lang):
+        with self._exclusive():
+            write_json_atomic(i18n_path(self.i18n_dir, lang), self.get_translations(lang))
+
+
+def import_from_json(db, properties_path, i18n_dir):
+    """
+    Εισάγει (μία φορά) το properties.json και όλα τα i18n/*.json στη βάση,
+    αντικαθιστώντας ό,τι υπάρχει, σε ένα transaction.
+    """
+    properties_list = read_json(properties_path)
+    languages = sorted(name[:-5] for name in os.listdir(i18n_dir) if name.endswith('.json'))
+
+    session = db.session
+    try:
+        session.execute(db.delete(Property))
+        session.execute(db.delete(Translation))
+        now = datetime.now()
+        for position, prop in enumerate(properties_list):
+            row = Property(position=position, updated_at=now)
+            row.update_from_dict(prop)
+            session.add(row)
+        translation_count = 0
+        for lang in languages:
+            for key, value in read_json(i18n_path(i18n_dir, lang)).items():
+                session.add(Translation(lang=lang, key=key, value=value))
+                translation_count += 1
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return len(properties_list), languages, translation_count
+
+
+def upgrade_schema(db):
+    """
+    Κάνει μοναδικό το index του properties.position σε παλιές βάσεις (ασφαλές
+    να τρέξει ξανά). Διπλές θέσεις από παλιότερες ταυτόχρονες εισαγωγές
+    αριθμούνται πρώτα ξανά, κρατώντας τη σειρά (position, id).
+    """
+    engine = db.engine
+    db.create_all()
+    index = next(index for index in Property.__table__.indexes if index.name == 'ix_properties_position')
+    existing = {item['name']: item for item in inspect(engine).get_indexes(Property.__tablename__)}
+    if existing.get(index.name, {}).get('unique'):
+        return
+    session = db.session
+    try:
+        rows = session.execute(db.select(Property.id, Property.position).order_by(Property.position, Property.id)).all()
+        if len({position for _, position in rows}) != len(rows):
+            for new_position, (property_id, _) in enumerate(rows):
+                session.execute(db.update(Property).where(Property.id == property_id)
+                                .values(position=new_position))
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    if index.name in existing:
+        db.session.execute(db.text(f'DROP INDEX {index.name}'))
+        db.session.commit()
+    index.create(engine)
@@ -0,0 +1,22 @@
+import sys
+from pathlib import Path
+
+import pytest
+from flask import Flask
+
+from models import db
+
+# Τα benchmarks δεν είναι package: το stub_smtp εισάγεται από τον φάκελό τους
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'benchmarks'))
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Ένα app με τα μοντέλα σε άδεια SQLite βάση, μέσα σε app context."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'test.db'}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
@@ -0,0 +1,89 @@
+import pytest
+
+from catalog import PropertyCatalog, decode_cursor, encode_cursor
+
+
+def make_property(property_id, price, prop_type='apartment', location_slug='nea-vrasna', **fields):
+    return {'id': property_id, 'price': price, 'type': prop_type, 'location_slug': location_slug, **fields}
+
+
+def walk(catalog, limit=3, **filters):
+    """Όλες οι σελίδες με τη σειρά, ακολουθώντας το next_cursor."""
+    ids, cursor = [], None
+    while True:
+        items, next_cursor, _ = catalog.page(cursor=cursor, limit=limit, **filters)
+        ids.extend(prop['id'] for prop in items)
+        if next_cursor is None:
+            return ids
+        cursor = decode_cursor(next_cursor)
+
+
+PROPERTIES = [
+    make_property('a', 300),
+    make_property('b', 0),  # Κατόπιν επικοινωνίας
+    make_property('c', 100, prop_type='plot'),
+    make_property('d', 200),
+    make_property('e', 100),
+    make_property('f', 500, location_slug='asprovalta'),
+    make_property('g', 150),
+]
+
+
+def test_pages_cover_the_catalog_once_in_natural_order():
+    catalog = PropertyCatalog(PROPERTIES)
+    items, _, total = catalog.page(limit=3)
+    assert [prop['id'] for prop in items] == ['a', 'b', 'c']
+    assert total == len(PROPERTIES)
+    assert walk(catalog) == ['a', 'b', 'c', 'd', 'e', 'f', 'g']
+
+
+def test_price_sorts_break_ties_by_id_and_put_price_on_request_last():
+    catalog = PropertyCatalog(PROPERTIES)
+    assert walk(catalog, sort='price_asc') == ['c', 'e', 'g', 'd', 'a', 'f', 'b']
+    assert walk(catalog, sort='price_desc') == ['f', 'a', 'd', 'g', 'c', 'e', 'b']
+
+
+def test_filters_and_ranges():
+    catalog = PropertyCatalog(PROPERTIES)
+    assert walk(catalog, prop_type='apartment', location='nea-vrasna') == ['a', 'b', 'd', 'e', 'g']
+    items, next_cursor, total = catalog.page(ranges={'price': (100, 200)}, limit=10)
+    # Το 0 δεν ταιριάζει σε εύρος τιμής· με φίλτρα εύρους δεν υπάρχει σύνολο
+    assert [prop['id'] for prop in items] == ['c', 'd', 'e', 'g']
+    assert next_cursor is None and total is None
+
+
+def test_cursor_survives_changes_between_pages():
+    catalog = PropertyCatalog(PROPERTIES)
+    _, next_cursor, _ = catalog.page(sort='price_asc', limit=3)  # c, e, g
+    cursor = decode_cursor(next_cursor)
+
+    # Το ακίνητο του cursor διαγράφηκε, ένα από την 1η σελίδα ακρίβυνε
+    # και ένα νέο μπήκε πριν από τη θέση του cursor
+    changed = [dict(prop, price=600) if prop['id'] == 'e' else prop
+               for prop in PROPERTIES if prop['id'] != 'g'] + [make_property('h', 120)]
+    items, _, _ = PropertyCatalog(changed).page(sort='price_asc', cursor=cursor, limit=10)
+    assert [prop['id'] for prop in items] == ['d', 'a', 'f', 'e', 'b']
+
+
+def test_natural_order_cursor_resumes_at_the_position_of_a_deleted_property():
+    catalog = PropertyCatalog(PROPERTIES)
+    _, next_cursor, _ = catalog.page(limit=3)  # a, b, c
+    remaining = [prop for prop in PROPERTIES if prop['id'] != 'c']
+    items, _, _ = PropertyCatalog(remaining).page(cursor=decode_cursor(next_cursor), limit=10)
+    assert [prop['id'] for prop in items] == ['d', 'e', 'f', 'g']
+
+
+def test_invalid_or_mismatched_cursors():
+    with pytest.raises(ValueError):
+        decode_cursor('not-a-cursor')
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor('', PROPERTIES[0], -1))
+    cursor = decode_cursor(encode_cursor('price_asc', PROPERTIES[0], 0))
+    with pytest.raises(ValueError):
+        PropertyCatalog(PROPERTIES).page(sort='price_desc', cursor=cursor)
+
+
+def test_property_without_type_and_location():
+    catalog = PropertyCatalog([{'id': 'bare'}, make_property('a', 100)])
+    assert walk(catalog) == ['bare', 'a']
+    assert [prop['id'] for prop in catalog.filter(prop_type='apartment')] == ['a']
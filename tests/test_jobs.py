@@ -0,0 +1,108 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from jobs import STATUS_DONE, STATUS_FAILED, STATUS_QUEUED, STATUS_RUNNING, JobFailed, JobQueue
+from models import Job, db
+
+
+@pytest.fixture
+def queue(app):
+    queue = JobQueue(app, db, Job, max_attempts=2, retry_delay=10)
+    queue.start = lambda: None  # Χωρίς worker threads: τα tests καλούν το _run_next()
+    queue.ran = []
+
+    @queue.handler('record')
+    def record(payload, report):
+        queue.ran.append(payload['name'])
+        return {'name': payload['name']}
+
+    @queue.handler('fail')
+    def fail(payload, report):
+        raise RuntimeError('boom')
+
+    @queue.handler('reject')
+    def reject(payload, report):
+        raise JobFailed('not retryable')
+
+    return queue
+
+
+def run_all(queue):
+    while queue._run_next():
+        pass
+
+
+def json_name(job):
+    return json.loads(job.payload)['name']
+
+
+def test_enqueue_with_the_same_job_id_is_idempotent(queue):
+    assert queue.enqueue('record', {'name': 'a'}, job_id='daily') == 'daily'
+    assert queue.enqueue('record', {'name': 'b'}, job_id='daily') == 'daily'
+    run_all(queue)
+    assert queue.ran == ['a']
+    assert queue.get('daily')['status'] == STATUS_DONE
+    assert queue.get('daily')['result'] == {'name': 'a'}
+
+
+def test_claim_takes_each_job_once(queue):
+    first = queue.enqueue('record', {'name': 'a'})
+    queue.enqueue('record', {'name': 'b'}, run_after=datetime.now() + timedelta(hours=1))
+
+    claimed = queue._claim()
+    assert claimed.id == first
+    assert claimed.status == STATUS_RUNNING and claimed.attempts == 1
+    # Η μία τρέχει, η άλλη δεν είναι ακόμη έτοιμη
+    assert queue._claim() is None
+
+
+def test_expired_lease_is_claimed_again(queue):
+    job_id = queue.enqueue('record', {'name': 'a'})
+    queue._claim()
+    db.session.get(Job, job_id).locked_until = datetime.now() - timedelta(seconds=1)
+    db.session.commit()
+    assert queue._claim().id == job_id
+
+
+def test_same_serial_key_runs_one_at_a_time_in_order(queue):
+    queue.enqueue('record', {'name': 'a1'}, serial_key='property:a')
+    queue.enqueue('record', {'name': 'a2'}, serial_key='property:a')
+    queue.enqueue('record', {'name': 'b1'}, serial_key='property:b')
+    queue.enqueue('record', {'name': 'free'})
+
+    running = queue._claim()
+    assert queue.pending('property:a')
+    # Το a2 περιμένει το a1· τα υπόλοιπα κλειδιά δεν επηρεάζονται
+    claimed = [queue._claim(), queue._claim()]
+    assert sorted(json_name(job) for job in claimed) == ['b1', 'free']
+    assert queue._claim() is None
+
+    running.status = STATUS_DONE
+    db.session.commit()
+    assert json_name(queue._claim()) == 'a2'
+
+
+def test_a_job_waiting_for_retry_still_holds_back_its_key(queue):
+    queue.enqueue('fail', {'name': 'first'}, serial_key='property:a')
+    queue.enqueue('record', {'name': 'second'}, serial_key='property:a')
+
+    assert queue._run_next()
+    failed = db.session.execute(db.select(Job).where(Job.kind == 'fail')).scalar_one()
+    assert failed.status == STATUS_QUEUED and failed.run_after > datetime.now()
+    assert queue._claim() is None
+
+    failed.run_after = datetime.now() - timedelta(seconds=1)
+    db.session.commit()
+    run_all(queue)
+    assert failed.status == STATUS_FAILED and failed.attempts == 2
+    assert queue.ran == ['second']
+    assert not queue.pending('property:a')
+
+
+def test_job_failed_is_not_retried(queue):
+    job_id = queue.enqueue('reject', {})
+    run_all(queue)
+    assert queue.get(job_id)['status'] == STATUS_FAILED
+    assert queue.get(job_id)['attempts'] == 1
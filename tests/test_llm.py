@@ -0,0 +1,101 @@
+import time
+
+import pytest
+
+from llm import STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN, CircuitBreaker, FakeChatModel, LLMClient, LLMUnavailable
+
+
+def open_breaker(breaker):
+    for _ in range(breaker.failure_threshold):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == STATE_OPEN
+
+
+def test_opens_after_consecutive_failures_only():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == STATE_CLOSED
+    breaker.record_failure()
+    assert breaker.state == STATE_OPEN
+    assert not breaker.allow()
+    assert breaker.stats()['times_opened'] == 1
+
+
+def test_half_open_lets_one_probe_through():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.01)
+    open_breaker(breaker)
+    time.sleep(0.02)
+
+    assert breaker.allow()
+    assert breaker.state == STATE_HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == STATE_CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_opens_again():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.01)
+    open_breaker(breaker)
+    time.sleep(0.02)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == STATE_OPEN
+    assert not breaker.allow()
+    assert breaker.stats()['times_opened'] == 2
+
+
+def test_cancelled_probe_frees_the_probe_without_closing():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    client = LLMClient(lambda: FakeChatModel(delay=0), breaker=breaker)
+    open_breaker(breaker)
+    time.sleep(0.02)
+
+    stream = client.stream('hi')
+    next(stream)
+    stream.close()  # Ο client έφυγε στη μέση
+    assert breaker.state == STATE_HALF_OPEN
+    assert client.stats()['cancelled'] == 1
+    assert client.stats()['successes'] == 0
+    assert client.stats()['in_flight'] == 0
+    # Η επόμενη κλήση είναι η νέα δοκιμαστική και κλείνει το breaker
+    assert client.generate('hi')
+    assert breaker.state == STATE_CLOSED
+
+
+def test_client_rejects_when_open_or_busy():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    client = LLMClient(lambda: FakeChatModel(delay=0, fail_rate=1.0), max_concurrency=1,
+                       queue_timeout=0, breaker=breaker)
+    with pytest.raises(LLMUnavailable):
+        client.generate('hi')
+    with pytest.raises(LLMUnavailable, match='circuit open'):
+        client.generate('hi')
+
+    busy = LLMClient(lambda: FakeChatModel(delay=0), max_concurrency=1, queue_timeout=0)
+    stream = busy.stream('hi')
+    next(stream)
+    with pytest.raises(LLMUnavailable, match='too many concurrent calls'):
+        busy.generate('hi')
+    stream.close()
+    assert busy.stats()['rejected_busy'] == 1
+
+
+class SlowModel(FakeChatModel):
+    """Backend που δεν σέβεται το timeout: η απάντηση έρχεται πλήρης, αλλά αργά."""
+
+    def generate_content(self, prompt, stream=False, request_options=None):
+        time.sleep(0.02)
+        return super().generate_content(prompt, stream=stream)
+
+
+def test_late_reply_is_returned_and_counted_as_slow():
+    client = LLMClient(lambda: SlowModel(delay=0), timeout=0.01)
+    assert client.generate('hi')
+    assert client.stats()['slow'] == 1
+    assert client.stats()['successes'] == 1
@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from mailer import STATUS_FAILED, STATUS_PENDING, STATUS_SENDING, STATUS_SENT, MailOutbox, SmtpRoute
+from models import OutboxEmail, db
+from stub_smtp import StubSmtpServer
+
+
+@pytest.fixture
+def smtp():
+    server = StubSmtpServer().start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_outbox(app, port, **options):
+    outbox = MailOutbox(app, db, OutboxEmail, [SmtpRoute('127.0.0.1', port, security='plain', timeout=5)],
+                        sender='site@example.com', receiver='office@example.com', **options)
+    outbox.start = lambda: None  # Χωρίς background sender: τα tests καλούν το send_pending()
+    return outbox
+
+
+def emails():
+    return db.session.execute(db.select(OutboxEmail).order_by(OutboxEmail.created_at)).scalars().all()
+
+
+def make_due():
+    for email in emails():
+        email.next_attempt_at = datetime.now() - timedelta(seconds=1)
+    db.session.commit()
+
+
+def test_sends_a_batch_over_one_connection(app, smtp):
+    outbox = make_outbox(app, smtp.port)
+    for i in range(3):
+        outbox.enqueue(f'Lead {i}', 'body')
+
+    assert outbox.send_pending() is True
+    assert smtp.messages == 3
+    assert smtp.connections == 1
+    assert [email.status for email in emails()] == [STATUS_SENT] * 3
+    assert outbox.send_pending() is False
+
+
+def test_claims_at_most_a_batch_and_never_twice(app, smtp):
+    outbox = make_outbox(app, smtp.port, batch_size=2)
+    for i in range(3):
+        outbox.enqueue(f'Lead {i}', 'body')
+
+    first = outbox._claim()
+    second = outbox._claim()
+    assert len(first) == 2
+    assert len(second) == 1
+    assert not {email.id for email in first} & {email.id for email in second}
+    assert outbox._claim() == []
+    assert all(email.status == STATUS_SENDING for email in emails())
+
+
+def test_disconnect_mid_batch_retries_the_rest(app, smtp):
+    smtp.disconnect_after = 2
+    outbox = make_outbox(app, smtp.port, base_delay=60)
+    for i in range(4):
+        outbox.enqueue(f'Lead {i}', 'body')
+
+    assert outbox.send_pending() is True
+    statuses = [email.status for email in emails()]
+    assert statuses == [STATUS_SENT, STATUS_SENT, STATUS_PENDING, STATUS_PENDING]
+    for email in emails()[2:]:
+        assert email.attempts == 1
+        assert email.last_error
+        assert email.next_attempt_at > datetime.now()
+
+    # Δεν ξαναστέλνονται πριν περάσει η καθυστέρηση
+    assert outbox.send_pending() is False
+    smtp.disconnect_after = None
+    make_due()
+    assert outbox.send_pending() is True
+    assert smtp.messages == 4
+    assert all(email.status == STATUS_SENT for email in emails())
+
+
+def test_backoff_grows_and_then_fails_permanently(app):
+    # Κανείς δεν ακούει στη θύρα: κάθε σύνδεση αποτυγχάνει
+    with StubSmtpServer() as closed:
+        port = closed.port
+    outbox = make_outbox(app, port, base_delay=10, max_delay=25, max_attempts=4)
+    outbox.enqueue('Lead', 'body')
+
+    delays = []
+    for _ in range(3):
+        started = datetime.now()
+        assert outbox.send_pending() is False
+        email = emails()[0]
+        assert email.status == STATUS_PENDING
+        delays.append((email.next_attempt_at - started).total_seconds())
+        make_due()
+    # base_delay * 2^(attempts-1), με ±20% jitter και όριο το max_delay
+    assert 8 <= delays[0] <= 12.5
+    assert 16 <= delays[1] <= 24.5
+    assert 20 <= delays[2] <= 30.5
+
+    outbox.send_pending()
+    email = emails()[0]
+    assert email.status == STATUS_FAILED
+    assert email.attempts == 4
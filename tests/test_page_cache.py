@@ -0,0 +1,72 @@
+import os
+import time
+
+from page_cache import PageCache, source_version
+
+
+def test_key_includes_versions():
+    cache = PageCache()
+    key = ('listings', (('type', 'plot'),), 'el', 'translations-1', 'templates-1', 'catalog-1')
+    cache.set('listings', key, b'<html>1</html>')
+
+    assert cache.get('listings', key) == b'<html>1</html>'
+    # Νέα έκδοση καταλόγου, άλλη γλώσσα ή άλλα args: άλλη σελίδα
+    assert cache.get('listings', key[:-1] + ('catalog-2',)) is None
+    assert cache.get('listings', (key[0], key[1], 'en') + key[3:]) is None
+    assert cache.get('listings', (key[0], ()) + key[2:]) is None
+    assert cache.stats()['memory_hits'] == 1
+    assert cache.stats()['misses'] == 3
+
+
+def test_memory_is_bounded_by_bytes_least_recently_used_first():
+    cache = PageCache(max_bytes=10)
+    cache.set('t', 'a', b'1234')
+    cache.set('t', 'b', b'1234')
+    cache.get('t', 'a')
+    cache.set('t', 'c', b'1234')
+
+    assert cache.get('t', 'b') is None
+    assert cache.get('t', 'a') == b'1234'
+    assert cache.get('t', 'c') == b'1234'
+    assert cache.stats()['bytes'] == 8
+    assert cache.stats()['evictions'] == 1
+    cache.set('t', 'huge', b'x' * 11)
+    assert cache.get('t', 'huge') is None
+
+
+def test_invalidate_drops_only_the_tag_in_memory_and_on_disk(tmp_path):
+    cache = PageCache(disk_dir=str(tmp_path))
+    cache.set('property:a', 'page-a', b'a')
+    cache.set('home', 'page-home', b'home')
+    cache.invalidate('property:a')
+
+    assert cache.get('property:a', 'page-a') is None
+    assert cache.get('home', 'page-home') == b'home'
+    # Ένας άλλος worker (άλλη μνήμη, ίδιος δίσκος) δεν βρίσκει ούτε αυτός τη σελίδα
+    other_worker = PageCache(disk_dir=str(tmp_path))
+    assert other_worker.get('property:a', 'page-a') is None
+    assert other_worker.get('home', 'page-home') == b'home'
+    assert other_worker.stats()['disk_hits'] == 1
+
+
+def test_disk_entries_expire(tmp_path):
+    PageCache(disk_dir=str(tmp_path), disk_ttl=60).set('home', 'page', b'home')
+    for folder, _, files in os.walk(tmp_path):
+        for name in files:
+            old = time.time() - 120
+            os.utime(os.path.join(folder, name), (old, old))
+    assert PageCache(disk_dir=str(tmp_path), disk_ttl=60).get('home', 'page') is None
+
+
+def test_source_version_follows_template_changes(tmp_path):
+    template = tmp_path / 'page.html'
+    template.write_text('<p>1</p>')
+    (tmp_path / 'data').mkdir()
+    (tmp_path / 'data' / 'properties.json').write_text('[]')
+    before = source_version(str(tmp_path))
+
+    # Τα δεδομένα έχουν δικές τους εκδόσεις στο κλειδί
+    (tmp_path / 'data' / 'properties.json').write_text('[{}]')
+    assert source_version(str(tmp_path)) == before
+    template.write_text('<p>22</p>')
+    assert source_version(str(tmp_path)) != before
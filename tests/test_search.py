@@ -0,0 +1,31 @@
+import pytest
+
+from search import fold, tokenize
+
+
+@pytest.mark.parametrize('greek, latin', [
+    ('Βρασνά', 'vrasna'),
+    ('ΒΡΑΣΝΑ', 'vrasna'),
+    # Δίγραφα: όπως προφέρονται, όπως τα γράφει και το greeklish
+    ('Σταυρός', 'stavros'),
+    ('Λουτρά', 'loutra'),
+    ('Λουτρά', 'lutra'),
+    ('Ευρώπη', 'evropi'),
+    ('Λευκάδα', 'lefkada'),
+    ('Μπάνια', 'bania'),
+    ('Μπάνια', 'mpania'),
+    ('Ντομάτα', 'domata'),
+    ('Όλυμπος', 'olympos'),
+])
+def test_greek_and_greeklish_fold_to_the_same_token(greek, latin):
+    assert fold(greek) == fold(latin)
+
+
+def test_accent_or_diaeresis_splits_the_diphthong():
+    # "άυ" και "αϋ" προφέρονται χωριστά: a-i, όχι av
+    assert fold('άυλος') == fold('ailos')
+    assert fold('αϋπνία') == fold('aipnia')
+
+
+def test_tokenize_folds_each_word():
+    assert tokenize('Σπίτι στα Λουτρά Ευρώπης') == ['spiti', 'sta', 'lutra', 'evropis']
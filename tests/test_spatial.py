@@ -0,0 +1,42 @@
+from spatial import SpatialIndex
+
+
+def _marker_ids(index, bbox, zoom):
+    clusters, markers = index.query(bbox, zoom)
+    assert clusters == []
+    return {m['id'] for m in markers}
+
+
+def test_bbox_across_antimeridian_keeps_only_markers_inside():
+    index = SpatialIndex([
+        {'id': 'fiji', 'lat': -17.7, 'lon': 178.0},
+        {'id': 'samoa', 'lat': -13.8, 'lon': -172.0},
+        # Ίδιο γεωγραφικό πλάτος, αλλά στην άλλη πλευρά της γης
+        {'id': 'st_helena', 'lat': -15.96, 'lon': -5.72},
+    ])
+    # Από 170°E έως 170°W, πάνω από τον αντιμεσημβρινό
+    assert _marker_ids(index, (170.0, -30.0, -170.0, 0.0), 18) == {'fiji', 'samoa'}
+
+
+def test_bbox_without_crossing_filters_by_longitude():
+    index = SpatialIndex([
+        {'id': 'athens', 'lat': 37.98, 'lon': 23.73},
+        {'id': 'thessaloniki', 'lat': 40.64, 'lon': 22.94},
+        {'id': 'rhodes', 'lat': 36.43, 'lon': 28.22},
+    ])
+    assert _marker_ids(index, (22.0, 35.0, 25.0, 41.0), 18) == {'athens', 'thessaloniki'}
+
+
+def test_bbox_across_antimeridian_keeps_only_clusters_inside():
+    index = SpatialIndex([
+        {'id': 'fiji-1', 'lat': -17.70, 'lon': 178.00},
+        {'id': 'fiji-2', 'lat': -17.71, 'lon': 178.01},
+        {'id': 'samoa-1', 'lat': -13.80, 'lon': -172.00},
+        {'id': 'samoa-2', 'lat': -13.81, 'lon': -172.01},
+        # Στο ίδιο γεωγραφικό πλάτος, στην άλλη πλευρά της γης
+        {'id': 'st-helena-1', 'lat': -15.96, 'lon': -5.72},
+        {'id': 'st-helena-2', 'lat': -15.97, 'lon': -5.71},
+    ])
+    clusters, markers = index.query((170.0, -30.0, -170.0, 0.0), 5)
+    assert markers == []
+    assert sorted((round(c['lon']), c['count']) for c in clusters) == [(-172, 2), (178, 2)]
@@ -0,0 +1,92 @@
+# translation.py
+"""
+Μετάφραση των κειμένων ενός ακινήτου σε όλες τις γλώσσες του site ταυτόχρονα.
+
+Αντί για μία διαδοχική κλήση στο Gemini ανά γλώσσα, ο TranslationEngine:
+- προαιρετικά ζητά όλες τις γλώσσες σε ΕΝΑ δομημένο αίτημα (translate_many),
+- για όσες γλώσσες λείπουν κάνει fan-out σε bounded thread pool (translate_one),
+- έχει προθεσμία (timeout) και για κάθε γλώσσα που αποτυγχάνει ή αργεί
+  επιστρέφει τα ελληνικά με ένδειξη [TRANSLATION_FAILED].
+Έτσι ο χρόνος αποθήκευσης ορίζεται από την πιο αργή κλήση, όχι από το άθροισμα.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+MODE_PARALLEL = 'parallel'
+MODE_BATCH = 'batch'
+
+
+def failed_translation(texts):
+    return {key: f"[TRANSLATION_FAILED] {value}" for key, value in texts.items()}
+
+
+def is_complete(texts, translated):
+    return isinstance(translated, dict) and all(isinstance(translated.get(key), str) for key in texts)
+
+
+class TranslationEngine:
+
+    def __init__(self, translate_one, translate_many=None, max_workers=4,
+                 timeout=45.0, mode=MODE_PARALLEL):
+        self.translate_one = translate_one
+        self.translate_many = translate_many
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.mode = mode
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        # Νέο pool ανά process, ώστε να δουλεύει και μετά από fork (gunicorn)
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix='translate')
+                self._pid = os.getpid()
+            return self._executor
+
+    def translate(self, texts, languages):
+        """
+        `languages`: {όνομα γλώσσας: κωδικός}, όπως το LANGUAGES του app.
+        Επιστρέφει {κωδικός: μεταφρασμένο λεξικό} για ΟΛΕΣ τις γλώσσες.
+        """
+        deadline = time.monotonic() + self.timeout
+        results = {}
+
+        if self.mode == MODE_BATCH and self.translate_many:
+            try:
+                batch = self.translate_many(texts, list(languages), self.timeout) or {}
+            except Exception as e:
+                print(f"ERROR during batch translation: {e}")
+                batch = {}
+            for lang_name, lang_code in languages.items():
+                if is_complete(texts, batch.get(lang_name)):
+                    results[lang_code] = batch[lang_name]
+
+        pending = {name: code for name, code in languages.items() if code not in results}
+        if pending:
+            executor = self._get_executor()
+            remaining = max(deadline - time.monotonic(), 0.1)
+            futures = {
+                executor.submit(self.translate_one, texts, lang_name, remaining): lang_code
+                for lang_name, lang_code in pending.items()
+            }
+            done, not_done = wait(futures, timeout=remaining)
+            for future in done:
+                lang_code = futures[future]
+                try:
+                    translated = future.result()
+                except Exception as e:
+                    print(f"ERROR during translation to {lang_code}: {e}")
+                    translated = None
+                results[lang_code] = translated if is_complete(texts, translated) else failed_translation(texts)
+            for future in not_done:
+                future.cancel()
+                lang_code = futures[future]
+                print(f"ERROR during translation to {lang_code}: timed out after {self.timeout}s")
+                results[lang_code] = failed_translation(texts)
+
+        return results